@@ -0,0 +1,190 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Tuple
+from cache import SetCounterCache, number_set_rows
+from database import DatabaseManager
+from history_io import WRITERS
+from set_writer import GroupCommitWriter
+from sharding import open_database, shard_for_telegram_id, shard_of_id
+import config
+
+
+class AsyncDatabaseManager:
+    """Асинхронний фасад над DatabaseManager.
+
+    Усі записи виконуються в одному потоці-записувачі, тому SQLite не чекає
+    на власне блокування; читання йдуть паралельно через окремий пул потоків
+    (WAL дозволяє читачам не заважати записувачу). Для шардованої бази в
+    кожного шарда свій потік-записувач, тож шарди пишуться паралельно.
+    З group_commit підходи різних користувачів записуються спільними транзакціями
+    (і з synchronous = FULL).
+    Номери підходів без явного номера видаються з лічильників у пам'яті (set_counters).
+    """
+
+    def __init__(self, db: Optional[DatabaseManager] = None, readers: int = 4, group_commit: Optional[bool] = None):
+        self.db = db or open_database(config.DB_PATH, config.DB_SHARDS)
+        self.shard_count = getattr(self.db, 'shard_count', 1)
+        self._writers = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"db-writer-{shard}")
+            for shard in range(self.shard_count)
+        ]
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="db-reader")
+        if group_commit is None:
+            group_commit = config.GROUP_COMMIT
+        self.set_counters = SetCounterCache(maxsize=config.SET_COUNTER_CACHE_SIZE)
+        self._seeding: Dict[int, asyncio.Future] = {}
+        self.set_writer: Optional[GroupCommitWriter] = None
+        if group_commit:
+            # Підтвердження після спільного коміту має пережити і вимкнення живлення;
+            # fsync тут один на всю пачку, тож FULL коштує небагато
+            self.db.set_synchronous('FULL')
+            self.set_writer = GroupCommitWriter(
+                self._insert_set_rows,
+                flush_interval=config.GROUP_COMMIT_INTERVAL,
+                max_rows=config.GROUP_COMMIT_MAX_ROWS,
+                partition=(lambda row: shard_of_id(row[0], self.shard_count)) if self.shard_count > 1 else None
+            )
+
+    async def _write(self, func, *args, shard: int = 0, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writers[shard], functools.partial(func, *args, **kwargs))
+
+    async def _insert_set_rows(self, rows: List[Tuple]) -> int:
+        """Пачка від GroupCommitWriter: він ділить рядки по шардах, тож усі вони з одного шарду"""
+        return await self._write(self.db.insert_set_rows, rows, shard=shard_of_id(rows[0][0], self.shard_count))
+
+    async def _read(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, functools.partial(func, *args, **kwargs))
+
+    def close(self):
+        for writer in self._writers:
+            writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        self.db.close()
+
+    async def populate_default_exercises(self):
+        return await self._write(self.db.populate_default_exercises)
+
+    async def get_all_exercises(self) -> List[str]:
+        if self.db.catalog.loaded:
+            return self.db.get_all_exercises()
+        return await self._read(self.db.get_all_exercises)
+
+    async def get_exercises_list_text(self) -> str:
+        """Готовий текст списку вправ; після першого завантаження — без потоків і запитів"""
+        if self.db.catalog.loaded:
+            return self.db.catalog.list_text
+        return await self._read(lambda: self.db.catalog.list_text)
+
+    async def resolve_exercise(self, name: str, text: str = None) -> Optional[str]:
+        if self.db.catalog.loaded:
+            return self.db.resolve_exercise(name, text)
+        return await self._read(self.db.resolve_exercise, name, text)
+
+    async def add_exercise(self, name: str) -> int:
+        return await self._write(self.db.add_exercise, name)
+
+    async def add_user(self, telegram_id: int, username: str = None, first_name: str = None) -> int:
+        shard = shard_for_telegram_id(telegram_id, self.shard_count)
+        return await self._write(self.db.add_user, telegram_id, username, first_name, shard=shard)
+
+    async def start_workout(self, user_id: int) -> int:
+        return await self._write(self.db.start_workout, user_id, shard=shard_of_id(user_id, self.shard_count))
+
+    async def get_active_workout(self, user_id: int) -> Optional[int]:
+        return await self._read(self.db.get_active_workout, user_id)
+
+    async def _numbered_set_rows(self, workout_id: int, sets: List[Dict[str, Any]]) -> List[Tuple]:
+        """Рядки sets з номерами підходів; номер також записується в кожен set_data для підтвердження"""
+        if self.db.catalog.loaded:
+            rows = self.db.prepare_set_rows(workout_id, sets)
+        else:
+            rows = await self._read(self.db.prepare_set_rows, workout_id, sets)
+        counters = self.set_counters.get_counters(workout_id)
+        if counters is None:
+            counters = self.set_counters.set_counters(workout_id, await self._seed_set_counters(workout_id))
+        rows = number_set_rows(counters, rows)
+        for set_data, row in zip(sets, rows):
+            set_data['set_number'] = row[4]
+        return rows
+
+    async def _seed_set_counters(self, workout_id: int) -> Dict[int, int]:
+        """Перший підхід тренування в цьому процесі (нове або продовжене після перезапуску).
+
+        Паралельні повідомлення чекають на один і той самий запит замість власних.
+        """
+        seeding = self._seeding.get(workout_id)
+        if seeding is None:
+            seeding = asyncio.ensure_future(self._read(self.db.get_set_counters, workout_id))
+            self._seeding[workout_id] = seeding
+            seeding.add_done_callback(lambda _: self._seeding.pop(workout_id, None))
+        return await asyncio.shield(seeding)
+
+    async def _insert_numbered(self, workout_id: int, insert) -> int:
+        try:
+            return await insert()
+        except Exception:
+            # Номери видано, а рядки не записано — наступний підхід засіє лічильники з бази наново
+            self.set_counters.invalidate(workout_id)
+            raise
+
+    async def add_set(self, workout_id: int, exercise_name: str, reps: int, weight: float = None, set_number: int = None) -> int:
+        set_data = {'exercise': exercise_name, 'reps': reps, 'weight': weight, 'set_number': set_number}
+        rows = await self._numbered_set_rows(workout_id, [set_data])
+        return await self._insert_numbered(workout_id, lambda: self._write(
+            self.db.add_set, workout_id, exercise_name, reps, weight, rows[0][4],
+            shard=shard_of_id(workout_id, self.shard_count)
+        ))
+
+    async def add_sets(self, workout_id: int, sets: List[Dict[str, Any]]) -> int:
+        rows = await self._numbered_set_rows(workout_id, sets)
+        if self.set_writer is None:
+            return await self._insert_numbered(workout_id, lambda: self._write(
+                self.db.insert_set_rows, rows, shard=shard_of_id(workout_id, self.shard_count)
+            ))
+        return await self._insert_numbered(workout_id, lambda: self.set_writer.submit(rows))
+
+    async def finish_workout(self, workout_id: int) -> Dict[str, Any]:
+        result = await self._write(self.db.finish_workout, workout_id, shard=shard_of_id(workout_id, self.shard_count))
+        self.set_counters.invalidate(workout_id)
+        return result
+
+    async def get_workout_report(self, workout_id: int, user_id: int) -> Optional[str]:
+        return await self._read(self.db.get_workout_report, workout_id, user_id)
+
+    async def get_workout_history(self, user_id: int, before: Optional[int] = None, limit: int = 5) -> List[Tuple[int, Dict[str, Any]]]:
+        return await self._read(self.db.get_workout_history, user_id, before, limit)
+
+    async def export_user_sets(self, user_id: int, stream, fmt: str = 'csv') -> int:
+        """Пише всі підходи користувача у stream (CSV або JSON) в потоці читання; повертає кількість рядків"""
+        writer = WRITERS[fmt]
+        return await self._read(lambda: writer(self.db.iter_user_sets(user_id), stream))
+
+    async def get_user_progress(self, user_id: int, weeks: int = 8, trend_weeks: int = 12) -> Dict[str, Any]:
+        """Завантаження історії в масиви NumPy і розрахунок у потоці читання (NumPy відпускає GIL)"""
+        def compute():
+            # NumPy завантажується з першим /progress, а не під час запуску бота
+            from progress import compute_progress, load_history
+            history = load_history(self.db.iter_progress_rows(user_id))
+            return compute_progress(history, self.db.catalog.names_by_id, weeks=weeks, trend_weeks=trend_weeks)
+        return await self._read(compute)
+
+    async def get_range_statistics(self, user_id: int, start: str, end: str) -> Dict[str, Any]:
+        return await self._read(self.db.get_range_statistics, user_id, start, end)
+
+    async def compact_rollups(self, before: str) -> int:
+        return await self._write(self.db.compact_rollups, before)
+
+    async def get_transcription(self, cache_key: str, max_age: float) -> Optional[str]:
+        return await self._read(self.db.get_transcription, cache_key, max_age)
+
+    async def save_transcriptions(self, cache_keys: List[str], text: str):
+        return await self._write(self.db.save_transcriptions, cache_keys, text)
+
+    async def prune_transcriptions(self, max_age: float, max_entries: int) -> int:
+        return await self._write(self.db.prune_transcriptions, max_age, max_entries)
+
+    async def get_user_statistics(self, user_id: int) -> Dict[str, Any]:
+        return await self._read(self.db.get_user_statistics, user_id)
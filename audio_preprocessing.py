@@ -0,0 +1,142 @@
+import logging
+import shutil
+import subprocess
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+
+@dataclass
+class PreprocessedAudio:
+    audio: bytes
+    original_bytes: int
+    output_bytes: int
+    original_duration: float
+    output_duration: float
+    elapsed: float
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.output_bytes
+
+    @property
+    def seconds_saved(self) -> float:
+        """Скільки секунд аудіо не доведеться розпізнавати"""
+        return self.original_duration - self.output_duration
+
+
+class AudioPreprocessor:
+    """Готує голосове до розпізнавання: декодує один раз у 16 кГц моно PCM,
+    обрізає тишу на початку й у кінці, обмежує тривалість і кодує назад в OGG/Opus.
+
+    PCM обробляється через memoryview: обрізання — це зрізи без копіювання,
+    а в ffmpeg передається той самий буфер.
+    """
+
+    def __init__(self, max_duration: float = 60.0, silence_threshold: int = 600,
+                 frame_ms: int = 30, padding_ms: int = 200, ffmpeg: str = "ffmpeg"):
+        self.max_duration = max_duration
+        self.silence_threshold = silence_threshold
+        self.frame_samples = SAMPLE_RATE * frame_ms // 1000
+        self.padding_samples = SAMPLE_RATE * padding_ms // 1000
+        self.ffmpeg = shutil.which(ffmpeg)
+        if not self.ffmpeg:
+            logging.warning("⚠️ ffmpeg не знайдено — голосові надсилаються на розпізнавання без попередньої обробки")
+        self.processed = 0
+        self.silent = 0
+        self.total_bytes_saved = 0
+        self.total_seconds_saved = 0.0
+
+    @property
+    def available(self) -> bool:
+        return self.ffmpeg is not None
+
+    def process(self, audio_data: bytes) -> Optional[PreprocessedAudio]:
+        """Повертає оброблене аудіо (порожнє, якщо в записі лише тиша)
+        або None, якщо обробка неможлива — тоді слід використати оригінал"""
+        if not self.available:
+            return None
+        started = time.perf_counter()
+        try:
+            pcm = memoryview(self._run_ffmpeg(
+                ['-i', 'pipe:0', '-f', 's16le', '-ac', '1', '-ar', str(SAMPLE_RATE), 'pipe:1'],
+                audio_data
+            )).cast('h')
+            if not len(pcm):
+                return None
+            trimmed = self.trim_silence(pcm)
+            max_samples = int(self.max_duration * SAMPLE_RATE)
+            if len(trimmed) > max_samples:
+                logging.warning(f"Голосове довше за {self.max_duration:.0f} с — обрізаємо")
+                trimmed = trimmed[:max_samples]
+            encoded = b''
+            if len(trimmed):
+                encoded = self._run_ffmpeg(
+                    ['-f', 's16le', '-ac', '1', '-ar', str(SAMPLE_RATE), '-i', 'pipe:0',
+                     '-c:a', 'libopus', '-b:a', '24k', '-f', 'ogg', 'pipe:1'],
+                    trimmed.cast('B')
+                )
+        except (OSError, subprocess.SubprocessError) as e:
+            logging.error(f"Помилка попередньої обробки аудіо: {e}")
+            return None
+
+        result = PreprocessedAudio(
+            audio=encoded,
+            original_bytes=len(audio_data),
+            output_bytes=len(encoded),
+            original_duration=len(pcm) / SAMPLE_RATE,
+            output_duration=len(trimmed) / SAMPLE_RATE,
+            elapsed=time.perf_counter() - started
+        )
+        self.processed += 1
+        if not encoded:
+            self.silent += 1
+        self.total_bytes_saved += result.bytes_saved
+        self.total_seconds_saved += result.seconds_saved
+        logging.info(
+            f"✂️ Аудіо {result.original_duration:.1f} → {result.output_duration:.1f} с, "
+            f"{result.original_bytes} → {result.output_bytes} байт "
+            f"(заощаджено {result.bytes_saved} байт і {result.seconds_saved:.1f} с розпізнавання, "
+            f"обробка {result.elapsed * 1000:.0f} мс)"
+        )
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        """Заощаджене з запуску: для /perf і /metrics"""
+        return {
+            'processed': self.processed,
+            'silent': self.silent,
+            'bytes_saved': self.total_bytes_saved,
+            'seconds_saved': self.total_seconds_saved,
+        }
+
+    def trim_silence(self, samples: memoryview) -> memoryview:
+        """Зріз samples без тиші на краях (кадри з піковою амплітудою нижче порогу)"""
+        first = self._first_voiced_frame(samples, range(0, len(samples), self.frame_samples))
+        if first is None:
+            return samples[:0]
+        last = self._first_voiced_frame(samples, range((len(samples) - 1) // self.frame_samples * self.frame_samples, -1, -self.frame_samples))
+        start = max(0, first - self.padding_samples)
+        end = min(len(samples), last + self.frame_samples + self.padding_samples)
+        return samples[start:end]
+
+    def _first_voiced_frame(self, samples: memoryview, offsets) -> Optional[int]:
+        for offset in offsets:
+            frame = samples[offset:offset + self.frame_samples]
+            if max(frame) > self.silence_threshold or -min(frame) > self.silence_threshold:
+                return offset
+        return None
+
+    def _run_ffmpeg(self, args, data) -> bytes:
+        completed = subprocess.run(
+            [self.ffmpeg, '-hide_banner', '-loglevel', 'error', *args],
+            input=data,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=True,
+            timeout=30
+        )
+        return completed.stdout
@@ -0,0 +1,51 @@
+"""Порівнює пропускну здатність DatabaseManager: з'єднання на кожен виклик проти пулу.
+
+Запуск: python benchmarks/bench_db_connections.py --ops 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+
+
+def message_path(db: DatabaseManager, telegram_id: int):
+    """Те, що робить одне текстове повідомлення з підходом"""
+    user_id = db.add_user(telegram_id=telegram_id)
+    workout_id = db.get_active_workout(user_id) or db.start_workout(user_id)
+    db.add_set(workout_id, "віджимання", 15)
+
+
+def run_mode(pooled: bool, ops: int, users: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"), pooled=pooled)
+        for telegram_id in range(users):
+            message_path(db, telegram_id)
+
+        started = time.perf_counter()
+        for i in range(ops):
+            message_path(db, i % users)
+        elapsed = time.perf_counter() - started
+        db.close()
+    return ops / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ops', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=50)
+    args = parser.parse_args()
+
+    per_call = run_mode(False, args.ops, args.users)
+    pooled = run_mode(True, args.ops, args.users)
+    print(f"per-call connect: {per_call:10.0f} messages/s")
+    print(f"pooled (WAL):     {pooled:10.0f} messages/s")
+    print(f"speedup:          {pooled / per_call:10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Швидкість ExerciseMatcher при зростанні довідника до тисяч власних вправ.
+
+Запуск: python benchmarks/bench_exercise_matcher.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from exercise_matcher import ExerciseMatcher
+
+SENTENCES = [
+    "зробив віджимання на брусах 10 разів, другий підхід",
+    "віджиманя 15 разів",
+    "жим лежачі 12 разів 80 кілограм",
+    "сьогодні було важко але я зробила станову тягу п'ять разів по сто кілограм",
+]
+LETTERS = "абвгдежзийклмнопрстуфхцчшщюяіїє"
+
+
+def synthetic_names(count: int, rng: random.Random):
+    names = set()
+    while len(names) < count:
+        words = [''.join(rng.choice(LETTERS) for _ in range(rng.randint(4, 9))) for _ in range(rng.randint(1, 3))]
+        names.add(' '.join(words))
+    return list(names)
+
+
+def main():
+    rng = random.Random(1)
+    for extra in (0, 1000, 5000, 20000):
+        names = list(DatabaseManager.DEFAULT_EXERCISES) + synthetic_names(extra, rng)
+        started = time.perf_counter()
+        matcher = ExerciseMatcher(names)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        timings = []
+        for sentence in SENTENCES:
+            started = time.perf_counter()
+            for _ in range(200):
+                matcher.match(sentence)
+            timings.append((time.perf_counter() - started) / 200 * 1_000_000)
+        long_text = ' '.join(SENTENCES) * 10
+        started = time.perf_counter()
+        matcher.find(long_text)
+        long_us = (time.perf_counter() - started) * 1_000_000
+
+        print(f"catalog {len(names):6}: build {build_ms:8.1f} ms, match "
+              + ', '.join(f"{t:7.1f}" for t in timings)
+              + f" µs, exact scan of {len(long_text)} chars {long_us:7.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Порівнює запис підходів окремими транзакціями та груповим комітом.
+
+Багато користувачів одночасно записують підходи; вимірюються коміти на
+секунду, підходи на секунду і затримка підтвердження (від виклику до коміту).
+
+Запуск: python benchmarks/bench_group_commit.py --users 200 --sets 20
+        python benchmarks/bench_group_commit.py --synchronous FULL   # fsync на кожен коміт
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_database import AsyncDatabaseManager
+from database import DatabaseManager
+import config
+
+
+def make_db(path: str, synchronous: str) -> DatabaseManager:
+    class BenchDatabaseManager(DatabaseManager):
+        PRAGMAS = tuple(
+            f"PRAGMA synchronous = {synchronous}" if pragma.startswith("PRAGMA synchronous") else pragma
+            for pragma in DatabaseManager.PRAGMAS
+        )
+    return BenchDatabaseManager(path)
+
+
+async def run_mode(args, group_commit: bool):
+    path = os.path.join(tempfile.mkdtemp(), "group_commit.db")
+    db = make_db(path, args.synchronous)
+    adb = AsyncDatabaseManager(db, group_commit=group_commit)
+    if adb.set_writer:
+        adb.set_writer.flush_interval = args.interval / 1000
+        adb.set_writer.max_rows = args.max_rows
+
+    workouts = []
+    for index in range(args.users):
+        user_id = db.add_user(telegram_id=index + 1)
+        workouts.append(db.start_workout(user_id))
+    db.get_all_exercises()
+
+    latencies = []
+
+    async def user_session(workout_id: int):
+        for number in range(1, args.sets + 1):
+            started = time.perf_counter()
+            await adb.add_sets(workout_id, [{'exercise': 'віджимання', 'reps': 10, 'set_number': number}])
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(args.think / 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user_session(workout_id) for workout_id in workouts))
+    elapsed = time.perf_counter() - started
+
+    with db.connection() as conn:
+        written = conn.execute("SELECT COUNT(*) FROM sets").fetchone()[0]
+    total = args.users * args.sets
+    assert written == total, f"записано {written} з {total}"
+
+    commits = adb.set_writer.flushes if adb.set_writer else total
+    latencies.sort()
+    name = "груповий" if group_commit else "окремі транзакції"
+    print(f"{name:>18}: {commits / elapsed:8.0f} комітів/с  {total / elapsed:8.0f} підходів/с  "
+          f"p50={latencies[len(latencies) // 2] * 1000:6.1f} мс  "
+          f"p95={latencies[int(len(latencies) * 0.95)] * 1000:6.1f} мс")
+    if adb.set_writer:
+        stats = adb.set_writer.stats()
+        print(f"{'':>18}  скидань {stats['flushes']}, в середньому {stats['avg_flush_size']:.1f} рядків "
+              f"(макс {stats['max_flush_size']}), коміт p95 {stats['commit_ms_p95']:.1f} мс")
+        await adb.set_writer.stop()
+    adb.close()
+
+
+async def run(args):
+    print(f"{args.users} користувачів × {args.sets} підходів, synchronous={args.synchronous}")
+    await run_mode(args, group_commit=False)
+    await run_mode(args, group_commit=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--sets', type=int, default=20)
+    parser.add_argument('--think', type=float, default=1.0, help="пауза між підходами користувача, мс")
+    parser.add_argument('--interval', type=float, default=config.GROUP_COMMIT_INTERVAL * 1000, help="вікно скидання, мс")
+    parser.add_argument('--max-rows', type=int, default=config.GROUP_COMMIT_MAX_ROWS)
+    parser.add_argument('--synchronous', choices=['OFF', 'NORMAL', 'FULL'], default='NORMAL')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Експорт та імпорт історії одного користувача з мільйоном підходів.
+
+Експорт: потоковий (iter_user_sets → write_csv/write_json у файл) проти
+fetchall() усієї історії з подальшим записом; для кожного — час і піковий
+обсяг пам'яті Python (tracemalloc).
+Імпорт: експортований CSV у нову базу пачками різного розміру; для
+порівняння — по транзакції на рядок на перших --baseline-rows рядках.
+
+Запуск: python benchmarks/bench_history_io.py --sets 1000000
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from history_io import READERS, WRITERS, import_history
+from benchmarks.bench_indexes import generate
+
+TELEGRAM_ID = 0  # generate() створює користувачів з telegram_id 0..users-1
+
+MATERIALIZED_SQL = '''
+    SELECT w.id, w.start_time, w.end_time, e.name, s.reps, s.weight, s.set_number, s.timestamp
+    FROM workouts w
+    JOIN sets s ON s.workout_id = w.id
+    JOIN exercises e ON e.id = s.exercise_id
+    WHERE w.user_id = ?
+    ORDER BY w.id, s.timestamp, s.id
+'''
+
+
+def traced(func):
+    """(результат, секунди, пік пам'яті в МБ)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def export_streaming(db: DatabaseManager, user_id: int, fmt: str, path: str) -> int:
+    with open(path, 'w', encoding='utf-8', newline='') as stream:
+        return WRITERS[fmt](db.iter_user_sets(user_id), stream)
+
+
+def export_materialized(db: DatabaseManager, user_id: int, fmt: str, path: str) -> int:
+    with db.connection() as conn:
+        rows = conn.execute(MATERIALIZED_SQL, (user_id,)).fetchall()
+    with open(path, 'w', encoding='utf-8', newline='') as stream:
+        return WRITERS[fmt](rows, stream)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sets', type=int, default=1_000_000)
+    parser.add_argument('--sets-per-workout', type=int, default=20)
+    parser.add_argument('--chunk-sizes', default="1000,5000,20000", help="розміри пачок імпорту через кому")
+    parser.add_argument('--baseline-rows', type=int, default=20000, help="рядків для імпорту по одному")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    workdir = tempfile.mkdtemp()
+    db = DatabaseManager(os.path.join(workdir, "source.db"))
+    started = time.perf_counter()
+    generate(db, args.sets, users=1, sets_per_workout=args.sets_per_workout)
+    user_id = db.get_user_id(TELEGRAM_ID)
+    print(f"Згенеровано {args.sets} підходів за {time.perf_counter() - started:.1f} с ({workdir})")
+
+    print("\nЕкспорт:")
+    for fmt in ('csv', 'json'):
+        for name, export in (('потоковий', export_streaming), ('fetchall', export_materialized)):
+            path = os.path.join(workdir, f"{name}.{fmt}")
+            # Час без tracemalloc (він сповільнює алокації), пам'ять — окремим прогоном
+            started = time.perf_counter()
+            count = export(db, user_id, fmt, path)
+            elapsed = time.perf_counter() - started
+            _, _, peak = traced(lambda: export(db, user_id, fmt, path))
+            size = os.path.getsize(path) / 2 ** 20
+            print(f"  {fmt:4} {name:10}: {count} рядків за {elapsed:.2f} с ({count / elapsed:,.0f}/с), "
+                  f"пік пам'яті {peak:.1f} МБ, файл {size:.1f} МБ")
+
+    source = os.path.join(workdir, "потоковий.csv")
+    print("\nІмпорт CSV:")
+    target = DatabaseManager(os.path.join(workdir, "baseline.db"))
+    with open(source, encoding='utf-8', newline='') as stream:
+        rows = islice(READERS['csv'](stream), args.baseline_rows)
+        started = time.perf_counter()
+        result = import_history(target, rows, telegram_id=TELEGRAM_ID, chunk_size=1)
+        elapsed = time.perf_counter() - started
+    print(f"  по одному рядку: {result['imported']} рядків за {elapsed:.2f} с ({result['imported'] / elapsed:,.0f}/с)")
+    target.close()
+
+    for chunk_size in (int(size) for size in args.chunk_sizes.split(',')):
+        target = DatabaseManager(os.path.join(workdir, f"import-{chunk_size}.db"))
+        with open(source, encoding='utf-8', newline='') as stream:
+            started = time.perf_counter()
+            result = import_history(target, READERS['csv'](stream), telegram_id=TELEGRAM_ID, chunk_size=chunk_size)
+            elapsed = time.perf_counter() - started
+        with target.connection() as conn:
+            stored = conn.execute("SELECT COUNT(*) FROM sets").fetchone()[0]
+        print(f"  пачки по {chunk_size}: {result['imported']} рядків за {elapsed:.2f} с "
+              f"({result['imported'] / elapsed:,.0f}/с), у базі {stored}, відхилено {result['rejected']}")
+        target.close()
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Плани та час гарячих запитів до і після міграції з індексами.
+
+Генерує базу з мільйоном підходів, відкочує її до версії схеми 1 (без індексів),
+вимірює запити, а потім дає DatabaseManager застосувати міграції й вимірює знову.
+
+Запуск: python benchmarks/bench_indexes.py --sets 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+
+HOT_QUERIES = {
+    'get_active_workout': (
+        "SELECT id FROM workouts WHERE user_id = ? AND status = 'active'"
+    ),
+    'finish_workout sets': (
+        "SELECT e.name, s.reps, s.weight, s.set_number FROM sets s "
+        "JOIN exercises e ON s.exercise_id = e.id WHERE s.workout_id = ? ORDER BY s.timestamp"
+    ),
+    'stats sets/reps': (
+        "SELECT COUNT(*), SUM(s.reps) FROM sets s JOIN workouts w ON s.workout_id = w.id "
+        "WHERE w.user_id = ? AND w.status = 'completed'"
+    ),
+    'stats top exercises': (
+        "SELECT e.name, COUNT(*) as cnt FROM sets s JOIN exercises e ON s.exercise_id = e.id "
+        "JOIN workouts w ON s.workout_id = w.id WHERE w.user_id = ? AND w.status = 'completed' "
+        "GROUP BY e.name ORDER BY cnt DESC LIMIT 3"
+    ),
+}
+DROP_INDEXES = ("DROP INDEX IF EXISTS idx_workouts_user_status", "DROP INDEX IF EXISTS idx_sets_workout")
+
+
+def generate(db: DatabaseManager, total_sets: int, users: int, sets_per_workout: int):
+    rng = random.Random(42)
+    workouts = total_sets // sets_per_workout
+    started = datetime(2024, 1, 1)
+    with db.connection() as conn:
+        conn.executemany("INSERT INTO users (telegram_id) VALUES (?)", [(i,) for i in range(users)])
+        exercise_ids = [row[0] for row in conn.execute("SELECT id FROM exercises")]
+        conn.executemany(
+            "INSERT INTO workouts (user_id, start_time, end_time, status) VALUES (?, ?, ?, 'completed')",
+            (
+                (rng.randint(1, users), started + timedelta(hours=i), started + timedelta(hours=i, minutes=50))
+                for i in range(workouts)
+            )
+        )
+        conn.executemany(
+            "INSERT INTO sets (workout_id, exercise_id, reps, weight, set_number) VALUES (?, ?, ?, ?, ?)",
+            (
+                (i // sets_per_workout + 1, rng.choice(exercise_ids), rng.randint(5, 20), rng.choice((None, 20.0, 60.0)), None)
+                for i in range(total_sets)
+            )
+        )
+        conn.execute("UPDATE workouts SET status = 'active' WHERE id IN (SELECT MAX(id) FROM workouts GROUP BY user_id)")
+
+
+def measure(db: DatabaseManager, users: int, workouts: int, repeats: int):
+    rng = random.Random(7)
+    with db.connection() as conn:
+        for name, sql in HOT_QUERIES.items():
+            param = rng.randint(1, workouts) if 'finish' in name else rng.randint(1, users)
+            plan = ' | '.join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, (param,)))
+            started = time.perf_counter()
+            for _ in range(repeats):
+                param = rng.randint(1, workouts) if 'finish' in name else rng.randint(1, users)
+                conn.execute(sql, (param,)).fetchall()
+            per_query = (time.perf_counter() - started) / repeats * 1000
+            print(f"  {name:22} {per_query:9.3f} ms   {plan}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sets', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--sets-per-workout', type=int, default=20)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+    workouts = args.sets // args.sets_per_workout
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        db = DatabaseManager(path)
+        started = time.perf_counter()
+        generate(db, args.sets, args.users, args.sets_per_workout)
+        print(f"generated {args.sets} sets / {workouts} workouts in {time.perf_counter() - started:.1f}s")
+
+        with db.connection() as conn:
+            for statement in DROP_INDEXES:
+                conn.execute(statement)
+            conn.execute("PRAGMA user_version = 1")
+            conn.execute("ANALYZE")
+        print("schema v1 (no indexes):")
+        measure(db, args.users, workouts, args.repeats)
+        db.close()
+
+        started = time.perf_counter()
+        db = DatabaseManager(path)
+        print(f"migrated to v{DatabaseManager.SCHEMA_VERSION} in {time.perf_counter() - started:.1f}s")
+        with db.connection() as conn:
+            conn.execute("ANALYZE")
+        print(f"schema v{DatabaseManager.SCHEMA_VERSION}:")
+        measure(db, args.users, workouts, args.repeats)
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
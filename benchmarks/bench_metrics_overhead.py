@@ -0,0 +1,120 @@
+"""Накладні витрати інструментування на шляху текстового повідомлення.
+
+Шлях: Старт, N повідомлень з підходами, Стоп для кожного користувача через
+WorkoutHandlers і фальшивий Telegram. За замовчуванням відповідь миттєва:
+вимірюється лише власний шлях бота, де частка метрик найбільша
+(--reply-latency додає імітовану затримку Telegram).
+
+Пряме порівняння двох процесів (METRICS_ENABLED=0/1) на спільній машині
+шумить на кілька відсотків, тому основна оцінка складається з трьох вимірів:
+скільки інструментованих викликів припадає на повідомлення (з лічильників
+гістограм), скільки коштує одна обгортка (мікробенчмарк, мінімум з повторів)
+і скільки триває повідомлення без метрик. Пряме A/B виводиться для довідки.
+Код повернення 1, якщо оцінка перевищує --max-overhead.
+
+Запуск: python benchmarks/bench_metrics_overhead.py --users 20 --messages 30 --rounds 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import asyncio, json, logging, os, sys, tempfile, time, timeit
+sys.path.insert(0, sys.argv[1])
+users, messages, reply_latency = int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4])
+logging.disable(logging.INFO)
+from async_database import AsyncDatabaseManager
+from database import DatabaseManager
+from handlers import WorkoutHandlers
+from metrics import REGISTRY, timed
+from benchmarks.fakes import FakeSpeechRecognizer, FakeTelegramClient
+
+async def run():
+    db = DatabaseManager(os.path.join(tempfile.mkdtemp(), "overhead.db"))
+    handlers = WorkoutHandlers(db=AsyncDatabaseManager(db, group_commit=False), speech_recognizer=FakeSpeechRecognizer())
+    client = FakeTelegramClient(reply_latency=reply_latency)
+    script = ["🏁 Старт тренування"] + [f"віджимання {10 + i % 5} разів, прес 20 разів" for i in range(messages)] + ["⏹️ Стоп тренування"]
+    callback = handlers.user_locks.serialized(handlers.handle_button_press)
+    started = time.perf_counter()
+    for user in range(users):
+        for text in script:
+            await callback(client.update(1000 + user, text), None)
+    elapsed = time.perf_counter() - started
+    handlers.db.close()
+    return elapsed, users * len(script)
+
+elapsed, total = asyncio.run(run())
+calls = {"sync": 0, "async": 0}
+for name, family in REGISTRY.histograms.items():
+    for label, histogram in family.items():
+        kind = "async" if name == "handler_seconds" else "sync"
+        calls[kind] += histogram.snapshot()[1]
+
+def plain(): pass
+async def plain_async(): pass
+wrapped, wrapped_async = timed("bench")(plain), timed("bench")(plain_async)
+def wrapper_cost(func, number=100000):
+    return min(timeit.repeat(func, number=number, repeat=7)) / number
+async def await_loop(func, number=100000):
+    best = None
+    for _ in range(7):
+        started = time.perf_counter()
+        for _ in range(number):
+            await func()
+        spent = (time.perf_counter() - started) / number
+        best = spent if best is None else min(best, spent)
+    return best
+costs = {"sync": max(0.0, wrapper_cost(wrapped) - wrapper_cost(plain))}
+costs["async"] = max(0.0, asyncio.run(await_loop(wrapped_async)) - asyncio.run(await_loop(plain_async)))
+print(json.dumps({"per_message": elapsed / total, "calls": {k: v / total for k, v in calls.items()}, "costs": costs}))
+'''
+
+
+def run_once(enabled: bool, args) -> dict:
+    env = dict(os.environ, METRICS_ENABLED='1' if enabled else '0')
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, ROOT, str(args.users), str(args.messages), str(args.reply_latency)],
+        capture_output=True, text=True, env=env, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--messages', type=int, default=30)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--reply-latency', type=float, default=0.0, help="затримка відповіді Telegram, с")
+    parser.add_argument('--max-overhead', type=float, default=1.0, help="допустимі накладні витрати, %%")
+    args = parser.parse_args()
+
+    baseline, instrumented = [], []
+    for _ in range(args.rounds):
+        baseline.append(run_once(False, args))
+        instrumented.append(run_once(True, args))
+
+    base = statistics.median(result["per_message"] for result in baseline)
+    with_metrics = statistics.median(result["per_message"] for result in instrumented)
+    calls = instrumented[-1]["calls"]
+    costs = {kind: statistics.median(result["costs"][kind] for result in instrumented) for kind in ("sync", "async")}
+    added = calls["sync"] * costs["sync"] + calls["async"] * costs["async"]
+    estimate = added / base * 100
+
+    print(f"повідомлення без метрик: {base * 1e6:9.1f} мкс (медіана з {args.rounds}, reply_latency={args.reply_latency} с)")
+    print(f"інструментованих викликів на повідомлення: {calls['sync']:.1f} синхронних, {calls['async']:.1f} async")
+    print(f"ціна обгортки: {costs['sync'] * 1e9:.0f} нс синхронна, {costs['async'] * 1e9:.0f} нс async")
+    print(f"оцінка накладних витрат: {added * 1e6:.2f} мкс на повідомлення = {estimate:.2f}%")
+    print(f"пряме A/B (для довідки, з шумом): {(with_metrics - base) / base * 100:+.2f}%")
+    if estimate > args.max_overhead:
+        print(f"❌ Більше за {args.max_overhead}%")
+        sys.exit(1)
+    print(f"✅ У межах {args.max_overhead}%")
+
+
+if __name__ == "__main__":
+    main()
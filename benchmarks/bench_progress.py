@@ -0,0 +1,135 @@
+"""Аналітика /progress: векторний розрахунок NumPy проти циклу по рядках.
+
+Генерує історію одного користувача, звіряє compute_progress з простим
+еталоном на чистому Python і міряє час завантаження та розрахунку.
+
+Запуск: python benchmarks/bench_progress.py --sets 200000
+"""
+import argparse
+import logging
+import math
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from progress import EPOCH, compute_progress, load_history, week_start
+from benchmarks.bench_indexes import generate
+
+TODAY = date(2024, 6, 1)
+
+
+def reference_progress(rows, names, weeks: int = 8, trend_weeks: int = 12, limit: int = 10, today: date = TODAY):
+    """Той самий результат циклом по рядках — для перевірки і порівняння швидкості"""
+    current_week = ((today - EPOCH).days + 3) // 7
+    per_exercise = defaultdict(lambda: {'sets': 0, 'best_weight': 0.0, 'best_reps': 0, 'best_1rm': 0.0})
+    weekly_best = defaultdict(float)
+    volume = [0.0] * weeks
+    for exercise_id, reps, weight, day in rows:
+        week = (day + 3) // 7
+        one_rm = 0.0
+        if weight > 0:
+            one_rm = weight if reps == 1 else weight * (1 + reps / 30.0)
+        record = per_exercise[exercise_id]
+        record['sets'] += 1
+        record['best_weight'] = max(record['best_weight'], weight)
+        record['best_reps'] = max(record['best_reps'], reps)
+        record['best_1rm'] = max(record['best_1rm'], one_rm)
+        if one_rm > 0 and current_week - trend_weeks < week <= current_week:
+            key = (exercise_id, week - (current_week - trend_weeks + 1))
+            weekly_best[key] = max(weekly_best[key], one_rm)
+        offset = week - (current_week - weeks + 1)
+        if 0 <= offset < weeks:
+            volume[offset] += reps * weight
+
+    ordered = sorted(per_exercise, key=lambda exercise_id: (-per_exercise[exercise_id]['sets'], exercise_id))
+    records = [
+        {'exercise': names[exercise_id], 'sets': per_exercise[exercise_id]['sets'],
+         'best_weight': per_exercise[exercise_id]['best_weight'], 'best_reps': per_exercise[exercise_id]['best_reps'],
+         'best_1rm': round(per_exercise[exercise_id]['best_1rm'], 1)}
+        for exercise_id in ordered[:limit]
+    ]
+    points = defaultdict(list)
+    for (exercise_id, x), best in sorted(weekly_best.items()):
+        points[exercise_id].append((x, best))
+    trend = []
+    for exercise_id in ordered:
+        series = points.get(exercise_id, [])
+        if len(series) < 2:
+            continue
+        n = len(series)
+        sum_x = sum(x for x, _ in series)
+        sum_y = sum(y for _, y in series)
+        sum_xy = sum(x * y for x, y in series)
+        sum_xx = sum(x * x for x, _ in series)
+        denominator = n * sum_xx - sum_x ** 2
+        slope = (n * sum_xy - sum_x * sum_y) / denominator if denominator > 0 else 0.0
+        trend.append({'exercise': names[exercise_id], 'latest_1rm': round(series[-1][1], 1),
+                      'slope_per_week': round(slope, 2), 'weeks': n})
+    return {
+        'total_sets': sum(record['sets'] for record in per_exercise.values()),
+        'records': records,
+        'trend': trend[:limit],
+        'weekly_volume': [
+            (week_start(current_week - weeks + 1 + index).isoformat(), round(value, 1))
+            for index, value in enumerate(volume)
+        ],
+    }
+
+
+def same(expected, actual) -> bool:
+    if isinstance(expected, dict):
+        return expected.keys() == actual.keys() and all(same(expected[key], actual[key]) for key in expected)
+    if isinstance(expected, (list, tuple)):
+        return len(expected) == len(actual) and all(same(a, b) for a, b in zip(expected, actual))
+    if isinstance(expected, float):
+        return math.isclose(expected, actual, rel_tol=1e-9, abs_tol=0.051)
+    return expected == actual
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sets', type=int, default=200000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    db = DatabaseManager(os.path.join(tempfile.mkdtemp(), "progress.db"))
+    generate(db, args.sets, users=1, sets_per_workout=20)
+    # generate() кладе тренування щогодини з 2024-01-01 — розтягуємо їх на пів року
+    with db.connection() as conn:
+        conn.execute("UPDATE workouts SET start_time = datetime('2024-01-01', '+' || (id * 180 / (SELECT MAX(id) FROM workouts)) || ' days')")
+    user_id = db.get_user_id(0)
+    names = db.catalog.names_by_id
+    rows = list(db.iter_progress_rows(user_id))
+
+    history = load_history(rows)
+    vectorized = compute_progress(history, names, today=TODAY)
+    reference = reference_progress(rows, names)
+    matches = same(reference, vectorized)
+    print(f"Збіг з еталоном: {'так' if matches else 'НІ'}")
+
+    def best_of(func):
+        timings = []
+        for _ in range(args.repeats):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return min(timings) * 1000
+
+    print(f"Підходів: {len(rows)}")
+    print(f"  завантаження з бази (fromiter): {best_of(lambda: load_history(db.iter_progress_rows(user_id))):8.1f} мс")
+    print(f"  розрахунок NumPy:               {best_of(lambda: compute_progress(history, names, today=TODAY)):8.1f} мс")
+    print(f"  розрахунок циклом Python:       {best_of(lambda: reference_progress(rows, names)):8.1f} мс")
+    db.close()
+    if not matches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Статистика за період: денні/тижневі підсумки проти прямого проходу по sets.
+
+Генерує історію (тренування щогодини, кілька років), перебудовує підсумки
+і міряє запити за місяць для одного користувача та за рік для всіх — спершу
+лише з денними рядками, потім після ущільнення старих днів у тижні.
+
+Запуск: python benchmarks/bench_rollups.py --sets 1000000
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from benchmarks.bench_indexes import generate
+
+DIRECT_SQL = '''
+    SELECT COUNT(DISTINCT w.id), COUNT(s.id), COALESCE(SUM(s.reps), 0), COALESCE(SUM(s.reps * COALESCE(s.weight, 0)), 0)
+    FROM workouts w
+    JOIN sets s ON s.workout_id = w.id
+    WHERE w.status = 'completed' AND w.start_time >= ? AND w.start_time < ? {user_filter}
+'''
+
+RANGES = (
+    ("місяць, один користувач", 1, '2025-03-01', '2025-04-01'),
+    # Понеділок — понеділок: після ущільнення рахується з тижневих рядків без захоплення зайвих днів
+    ("рік, усі користувачі", 0, '2024-01-01', '2024-12-30'),
+)
+
+
+def direct(db: DatabaseManager, user_id: int, start: str, end: str):
+    sql = DIRECT_SQL.format(user_filter="AND w.user_id = ?" if user_id else "")
+    params = (start, end, user_id) if user_id else (start, end)
+    with db.connection() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def best_of(func, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def report(db: DatabaseManager, repeats: int) -> bool:
+    """Час обох варіантів; False, якщо хоч один діапазон не збігся з прямим запитом"""
+    all_match = True
+    for title, user_id, start, end in RANGES:
+        stats = db.get_range_statistics(user_id, start, end)
+        workouts, sets_count, reps, _ = direct(db, user_id, start, end)
+        match = (stats['workouts'], stats['sets'], stats['reps']) == (workouts, sets_count, reps)
+        rollup_ms = best_of(lambda: db.get_range_statistics(user_id, start, end), repeats)
+        direct_ms = best_of(lambda: direct(db, user_id, start, end), repeats)
+        print(f"  {title:26}: підсумки {rollup_ms:7.2f} мс, прямий запит {direct_ms:8.2f} мс "
+              f"(x{direct_ms / rollup_ms:.0f}), збіг: {'так' if match else 'НІ'}")
+        all_match = all_match and match
+    return all_match
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sets', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    db = DatabaseManager(os.path.join(tempfile.mkdtemp(), "rollups.db"))
+    started = time.perf_counter()
+    generate(db, args.sets, users=args.users, sets_per_workout=20)
+    db.rebuild_statistics()
+    print(f"Згенеровано {args.sets} підходів і підсумки за {time.perf_counter() - started:.1f} с")
+
+    print("Лише денні підсумки:")
+    matches = report(db, args.repeats)
+    # Ущільнюємо все до 2025-01-06: місяць 2025 лишається на денних рядках, рік 2024 — на тижневих
+    moved = db.compact_rollups('2025-01-06')
+    print(f"Після ущільнення ({moved} денних рядків у тижневі):")
+    matches = report(db, args.repeats) and matches
+    db.close()
+    if not matches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
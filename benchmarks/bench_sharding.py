@@ -0,0 +1,74 @@
+"""Пропускна здатність запису: одна база проти N шардів.
+
+Кожен користувач пише підходи окремими транзакціями через AsyncDatabaseManager
+(один потік-записувач на шард). Для --synchronous FULL різниця найпомітніша:
+коміти різних шардів синхронізуються з диском паралельно.
+
+Запуск: python benchmarks/bench_sharding.py --users 200 --sets 20 --shards 1 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_database import AsyncDatabaseManager
+from database import DatabaseManager
+from sharding import ShardedDatabaseManager, open_database
+
+
+def set_synchronous(synchronous: str):
+    DatabaseManager.PRAGMAS = tuple(
+        f"PRAGMA synchronous = {synchronous}" if pragma.startswith("PRAGMA synchronous") else pragma
+        for pragma in DatabaseManager.PRAGMAS
+    )
+
+
+async def run_layout(args, shards: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    adb = AsyncDatabaseManager(open_database(path, shards), group_commit=False)
+
+    async def user_session(telegram_id: int):
+        user_id = await adb.add_user(telegram_id)
+        workout_id = await adb.start_workout(user_id)
+        for number in range(1, args.sets + 1):
+            await adb.add_sets(workout_id, [{'exercise': 'присідання', 'reps': 12, 'set_number': number}])
+        await adb.finish_workout(workout_id)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user_session(100000 + index) for index in range(args.users)))
+    elapsed = time.perf_counter() - started
+
+    total = args.users * args.sets
+    per_shard = ""
+    if isinstance(adb.db, ShardedDatabaseManager):
+        per_shard = f"  користувачів по шардах: {adb.db.global_statistics()['users_per_shard']}"
+    print(f"шардів {shards:>2}: {total / elapsed:8.0f} підходів/с за {elapsed:.2f} с{per_shard}")
+    adb.close()
+
+
+async def run(args):
+    print(f"{args.users} користувачів × {args.sets} підходів, synchronous={args.synchronous}")
+    for shards in args.shards:
+        await run_layout(args, shards)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--sets', type=int, default=20)
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--synchronous', choices=['OFF', 'NORMAL', 'FULL'], default='FULL')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    set_synchronous(args.synchronous)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
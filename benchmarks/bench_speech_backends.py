@@ -0,0 +1,59 @@
+"""Затримка рушіїв розпізнавання на однакових аудіофайлах.
+
+Запуск: python benchmarks/bench_speech_backends.py --fixtures path/to/ogg_dir --backends stub,local,openai
+Рушії, які не вдалося створити (немає ключа, моделі чи пакета), пропускаються.
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from speech_backends import create_backend
+
+
+def load_fixtures(directory: str):
+    paths = sorted(glob.glob(os.path.join(directory, '*.ogg')) + glob.glob(os.path.join(directory, '*.wav')))
+    fixtures = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            fixtures.append((os.path.basename(path), f.read()))
+    return fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--fixtures', required=True, help="каталог з .ogg/.wav файлами")
+    parser.add_argument('--backends', default='stub,local,openai')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        sys.exit(f"У {args.fixtures} немає аудіофайлів")
+
+    for name in args.backends.split(','):
+        try:
+            backend = create_backend(name, **config.speech_backend_options(name))
+        except Exception as e:
+            print(f"{name:8} skipped: {e}")
+            continue
+
+        latencies = []
+        for fixture_name, audio in fixtures:
+            for _ in range(args.repeats):
+                started = time.perf_counter()
+                text = backend.transcribe(audio)
+                latencies.append((time.perf_counter() - started) * 1000)
+            print(f"{name:8} {fixture_name:24} {text!r}")
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"{name:8} p50 {statistics.median(latencies):9.1f} ms   p95 {p95:9.1f} ms   n={len(latencies)}")
+
+
+if __name__ == '__main__':
+    main()
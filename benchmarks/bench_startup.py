@@ -0,0 +1,75 @@
+"""Час запуску бота: імпорти, ініціалізація бази й обробників до першого запиту getUpdates.
+
+Кожен замір — окремий свіжий інтерпретатор (холодні імпорти), база вже
+існує (звичайний перезапуск). Мережа не потрібна: вимірюється все до виклику
+run_polling. Код повернення 1, якщо медіана перевищує --target або під час
+запуску завантажився хоч один важкий модуль (openai, faster_whisper, numpy).
+
+Запуск: python benchmarks/bench_startup.py --runs 5 --target 1.0
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Виконується в дочірньому процесі; друкує тривалість кожного етапу в секундах
+CHILD = r'''
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import main
+imported = time.perf_counter()
+app = main.build_application("123456:TEST-TOKEN")
+built = time.perf_counter()
+print(json.dumps({
+    "imports": imported - started,
+    "init": built - imported,
+    "total": built - started,
+    "heavy_modules": sorted(name for name in ("openai", "faster_whisper", "numpy") if name in sys.modules),
+}))
+'''
+
+
+def run_once(db_path: str) -> dict:
+    env = dict(os.environ, DB_PATH=db_path, TELEGRAM_BOT_TOKEN="123456:TEST-TOKEN")
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, ROOT],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(db_path), check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--target', type=float, default=1.0, help="ціль для медіани повного запуску, с")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "startup.db")
+    first = run_once(db_path)
+    print(f"перший запуск (створення бази): {first['total'] * 1000:.0f} мс")
+
+    results = [run_once(db_path) for _ in range(args.runs)]
+    for phase in ("imports", "init", "total"):
+        values = [result[phase] * 1000 for result in results]
+        print(f"{phase:>8}: медіана {statistics.median(values):7.1f} мс, макс {max(values):7.1f} мс")
+    heavy = results[-1]["heavy_modules"]
+    print(f"важкі модулі, завантажені під час запуску: {', '.join(heavy) if heavy else 'немає'}")
+
+    median_total = statistics.median(result["total"] for result in results)
+    if median_total > args.target:
+        print(f"❌ Медіана {median_total:.2f} с перевищує ціль {args.target:.2f} с")
+        sys.exit(1)
+    if heavy:
+        print("❌ Важкі модулі мають завантажуватися лише при першому використанні")
+        sys.exit(1)
+    print(f"✅ Медіана {median_total:.2f} с у межах цілі {args.target:.2f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Мікробенчмарк TextParser.parse_exercise_input.
+
+Спершу звіряє результати з еталонним корпусом (parser_golden.json, записаним
+зі старого парсера на регулярних виразах), потім міряє звичайні та
+зловмисно довгі повідомлення без ключових слів.
+
+Запуск: python benchmarks/bench_text_parser.py
+"""
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_parser import TextParser, MAX_INPUT_LENGTH
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parser_golden.json')
+
+TYPICAL = [
+    "Віджимання, 15 разів, 1 підхід",
+    "Виконав жим лежачи, 12 разів, другий підхід, 80 кг",
+    "Зробив віджимання 15 разів, перший підхід",
+    "тяга штанги 8 повторень 100 кг",
+]
+
+# Старий вираз для кількості повторень — лише для порівняння у звіті
+LEGACY_REPS_PATTERN = r'([\d\.,]+|\w+(?:\s\w+)*)\s*(?:раз|разів|повторень|повторення)'
+
+
+def check_golden(parser: TextParser) -> int:
+    with open(GOLDEN_PATH, encoding='utf-8') as f:
+        corpus = json.load(f)
+    mismatches = 0
+    for case in corpus:
+        got = parser.parse_exercise_input(case['input'])
+        if got != case['expected']:
+            mismatches += 1
+            print(f"  MISMATCH {case['input']!r}: {got} != {case['expected']}")
+    print(f"golden corpus: {len(corpus) - mismatches}/{len(corpus)} match")
+    return mismatches
+
+
+def time_call(func, arg, repeats: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeats):
+        func(arg)
+    return (time.perf_counter() - started) / repeats * 1_000_000
+
+
+def main():
+    parser = TextParser()
+    if check_golden(parser):
+        sys.exit(1)
+
+    print("typical inputs:")
+    for text in TYPICAL:
+        print(f"  {time_call(parser.parse_exercise_input, text, 2000):8.1f} µs  {text}")
+
+    print("adversarial inputs (words without keywords):")
+    for length in (100, 250, 500, MAX_INPUT_LENGTH):
+        text = ("віджимання " * (length // 11 + 1))[:length]
+        new = time_call(parser.parse_exercise_input, text, 50)
+        legacy = time_call(lambda t: re.search(LEGACY_REPS_PATTERN, t), text, 5)
+        print(f"  {length:5} chars: parser {new:10.1f} µs   legacy reps regex alone {legacy:12.1f} µs")
+
+    logging.disable(logging.WARNING)
+    oversized = "а " * MAX_INPUT_LENGTH
+    print(f"  {len(oversized):5} chars: rejected by length guard in "
+          f"{time_call(parser.parse_exercise_input, oversized, 1000):.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Перевіряє, що голосові повідомлення не блокують цикл подій.
+
+Запуск: python benchmarks/bench_transcription_queue.py
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcription_queue import TranscriptionQueue, TranscriptionQueueFull, TranscriptionTimeout
+from benchmarks.fakes import FakeSpeechRecognizer
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run(args):
+    recognizer = FakeSpeechRecognizer(latency=args.latency)
+    queue = TranscriptionQueue(
+        recognizer,
+        workers=args.workers,
+        max_size=args.queue_size,
+        timeout=args.timeout
+    )
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+
+    async def voice_message():
+        try:
+            return 'ok' if await queue.submit(b'\x00' * 1024) else 'empty'
+        except TranscriptionQueueFull:
+            return 'busy'
+        except TranscriptionTimeout:
+            return 'timeout'
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(voice_message() for _ in range(args.messages)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    worst_lag = await lag_task
+    await queue.stop()
+
+    print(f"messages={args.messages} workers={args.workers} queue={args.queue_size} latency={args.latency}s")
+    for outcome in ('ok', 'busy', 'timeout', 'empty'):
+        print(f"  {outcome:8} {outcomes.count(outcome)}")
+    print(f"  elapsed   {elapsed:.2f}s")
+    print(f"  max event loop lag {worst_lag * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=30)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--queue-size', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.3)
+    parser.add_argument('--timeout', type=float, default=5.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Планувальник розпізнавання проти фальшивого сервера з 429 і затримками.
+
+Справжній OpenAIBackend (SDK openai) звертається до локального
+FakeWhisperServer. Надсилається суміш коротких і довгих голосових;
+виводиться частка успішних, затримки p50/p95 за класами, кількість повторів і
+429. Порівняйте з --no-limit (без маркерного відра): повторів і 429 більше.
+
+Запуск: python benchmarks/bench_transcription_scheduler.py --messages 60 --rpm 120
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speech_backends import OpenAIBackend
+from speech_recognition import SpeechRecognizer
+from transcription_queue import TranscriptionQueue, TranscriptionQueueFull, TranscriptionTimeout, TranscriptionUnavailable
+from benchmarks.fake_whisper_server import FakeWhisperServer
+
+SHORT_SECONDS = 3
+LONG_SECONDS = 45
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run(args, server: FakeWhisperServer):
+    recognizer = SpeechRecognizer(
+        backend=OpenAIBackend(api_key="test", base_url=server.base_url, timeout=args.timeout),
+        preprocessor=None
+    )
+    queue = TranscriptionQueue(
+        recognizer,
+        workers=args.workers,
+        max_size=args.messages,
+        timeout=args.timeout,
+        slo_per_audio_second=0.5,
+        rate_limit=0 if args.no_limit else args.rpm,
+        burst=args.burst
+    )
+
+    results = {'short': [], 'long': []}
+    outcomes = {}
+
+    async def voice_message(kind: str):
+        seconds = SHORT_SECONDS if kind == 'short' else LONG_SECONDS
+        audio = os.urandom(seconds * 2000)
+        started = time.perf_counter()
+        try:
+            await queue.submit(audio, duration=seconds)
+            outcome = 'ok'
+            results[kind].append(time.perf_counter() - started)
+        except TranscriptionTimeout:
+            outcome = 'timeout'
+        except (TranscriptionUnavailable, TranscriptionQueueFull):
+            outcome = 'unavailable'
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    kinds = ['long' if random.random() < args.long_share else 'short' for _ in range(args.messages)]
+    started = time.perf_counter()
+    await asyncio.gather(*(voice_message(kind) for kind in kinds))
+    elapsed = time.perf_counter() - started
+    await queue.stop()
+
+    print(f"повідомлень {args.messages} за {elapsed:.1f} с: {outcomes}")
+    for kind, latencies in results.items():
+        print(f"  {kind:>5}: {len(latencies):3d} успішних, p50={percentile(latencies, 0.5):.2f} с, "
+              f"p95={percentile(latencies, 0.95):.2f} с")
+    print(f"  планувальник: {queue.stats()}")
+    print(f"  відповіді сервера: {dict(sorted(server.counts.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=60)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rpm', type=float, default=120, help="ліміт сервера і відра, запитів/хв")
+    parser.add_argument('--burst', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=30.0, help="базовий дедлайн (SLO), с")
+    parser.add_argument('--long-share', type=float, default=0.3)
+    parser.add_argument('--error-rate', type=float, default=0.05, help="частка відповідей 500")
+    parser.add_argument('--throttle-rate', type=float, default=0.05, help="частка випадкових 429")
+    parser.add_argument('--no-limit', action='store_true', help="вимкнути маркерне відро")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    server = FakeWhisperServer(rpm=args.rpm, burst=args.burst, error_rate=args.error_rate,
+                               throttle_rate=args.throttle_rate).start()
+    try:
+        asyncio.run(run(args, server))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Локальний фальшивий сервер OpenAI Whisper для перевірки планувальника розпізнавання.
+
+Відповідає на POST .../audio/transcriptions як OpenAI API. Має власний ліміт
+запитів на хвилину (понад ліміт — 429 з Retry-After), а також випадкові 429,
+500 і затримку, пропорційну розміру аудіо.
+
+Окремий запуск: python benchmarks/fake_whisper_server.py --port 8099 --rpm 60
+Далі бот: OPENAI_BASE_URL=http://127.0.0.1:8099/v1 OPENAI_API_KEY=test python main.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+
+class FakeWhisperServer:
+    def __init__(self, port: int = 0, rpm: float = 60, burst: int = 5, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, base_delay: float = 0.2, delay_per_kb: float = 0.01,
+                 text: str = "віджимання 15 разів"):
+        self.rpm = rpm
+        self.burst = burst
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.base_delay = base_delay
+        self.delay_per_kb = delay_per_kb
+        self.text = text
+        self.counts: Dict[int, int] = {}
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.port = self.httpd.server_address[1]
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def start(self) -> "FakeWhisperServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _take_token(self) -> float:
+        """0, якщо запит дозволено, інакше — скільки секунд чекати"""
+        if self.rpm <= 0:
+            return 0.0
+        rate = self.rpm / 60
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / rate
+
+    def _count(self, status: int):
+        with self._lock:
+            self.counts[status] = self.counts.get(status, 0) + 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status: int, body: dict, headers: Dict[str, str] = None):
+                server._count(status)
+                payload = json.dumps(body, ensure_ascii=False).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if not self.path.endswith('/audio/transcriptions'):
+                    self._reply(404, {'error': {'message': 'not found'}})
+                    return
+                wait = server._take_token()
+                if wait or random.random() < server.throttle_rate:
+                    self._reply(429, {'error': {'message': 'Rate limit reached', 'type': 'requests'}},
+                                {'Retry-After': f"{max(wait, 0.5):.2f}"})
+                    return
+                if random.random() < server.error_rate:
+                    self._reply(500, {'error': {'message': 'Internal server error'}})
+                    return
+                time.sleep(server.base_delay + server.delay_per_kb * len(body) / 1024)
+                self._reply(200, {'text': server.text})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--rpm', type=float, default=60)
+    parser.add_argument('--burst', type=int, default=5)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--throttle-rate', type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = FakeWhisperServer(args.port, args.rpm, args.burst, args.error_rate, args.throttle_rate)
+    print(f"Фальшивий Whisper слухає {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+import time
+from typing import Optional
+
+
+class FakeSpeechRecognizer:
+    """Імітує Whisper: блокуючий виклик з фіксованою затримкою"""
+
+    def __init__(self, latency: float = 0.5, text: str = "віджимання 15 разів"):
+        self.latency = latency
+        self.text = text
+        self.calls = 0
+
+    def transcribe_audio_sync(self, audio_data: bytes) -> Optional[str]:
+        return self.recognize(self.prepare(audio_data))
+
+    def prepare(self, audio_data: bytes) -> bytes:
+        return audio_data
+
+    def recognize(self, audio_data: bytes) -> Optional[str]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return self.text
+
+    async def transcribe_audio(self, audio_data: bytes) -> Optional[str]:
+        return await asyncio.to_thread(self.transcribe_audio_sync, audio_data)
+
+
+class FakeTelegramClient:
+    """Локальна заміна Telegram: збирає відповіді бота по чатах"""
+
+    def __init__(self, reply_latency: float = 0.0):
+        self.reply_latency = reply_latency
+        self.replies = {}
+        self._message_id = 0
+
+    def next_message_id(self) -> int:
+        self._message_id += 1
+        return self._message_id
+
+    async def send(self, chat_id: int, text: str) -> "FakeMessage":
+        if self.reply_latency:
+            await asyncio.sleep(self.reply_latency)
+        self.replies.setdefault(chat_id, []).append(text)
+        return FakeMessage(self, chat_id, text)
+
+    def update(self, telegram_id: int, text: str) -> "FakeUpdate":
+        user = FakeUser(telegram_id)
+        return FakeUpdate(user, FakeMessage(self, telegram_id, text))
+
+    def voice_update(self, telegram_id: int, audio_data: bytes, duration: int = 3) -> "FakeUpdate":
+        message = FakeMessage(self, telegram_id, None)
+        message.voice = FakeVoice(audio_data, duration)
+        return FakeUpdate(FakeUser(telegram_id), message)
+
+
+class FakeUser:
+    def __init__(self, telegram_id: int):
+        self.id = telegram_id
+        self.username = f"user{telegram_id}"
+        self.first_name = f"User {telegram_id}"
+
+
+class FakeMessage:
+    def __init__(self, client: FakeTelegramClient, chat_id: int, text: str):
+        self.client = client
+        self.chat_id = chat_id
+        self.message_id = client.next_message_id()
+        self.text = text
+        self.voice = None
+
+    async def reply_text(self, text: str, **kwargs) -> "FakeMessage":
+        return await self.client.send(self.chat_id, text)
+
+    async def delete(self):
+        return True
+
+
+class FakeVoice:
+    """Голосове: file_unique_id залежить від вмісту, як у Telegram для того самого файлу"""
+
+    def __init__(self, audio_data: bytes, duration: int = 3):
+        self.audio_data = audio_data
+        self.duration = duration
+        self.file_unique_id = hashlib.sha1(audio_data).hexdigest()[:16]
+
+    async def get_file(self) -> "FakeFile":
+        return FakeFile(self.audio_data)
+
+
+class FakeFile:
+    def __init__(self, audio_data: bytes):
+        self.audio_data = audio_data
+
+    async def download_as_bytearray(self) -> bytearray:
+        return bytearray(self.audio_data)
+
+
+class FakeUpdate:
+    def __init__(self, user: FakeUser, message: FakeMessage):
+        self.effective_user = user
+        self.message = message
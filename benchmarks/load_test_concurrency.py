@@ -0,0 +1,126 @@
+"""Навантажувальний тест паралельної обробки оновлень.
+
+Багато користувачів одночасно надсилають «Старт» (двічі поспіль, як при
+подвійному натисканні), кілька підходів і «Стоп». Оновлення подаються так,
+як їх подає Application з concurrent_updates: кожне у власній задачі.
+Перевіряється, що в кожного рівно одне тренування з усіма підходами, а
+відповіді прийшли в порядку повідомлень.
+
+Запуск: python benchmarks/load_test_concurrency.py --users 500 --sets 5
+        python benchmarks/load_test_concurrency.py --no-locks   # показує гонки
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_database import AsyncDatabaseManager
+from database import DatabaseManager
+from handlers import WorkoutHandlers
+from benchmarks.fakes import FakeSpeechRecognizer, FakeTelegramClient
+
+START = "🏁 Старт тренування"
+STOP = "⏹️ Стоп тренування"
+SET_TEXT = "віджимання {reps} разів"
+
+
+def script(sets: int):
+    return [START, START] + [SET_TEXT.format(reps=10 + i) for i in range(sets)] + [STOP]
+
+
+def check_user(db: DatabaseManager, replies, telegram_id: int, sets: int):
+    """Повертає список знайдених проблем для одного користувача"""
+    problems = []
+    with db.connection() as conn:
+        workouts = conn.execute('''
+            SELECT w.id, w.status, COUNT(s.id), GROUP_CONCAT(s.reps)
+            FROM workouts w
+            JOIN users u ON u.id = w.user_id
+            LEFT JOIN sets s ON s.workout_id = w.id
+            WHERE u.telegram_id = ?
+            GROUP BY w.id
+        ''', (telegram_id,)).fetchall()
+    if len(workouts) != 1:
+        problems.append(f"тренувань: {len(workouts)}")
+    elif workouts[0][1] != 'completed' or workouts[0][2] != sets:
+        problems.append(f"тренування {workouts[0][1]}, підходів {workouts[0][2]}")
+
+    texts = replies.get(telegram_id, [])
+    expected = ["розпочато", "⚡"] + [f"повторень - {10 + i}" for i in range(sets)] + ["завершено"]
+    if len(texts) != len(expected) or any(
+        marker not in text for text, marker in zip(texts, expected)
+    ):
+        problems.append("порядок відповідей порушено")
+    return problems
+
+
+async def run(args):
+    path = os.path.join(tempfile.mkdtemp(), "load.db")
+    db = DatabaseManager(path)
+    handlers = WorkoutHandlers(
+        db=AsyncDatabaseManager(db, readers=args.readers),
+        speech_recognizer=FakeSpeechRecognizer()
+    )
+    client = FakeTelegramClient(reply_latency=args.reply_latency)
+    callback = handlers.handle_button_press
+    if not args.no_locks:
+        callback = handlers.user_locks.serialized(callback)
+
+    messages = script(args.sets)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def process(update):
+        async with semaphore:
+            await callback(update, None)
+
+    tasks = []
+    started = time.perf_counter()
+    # Повідомлення одного користувача надходять пачкою (швидкий набір, офлайн-черга),
+    # тож без замків його оновлення опиняються в обробці одночасно
+    for user_index in range(args.users):
+        for text in messages:
+            update = client.update(100000 + user_index, text)
+            tasks.append(asyncio.create_task(process(update)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    total = len(tasks)
+    broken = {}
+    for user_index in range(args.users):
+        telegram_id = 100000 + user_index
+        problems = check_user(db, client.replies, telegram_id, args.sets)
+        if problems:
+            broken[telegram_id] = problems
+
+    print(f"Оновлень: {total} за {elapsed:.2f} с ({total / elapsed:.0f}/с), "
+          f"concurrency={args.concurrency}, замки={'ні' if args.no_locks else 'так'}")
+    print(f"Користувачів з порушеннями: {len(broken)} з {args.users}")
+    for telegram_id, problems in list(broken.items())[:5]:
+        print(f"  {telegram_id}: {'; '.join(problems)}")
+    print(f"Замків після тесту: {len(handlers.user_locks)}")
+
+    handlers.db.close()
+    return 1 if broken and not args.no_locks else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--sets', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=64, help="як CONCURRENT_UPDATES")
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--reply-latency', type=float, default=0.005, help="затримка відповіді Telegram, с")
+    parser.add_argument('--no-locks', action='store_true', help="без UserLocks — для порівняння")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""Відтворюваний набір бенчмарків шляху повідомлення з результатами в JSON.
+
+Сценарії:
+  message_path — тисячі синтетичних користувачів проходять «Старт», кілька
+                 підходів (частина — голосом), «Стоп» і «Статистика» через
+                 WorkoutHandlers з фейковими Telegram і розпізнаванням;
+  parser       — TextParser на еталонному корпусі та багатопідхідному тексті;
+  db_small / db_large — кожен метод DatabaseManager на малій і великій базі;
+  reports      — ReportGenerator на тренуваннях різного розміру.
+
+Генератори засіяні, тож два запуски на тій самій машині порівнянні:
+  python benchmarks/run_all.py --output before.json
+  python benchmarks/run_all.py --compare before.json --threshold 15
+
+Затримки (ключі *_ms) кращі, коли менші; пропускна здатність (*_per_sec) —
+коли більша. --compare звіряє p50, середні та пропускну здатність і повертає
+код 1, якщо щось погіршилось більше порогу. Код 1 і без --compare, якщо не
+пройшла перевірка даних (збереглися не всі підходи, підсумкова статистика
+розходиться з прямими запитами, парсер розійшовся з еталонним корпусом).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config
+from async_database import AsyncDatabaseManager
+from database import DatabaseManager
+from handlers import WorkoutHandlers
+from report_generator import ReportGenerator
+from text_parser import TextParser
+from benchmarks.bench_indexes import generate
+from benchmarks.fakes import FakeSpeechRecognizer, FakeTelegramClient
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parser_golden.json')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+START = "🏁 Старт тренування"
+STOP = "⏹️ Стоп тренування"
+STATS = "📊 Статистика"
+EXERCISES = ["віджимання", "присідання", "жим лежачи", "підтягування", "прес"]
+MULTI_SET_TEXT = "віджимання 15 разів, 20 разів і ще 12 разів, присідання 25 разів 40 кг, прес 30 разів"
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 у мілісекундах"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        f"p{q}_ms": round(ordered[min(last, int(q / 100 * len(ordered)))] * 1000, 4)
+        for q in (50, 95, 99)
+    }
+
+
+def measure(func: Callable[[], Any], repeats: int) -> Dict[str, float]:
+    """Час кожного виклику окремо: p50/p95/p99 та середній у мілісекундах"""
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    result = percentiles(samples)
+    result['mean_ms'] = round(sum(samples) / len(samples) * 1000, 4)
+    return result
+
+
+# --- Шлях повідомлення -------------------------------------------------------
+
+def user_script(rng: random.Random, sets: int, voice_share: float) -> List[tuple]:
+    """Повідомлення одного користувача: ('text'|'voice', вміст)"""
+    steps = [('text', START)]
+    for index in range(sets):
+        exercise = rng.choice(EXERCISES)
+        reps = rng.randint(5, 30)
+        if rng.random() < voice_share:
+            # Частина голосових повторюється між користувачами — як пересилання
+            audio = f"voice-{rng.randint(0, 50)}" if rng.random() < 0.3 else f"voice-{rng.random()}"
+            steps.append(('voice', audio.encode()))
+        else:
+            steps.append(('text', f"{exercise} {reps} разів, {index + 1} підхід"))
+    steps += [('text', STOP), ('text', STATS)]
+    return steps
+
+
+async def message_path(args) -> Dict[str, Any]:
+    # Без обмеження частоти й зайвих відмов: міряється сам бот, а не квота OpenAI
+    config.TRANSCRIPTION_RATE_LIMIT = 0
+    config.TRANSCRIPTION_QUEUE_SIZE = max(config.TRANSCRIPTION_QUEUE_SIZE, args.users)
+    config.TRANSCRIPTION_WORKERS = args.transcription_workers
+
+    path = os.path.join(tempfile.mkdtemp(), "message_path.db")
+    db = DatabaseManager(path)
+    recognizer = FakeSpeechRecognizer(latency=args.transcription_latency)
+    handlers = WorkoutHandlers(db=AsyncDatabaseManager(db), speech_recognizer=recognizer)
+    client = FakeTelegramClient(reply_latency=args.reply_latency)
+    on_text = handlers.user_locks.serialized(handlers.handle_button_press)
+    on_voice = handlers.user_locks.serialized(handlers.handle_voice_message)
+    semaphore = asyncio.Semaphore(config.CONCURRENT_UPDATES)
+    latencies: Dict[str, List[float]] = {}
+    rng = random.Random(args.seed)
+    scripts = [user_script(rng, args.sets, args.voice_share) for _ in range(args.users)]
+
+    async def dispatch(kind: str, update) -> float:
+        async with semaphore:
+            started = time.perf_counter()
+            await (on_voice if kind == 'voice' else on_text)(update, None)
+            return time.perf_counter() - started
+
+    async def run_user(telegram_id: int, steps: List[tuple]):
+        # Замкнений цикл: наступне повідомлення — після відповіді на попереднє
+        for kind, payload in steps:
+            if kind == 'voice':
+                update, action = client.voice_update(telegram_id, payload), 'voice'
+            else:
+                update = client.update(telegram_id, payload)
+                action = {START: 'start', STOP: 'stop', STATS: 'stats'}.get(payload, 'text_set')
+            latencies.setdefault(action, []).append(await dispatch(kind, update))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_user(200000 + index, steps) for index, steps in enumerate(scripts)))
+    elapsed = time.perf_counter() - started
+    await handlers.transcription_queue.stop()
+
+    with db.connection() as conn:
+        stored_sets = conn.execute("SELECT COUNT(*) FROM sets").fetchone()[0]
+        completed = conn.execute("SELECT COUNT(*) FROM workouts WHERE status = 'completed'").fetchone()[0]
+    mismatched_stats = db.check_statistics()
+    handlers.db.close()
+
+    updates = sum(len(steps) for steps in scripts)
+    result = {
+        'users': args.users,
+        'updates': updates,
+        'elapsed_s': round(elapsed, 3),
+        'updates_per_sec': round(updates / elapsed, 1),
+        'expected_sets': args.users * args.sets,
+        'stored_sets': stored_sets,
+        'completed_workouts': completed,
+        'transcriptions': recognizer.calls,
+        'actions': {action: percentiles(samples) for action, samples in sorted(latencies.items())},
+        'failures': [],
+    }
+    if stored_sets != result['expected_sets'] or completed != args.users:
+        result['failures'].append(f"підходів {stored_sets} з {result['expected_sets']}, "
+                                  f"завершених тренувань {completed} з {args.users}")
+    if mismatched_stats:
+        result['failures'].append(f"статистика розходиться з прямими запитами у {len(mismatched_stats)} користувачів")
+    return result
+
+
+# --- Мікробенчмарки ----------------------------------------------------------
+
+def parser_micro(args) -> Dict[str, Any]:
+    parser = TextParser()
+    with open(GOLDEN_PATH, encoding='utf-8') as f:
+        golden = json.load(f)
+    corpus = [case['input'] for case in golden]
+    mismatches = [case['input'] for case in golden if parser.parse_exercise_input(case['input']) != case['expected']]
+
+    def parse_corpus():
+        for text in corpus:
+            parser.parse_exercise_input(text)
+
+    corpus_result = measure(parse_corpus, args.repeats)
+    corpus_result['per_sec'] = round(len(corpus) / (corpus_result['mean_ms'] / 1000), 1)
+    return {
+        'parse_exercise_input_corpus': corpus_result,
+        'parse_exercise_list_multi': measure(lambda: parser.parse_exercise_list(MULTI_SET_TEXT), args.repeats),
+        'failures': [f"розбіжність з еталоном: {text!r}" for text in mismatches],
+    }
+
+
+def db_micro(total_sets: int, args) -> Dict[str, Any]:
+    """Кожен метод DatabaseManager; записи — на окремих, заздалегідь створених об'єктах"""
+    path = os.path.join(tempfile.mkdtemp(), f"micro-{total_sets}.db")
+    db = DatabaseManager(path)
+    users = max(10, total_sets // 200)
+    if total_sets:
+        generate(db, total_sets, users, sets_per_workout=10)
+        db.rebuild_statistics()
+    rng = random.Random(args.seed)
+    repeats = args.repeats
+    results = {}
+
+    new_ids = iter(range(10 ** 9, 10 ** 9 + repeats))
+    results['add_user_new'] = measure(lambda: db.add_user(next(new_ids), "bench", "Bench"), repeats)
+    results['add_user_existing'] = measure(lambda: db.add_user(rng.randint(0, users - 1)), repeats)
+
+    bench_users = iter([db.add_user(2 * 10 ** 9 + index) for index in range(repeats)])
+    results['start_workout'] = measure(lambda: db.start_workout(next(bench_users)), repeats)
+    results['get_active_workout'] = measure(lambda: db.get_active_workout(rng.randint(1, users)), repeats)
+
+    workout_id = db.start_workout(db.add_user(3 * 10 ** 9))
+    results['add_set'] = measure(lambda: db.add_set(workout_id, "віджимання", 15, None, None), repeats)
+    batch = [{'exercise': "присідання", 'reps': 20, 'weight': 40.0, 'set_number': None} for _ in range(5)]
+    results['add_sets_5'] = measure(lambda: db.add_sets(workout_id, batch), repeats)
+
+    to_finish = []
+    for index in range(repeats):
+        finish_id = db.start_workout(db.add_user(4 * 10 ** 9 + index))
+        db.add_sets(finish_id, batch)
+        to_finish.append(finish_id)
+    finish_ids = iter(to_finish)
+    results['finish_workout'] = measure(lambda: db.finish_workout(next(finish_ids)), repeats)
+
+    results['get_user_statistics'] = measure(lambda: db.get_user_statistics(rng.randint(1, users)), repeats)
+    results['compute_user_statistics'] = measure(lambda: db.compute_user_statistics(rng.randint(1, users)), repeats)
+
+    db.save_transcriptions(["bench:hit"], "віджимання 15 разів")
+    results['get_transcription_hit'] = measure(lambda: db.get_transcription("bench:hit", 3600), repeats)
+    results['get_transcription_miss'] = measure(lambda: db.get_transcription("bench:miss", 3600), repeats)
+    keys = iter(range(repeats))
+    results['save_transcriptions'] = measure(
+        lambda: db.save_transcriptions([f"bench:{next(keys)}"], "прес 20 разів"), repeats
+    )
+    results['resolve_exercise'] = measure(lambda: db.resolve_exercise("віджиманя", "віджиманя 15 разів"), repeats)
+
+    db.close()
+    return {'total_sets': total_sets, 'users': users, 'methods': results}
+
+
+def report_micro(args) -> Dict[str, Any]:
+    generator = ReportGenerator()
+    rng = random.Random(args.seed)
+
+    def workout(sets: int) -> Dict[str, Any]:
+        return {
+            'start_time': "2024-05-01 18:00:00",
+            'end_time': "2024-05-01 19:05:00",
+            'sets': [
+                (rng.choice(EXERCISES), rng.randint(5, 30), rng.choice((None, 20.0, 60.0)), index % 5 + 1)
+                for index in range(sets)
+            ],
+        }
+
+    small, large = workout(10), workout(50)
+    confirmation = [{'exercise': "віджимання", 'reps': 15, 'weight': None, 'set_number': index} for index in range(1, 4)]
+    return {
+        'generate_workout_report_10': measure(lambda: generator.generate_workout_report(small), args.repeats),
+        'generate_workout_report_50': measure(lambda: generator.generate_workout_report(large), args.repeats),
+        'format_sets_confirmation_3': measure(lambda: generator.format_sets_confirmation(confirmation), args.repeats),
+    }
+
+
+# --- Звіт і порівняння -------------------------------------------------------
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+# Хвости (p95/p99) на коротких прогонах занадто шумні для автоматичного порогу
+COMPARED = ('p50_ms', 'mean_ms', 'per_sec', 'updates_per_sec')
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and key in COMPARED:
+            flat[name] = value
+    return flat
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Показники, що погіршились більше ніж на threshold відсотків"""
+    before, after = flatten(previous['results']), flatten(current['results'])
+    regressions = []
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name], after[name]
+        if not old:
+            continue
+        change = (new - old) / old * 100
+        worse = -change if name.endswith('_per_sec') else change
+        if worse > threshold:
+            regressions.append(f"{name}: {old:g} → {new:g} ({change:+.1f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=2000, help="користувачів у сценарії message_path")
+    parser.add_argument('--sets', type=int, default=8, help="підходів на тренування")
+    parser.add_argument('--voice-share', type=float, default=0.25, help="частка підходів голосом")
+    parser.add_argument('--reply-latency', type=float, default=0.005, help="затримка відповіді Telegram, с")
+    parser.add_argument('--transcription-latency', type=float, default=0.05, help="затримка розпізнавання, с")
+    parser.add_argument('--transcription-workers', type=int, default=8)
+    parser.add_argument('--small-sets', type=int, default=1000, help="підходів у малій базі")
+    parser.add_argument('--large-sets', type=int, default=200000, help="підходів у великій базі")
+    parser.add_argument('--repeats', type=int, default=300, help="повторів кожного мікробенчмарка")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', nargs='+', choices=('message_path', 'parser', 'db_small', 'db_large', 'reports'))
+    parser.add_argument('--output', help="файл результатів (типово benchmarks/results/run-<час>.json)")
+    parser.add_argument('--compare', help="попередній файл результатів для порівняння")
+    parser.add_argument('--threshold', type=float, default=15.0, help="допустиме погіршення, %%")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    suites = {
+        'message_path': lambda: asyncio.run(message_path(args)),
+        'parser': lambda: parser_micro(args),
+        'db_small': lambda: db_micro(args.small_sets, args),
+        'db_large': lambda: db_micro(args.large_sets, args),
+        'reports': lambda: report_micro(args),
+    }
+    results = {}
+    for name, run in suites.items():
+        if args.only and name not in args.only:
+            continue
+        started = time.perf_counter()
+        results[name] = run()
+        print(f"✅ {name}: {time.perf_counter() - started:.1f} с")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'args': vars(args),
+        },
+        'results': results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"run-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    print(f"Результати: {output}")
+
+    if 'message_path' in results:
+        path = results['message_path']
+        print(f"message_path: {path['updates_per_sec']} оновлень/с, "
+              f"підходів {path['stored_sets']} з {path['expected_sets']}")
+
+    failures = [f"{name}: {failure}" for name, result in results.items() for failure in result.get('failures', [])]
+    for failure in failures:
+        print(f"❌ Перевірка даних не пройшла — {failure}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        regressions = compare(previous, report, args.threshold)
+        if regressions:
+            print(f"❌ Погіршення понад {args.threshold:g}%:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"✅ Погіршень понад {args.threshold:g}% немає")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
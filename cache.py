@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class LRUCache:
+    """Обмежений LRU-кеш з необов'язковим TTL та лічильниками влучань/промахів"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self._data), 'hits': self.hits, 'misses': self.misses}
+
+
+class SessionCache(LRUCache):
+    """telegram_id -> (user_id, id активного тренування або None)"""
+
+    def get_session(self, telegram_id: int) -> Optional[Tuple[int, Optional[int]]]:
+        return self.get(telegram_id)
+
+    def set_session(self, telegram_id: int, user_id: int, workout_id: Optional[int]):
+        self.set(telegram_id, (user_id, workout_id))
+
+
+class ReportCache(LRUCache):
+    """workout_id -> (user_id, текст звіту); звіти завершених тренувань незмінні, тож без TTL"""
+
+    def get_report(self, workout_id: int, user_id: int) -> Optional[str]:
+        entry = self.get(workout_id)
+        if entry is None or entry[0] != user_id:
+            return None
+        return entry[1]
+
+    def set_report(self, workout_id: int, user_id: int, report: str):
+        self.set(workout_id, (user_id, report))
+
+
+class SetCounterCache(LRUCache):
+    """workout_id -> {exercise_id: останній номер підходу}; засівається з бази один раз на тренування"""
+
+    def get_counters(self, workout_id: int) -> Optional[Dict[int, int]]:
+        return self.get(workout_id)
+
+    def set_counters(self, workout_id: int, counters: Dict[int, int]) -> Dict[int, int]:
+        """Зберігає засіяні лічильники, якщо їх ще немає; повертає ті, що лишилися в кеші"""
+        existing = self.get_counters(workout_id)
+        if existing is not None:
+            return existing
+        self.set(workout_id, counters)
+        return counters
+
+
+def number_set_rows(counters: Dict[int, int], rows: List[Tuple]) -> List[Tuple]:
+    """Рядки sets без номера отримують наступний номер своєї вправи; явний номер лише зсуває лічильник.
+
+    Без await усередині: паралельні повідомлення одного тренування не отримають однакових номерів.
+    """
+    numbered = []
+    for workout_id, exercise_id, reps, weight, set_number in rows:
+        last = counters.get(exercise_id, 0)
+        if set_number is None:
+            set_number = last + 1
+        counters[exercise_id] = max(last, set_number)
+        numbered.append((workout_id, exercise_id, reps, weight, set_number))
+    return numbered
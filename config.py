@@ -0,0 +1,104 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+# Розпізнавання голосу
+TRANSCRIPTION_WORKERS = _env_int('TRANSCRIPTION_WORKERS', 2)
+TRANSCRIPTION_QUEUE_SIZE = _env_int('TRANSCRIPTION_QUEUE_SIZE', 20)
+TRANSCRIPTION_TIMEOUT = _env_float('TRANSCRIPTION_TIMEOUT', 30.0)
+# Дедлайн запиту: TRANSCRIPTION_TIMEOUT + секунд на кожну секунду запису (короткі — раніше)
+TRANSCRIPTION_SLO_PER_AUDIO_SECOND = _env_float('TRANSCRIPTION_SLO_PER_AUDIO_SECOND', 0.5)
+# Ліміт API: запитів на хвилину і допустимий сплеск; 0 — без обмеження
+TRANSCRIPTION_RATE_LIMIT = _env_float('TRANSCRIPTION_RATE_LIMIT', 50.0)
+TRANSCRIPTION_BURST = _env_int('TRANSCRIPTION_BURST', 5)
+TRANSCRIPTION_MAX_RETRIES = _env_int('TRANSCRIPTION_MAX_RETRIES', 5)
+TRANSCRIPTION_BACKOFF_BASE = _env_float('TRANSCRIPTION_BACKOFF_BASE', 0.5)
+TRANSCRIPTION_BACKOFF_MAX = _env_float('TRANSCRIPTION_BACKOFF_MAX', 8.0)
+
+# Кеш сесій: telegram_id -> (user_id, активне тренування)
+SESSION_CACHE_SIZE = _env_int('SESSION_CACHE_SIZE', 10000)
+SESSION_CACHE_TTL = _env_float('SESSION_CACHE_TTL', 900.0)
+
+# Лічильники номерів підходів активних тренувань: workout_id -> {вправа: останній номер}
+SET_COUNTER_CACHE_SIZE = _env_int('SET_COUNTER_CACHE_SIZE', 10000)
+
+# Збережені звіти завершених тренувань (LRU у пам'яті) і розмір сторінки /history
+REPORT_CACHE_SIZE = _env_int('REPORT_CACHE_SIZE', 2000)
+HISTORY_PAGE_SIZE = _env_int('HISTORY_PAGE_SIZE', 5)
+
+# /progress: кеш розрахунків на користувача (скидається при новому підході) і вікна в тижнях
+PROGRESS_CACHE_SIZE = _env_int('PROGRESS_CACHE_SIZE', 1000)
+PROGRESS_CACHE_TTL = _env_float('PROGRESS_CACHE_TTL', 3600.0)
+PROGRESS_WEEKS = _env_int('PROGRESS_WEEKS', 8)
+PROGRESS_TREND_WEEKS = _env_int('PROGRESS_TREND_WEEKS', 12)
+
+# Денні підсумки старші за ROLLUP_DAY_RETENTION_DAYS фонове завдання ущільнює в тижневі
+ROLLUP_DAY_RETENTION_DAYS = _env_int('ROLLUP_DAY_RETENTION_DAYS', 62)
+ROLLUP_COMPACT_INTERVAL = _env_float('ROLLUP_COMPACT_INTERVAL', 3600.0)
+
+# Кеш розпізнаних голосових (пам'ять + SQLite)
+TRANSCRIPTION_CACHE_SIZE = _env_int('TRANSCRIPTION_CACHE_SIZE', 1000)
+TRANSCRIPTION_CACHE_MAX_AGE = _env_float('TRANSCRIPTION_CACHE_MAX_AGE', 30 * 24 * 3600.0)
+TRANSCRIPTION_CACHE_MAX_ENTRIES = _env_int('TRANSCRIPTION_CACHE_MAX_ENTRIES', 50000)
+
+# Рушій розпізнавання мовлення: openai | local | stub
+SPEECH_BACKEND = os.getenv('SPEECH_BACKEND', 'openai')
+OPENAI_WHISPER_MODEL = os.getenv('OPENAI_WHISPER_MODEL', 'whisper-1')
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL')
+LOCAL_WHISPER_MODEL_PATH = os.getenv('LOCAL_WHISPER_MODEL_PATH')
+LOCAL_WHISPER_THREADS = _env_int('LOCAL_WHISPER_THREADS', 0)
+STUB_SPEECH_TEXT = os.getenv('STUB_SPEECH_TEXT')
+
+
+def speech_backend_options(backend: str = None) -> dict:
+    """Параметри конструктора для обраного рушія розпізнавання"""
+    backend = backend or SPEECH_BACKEND
+    if backend == 'openai':
+        return {'model': OPENAI_WHISPER_MODEL, 'base_url': OPENAI_BASE_URL}
+    if backend == 'local':
+        return {'model_path': LOCAL_WHISPER_MODEL_PATH, 'threads': LOCAL_WHISPER_THREADS}
+    if backend == 'stub':
+        return {'text': STUB_SPEECH_TEXT}
+    return {}
+
+# Попередня обробка аудіо перед розпізнаванням (потрібен ffmpeg)
+AUDIO_PREPROCESSING = os.getenv('AUDIO_PREPROCESSING', '1') == '1'
+AUDIO_MAX_DURATION = _env_float('AUDIO_MAX_DURATION', 60.0)
+AUDIO_SILENCE_THRESHOLD = _env_int('AUDIO_SILENCE_THRESHOLD', 600)
+
+# Режим роботи: polling | webhook
+BOT_MODE = os.getenv('BOT_MODE', 'polling')
+CONCURRENT_UPDATES = _env_int('CONCURRENT_UPDATES', 64)
+WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', '0.0.0.0')
+WEBHOOK_PORT = _env_int('WEBHOOK_PORT', 8443)
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', 'telegram')
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+WEBHOOK_SECRET_TOKEN = os.getenv('WEBHOOK_SECRET_TOKEN')
+
+# Груповий запис підходів: одна транзакція на всі підходи, що надійшли за інтервал
+GROUP_COMMIT = os.getenv('GROUP_COMMIT', '0') == '1'
+GROUP_COMMIT_INTERVAL = _env_float('GROUP_COMMIT_INTERVAL_MS', 20.0) / 1000
+GROUP_COMMIT_MAX_ROWS = _env_int('GROUP_COMMIT_MAX_ROWS', 500)
+
+# База даних: DB_SHARDS > 1 розкладає користувачів по файлах workout_bot.0.db, workout_bot.1.db, ...
+DB_PATH = os.getenv('DB_PATH', 'workout_bot.db')
+DB_SHARDS = _env_int('DB_SHARDS', 1)
+
+# Метрики: гістограми часу виконання, /metrics для Prometheus і команда /perf
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = _env_int('METRICS_PORT', 9108)
+# telegram_id адміністраторів через кому
+ADMIN_IDS = frozenset(int(value) for value in os.getenv('ADMIN_IDS', '').replace(' ', '').split(',') if value)
@@ -1,90 +1,375 @@
+import json
 import sqlite3
 import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Set, Tuple
+from exercise_catalog import ExerciseCatalog
+from report_generator import render_workout_report, summarize_workout
+from metrics import instrument_methods
 
+# resolve_exercise, get_all_exercises і prepare_set_rows працюють з довідником у пам'яті — не запити;
+# iter_user_sets і iter_progress_rows — генератори, їхній виклик лише створює ітератор
+@instrument_methods('db', exclude=('connection', 'close', 'init_database', 'resolve_exercise', 'get_all_exercises', 'prepare_set_rows', 'iter_user_sets', 'iter_progress_rows'))
 class DatabaseManager:
-    def __init__(self, db_path: str = "workout_bot.db"):
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA cache_size = -16000",
+        "PRAGMA temp_store = MEMORY",
+    )
+    CACHED_STATEMENTS = 256
+
+    # Міграції застосовуються по черзі; номер останньої зберігається в PRAGMA user_version
+    MIGRATIONS = (
+        '_migration_initial_schema',
+        '_migration_hot_path_indexes',
+        '_migration_statistics_rollups',
+        '_migration_transcription_cache',
+        '_migration_workout_reports',
+        '_migration_time_rollups',
+        '_migration_rollup_compaction_state',
+    )
+    SCHEMA_VERSION = len(MIGRATIONS)
+
+    DEFAULT_EXERCISES = (
+        "віджимання", "жим лежачи", "підтягування", "прес",
+        "тяга штанги", "присідання", "випади", "станова тягу",
+        "підйом гантелей", "тяга блока", "скручування",
+        "бурпі", "мах ногами", "віджимання на брусах", "підйом ніг",
+        "розведення рук", "жим гантелей", "згинання рук"
+    )
+
+    def __init__(self, db_path: str = "workout_bot.db", pooled: bool = True):
         self.db_path = db_path
+        self.pooled = pooled
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self.catalog = ExerciseCatalog(self._load_exercises)
         self.init_database()
 
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30,
+            cached_statements=self.CACHED_STATEMENTS,
+            check_same_thread=False
+        )
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def set_synchronous(self, mode: str):
+        """Режим fsync для вже відкритих і майбутніх з'єднань (FULL — коміт переживе вимкнення живлення)"""
+        pragma = f"PRAGMA synchronous = {mode}"
+        self.PRAGMAS = tuple(pragma if item.startswith("PRAGMA synchronous") else item for item in self.PRAGMAS)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.execute(pragma)
+
+    def _thread_connection(self) -> sqlite3.Connection:
+        """Довготривале з'єднання поточного потоку"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open_connection()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Видає з'єднання в межах транзакції: commit при успіху, rollback при помилці"""
+        if self.pooled:
+            conn = self._thread_connection()
+            with conn:
+                yield conn
+            return
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
     def init_database(self):
-        with sqlite3.connect(self.db_path) as conn:
+        """Доводить схему до SCHEMA_VERSION; для актуальної бази — лише одне читання PRAGMA"""
+        with self.connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= self.SCHEMA_VERSION:
+            logging.info(f"✅ Схема бази даних актуальна (версія {version})")
+            return
+
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
             cursor = conn.cursor()
+            for target in range(version + 1, self.SCHEMA_VERSION + 1):
+                getattr(self, self.MIGRATIONS[target - 1])(cursor)
+                logging.info(f"🔧 Застосовано міграцію {target}: {self.MIGRATIONS[target - 1]}")
+            cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
 
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    telegram_id INTEGER UNIQUE NOT NULL,
-                    username TEXT,
-                    first_name TEXT,
-                    registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+        logging.info("✅ База даних ініціалізована успішно")
 
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS workouts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    start_time TIMESTAMP NOT NULL,
-                    end_time TIMESTAMP,
-                    status TEXT DEFAULT 'active',
-                    FOREIGN KEY (user_id) REFERENCES users (id)
-                )
-            ''')
+    def _migration_initial_schema(self, cursor: sqlite3.Cursor):
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                telegram_id INTEGER UNIQUE NOT NULL,
+                username TEXT,
+                first_name TEXT,
+                registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
 
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS exercises (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE NOT NULL
-                )
-            ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS workouts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                start_time TIMESTAMP NOT NULL,
+                end_time TIMESTAMP,
+                status TEXT DEFAULT 'active',
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
 
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS sets (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    workout_id INTEGER NOT NULL,
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS exercises (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sets (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                workout_id INTEGER NOT NULL,
+                exercise_id INTEGER NOT NULL,
+                reps INTEGER NOT NULL,
+                weight REAL,
+                set_number INTEGER,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (workout_id) REFERENCES workouts (id),
+                FOREIGN KEY (exercise_id) REFERENCES exercises (id)
+            )
+        ''')
+
+        self._insert_default_exercises(cursor)
+
+    def _migration_hot_path_indexes(self, cursor: sqlite3.Cursor):
+        # Активне тренування, кількість і тривалість завершених — без звернення до таблиці
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_workouts_user_status
+            ON workouts (user_id, status, start_time, end_time)
+        ''')
+        # Підходи тренування разом з колонками, потрібними для статистики
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_sets_workout
+            ON sets (workout_id, exercise_id, reps)
+        ''')
+
+    def _migration_statistics_rollups(self, cursor: sqlite3.Cursor):
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user_stats (
+                user_id INTEGER PRIMARY KEY,
+                total_workouts INTEGER NOT NULL DEFAULT 0,
+                total_sets INTEGER NOT NULL DEFAULT 0,
+                total_reps INTEGER NOT NULL DEFAULT 0,
+                total_minutes REAL NOT NULL DEFAULT 0,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user_exercise_stats (
+                user_id INTEGER NOT NULL,
+                exercise_id INTEGER NOT NULL,
+                sets_count INTEGER NOT NULL DEFAULT 0,
+                total_reps INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, exercise_id),
+                FOREIGN KEY (user_id) REFERENCES users (id),
+                FOREIGN KEY (exercise_id) REFERENCES exercises (id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_user_exercise_stats_top
+            ON user_exercise_stats (user_id, sets_count DESC)
+        ''')
+        self._rebuild_statistics(cursor)
+
+    def _migration_transcription_cache(self, cursor: sqlite3.Cursor):
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS transcriptions (
+                cache_key TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                created_at REAL NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_transcriptions_created
+            ON transcriptions (created_at)
+        ''')
+
+    def _migration_workout_reports(self, cursor: sqlite3.Cursor):
+        # Звіт завершеного тренування не змінюється: зберігається один раз при завершенні
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS workout_reports (
+                workout_id INTEGER PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                summary TEXT NOT NULL,
+                report TEXT NOT NULL,
+                FOREIGN KEY (workout_id) REFERENCES workouts (id),
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+        # Сторінки /history: WHERE user_id = ? AND workout_id < ? ORDER BY workout_id DESC
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_workout_reports_user
+            ON workout_reports (user_id, workout_id)
+        ''')
+        self._backfill_workout_reports(cursor)
+
+    def _migration_time_rollups(self, cursor: sqlite3.Cursor):
+        # Підсумки за днями і тижнями (тиждень — дата понеділка). exercise_id = 0 — усі вправи
+        # тренування разом (з кількістю тренувань і хвилин), user_id = 0 — усі користувачі.
+        # Свіжі дані лежать у rollup_daily; старі дні фонове ущільнення переносить у rollup_weekly.
+        for table, bucket in (('rollup_daily', 'day'), ('rollup_weekly', 'week')):
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    user_id INTEGER NOT NULL,
+                    {bucket} TEXT NOT NULL,
                     exercise_id INTEGER NOT NULL,
-                    reps INTEGER NOT NULL,
-                    weight REAL,
-                    set_number INTEGER,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (workout_id) REFERENCES workouts (id),
-                    FOREIGN KEY (exercise_id) REFERENCES exercises (id)
-                )
+                    workouts INTEGER NOT NULL DEFAULT 0,
+                    minutes REAL NOT NULL DEFAULT 0,
+                    sets_count INTEGER NOT NULL DEFAULT 0,
+                    total_reps INTEGER NOT NULL DEFAULT 0,
+                    total_volume REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, {bucket}, exercise_id)
+                ) WITHOUT ROWID
             ''')
-            conn.commit()
+        self._rebuild_rollups(cursor)
 
-        self.populate_default_exercises()
-        logging.info("✅ База даних ініціалізована успішно")
+    def _migration_rollup_compaction_state(self, cursor: sqlite3.Cursor):
+        # Межа ущільнення: дні до compacted_until лежать лише в rollup_weekly.
+        # Перерахунок підсумків знову ущільнює до неї, а не повертає старі дні в rollup_daily
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS rollup_compaction (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                compacted_until TEXT NOT NULL
+            )
+        ''')
+        # Для вже ущільнених баз — понеділок після останнього перенесеного тижня
+        cursor.execute('''
+            INSERT OR IGNORE INTO rollup_compaction (id, compacted_until)
+            SELECT 1, date(MAX(week), '+7 days') FROM rollup_weekly HAVING MAX(week) IS NOT NULL
+        ''')
+
+    def _backfill_workout_reports(self, cursor: sqlite3.Cursor, batch: int = 1000) -> int:
+        """Звіти для завершених тренувань без звіту — пачками, щоб не тримати всю історію в пам'яті"""
+        stored = 0
+        while True:
+            workouts = {
+                workout_id: {'user_id': user_id, 'start_time': start_time, 'end_time': end_time, 'sets': []}
+                for workout_id, user_id, start_time, end_time in cursor.execute('''
+                    SELECT w.id, w.user_id, w.start_time, w.end_time FROM workouts w
+                    WHERE w.status = 'completed' AND w.end_time IS NOT NULL
+                      AND NOT EXISTS (SELECT 1 FROM workout_reports r WHERE r.workout_id = w.id)
+                    ORDER BY w.id
+                    LIMIT ?
+                ''', (batch,)).fetchall()
+            }
+            if not workouts:
+                return stored
+            for workout_id, name, reps, weight, set_number in cursor.execute('''
+                SELECT s.workout_id, e.name, s.reps, s.weight, s.set_number
+                FROM sets s
+                JOIN exercises e ON s.exercise_id = e.id
+                WHERE s.workout_id IN (SELECT value FROM json_each(?))
+                ORDER BY s.workout_id, s.timestamp, s.id
+            ''', (json.dumps(list(workouts)),)).fetchall():
+                workouts[workout_id]['sets'].append((name, reps, weight, set_number))
+            for workout_id, workout in workouts.items():
+                self._store_workout_report(cursor, workout_id, workout['user_id'], workout)
+            stored += len(workouts)
+
+    def backfill_workout_reports(self) -> int:
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            stored = self._backfill_workout_reports(conn.cursor())
+        if stored:
+            logging.info(f"✅ Збережено звіти {stored} тренувань")
+        return stored
+
+    def _store_workout_report(self, cursor: sqlite3.Cursor, workout_id: int, user_id: int, workout_data: Dict[str, Any]) -> str:
+        summary = summarize_workout(workout_data)
+        report = render_workout_report(summary)
+        cursor.execute('''
+            INSERT OR REPLACE INTO workout_reports (workout_id, user_id, summary, report)
+            VALUES (?, ?, ?, ?)
+        ''', (workout_id, user_id, json.dumps(summary, ensure_ascii=False, separators=(',', ':')), report))
+        return report
+
+    def _insert_default_exercises(self, cursor: sqlite3.Cursor):
+        cursor.executemany(
+            "INSERT OR IGNORE INTO exercises (name) VALUES (?)",
+            [(name.strip().lower(),) for name in self.DEFAULT_EXERCISES]
+        )
 
     def populate_default_exercises(self):
-        default_exercises = [
-            "віджимання", "жим лежачи", "підтягування", "прес",
-            "тяга штанги", "присідання", "випади", "станова тягу",
-            "підйом гантелей", "тяга блока", "скручування",
-            "бурпі", "мах ногами", "віджимання на брусах", "підйом ніг",
-            "розведення рук", "жим гантелей", "згинання рук"
-        ]
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
+            self._insert_default_exercises(conn.cursor())
+        self.catalog.invalidate()
+
+    def add_exercise(self, name: str) -> int:
+        """Додає власну вправу до довідника (або повертає id наявної)"""
+        normalized_name = name.strip().lower()
+        with self.connection() as conn:
             cursor = conn.cursor()
-            for name in default_exercises:
-                try:
-                    cursor.execute("INSERT INTO exercises (name) VALUES (?)", (name.strip().lower(),))
-                except sqlite3.IntegrityError:
-                    continue
-            conn.commit()
+            cursor.execute("INSERT OR IGNORE INTO exercises (name) VALUES (?)", (normalized_name,))
+            inserted = cursor.rowcount > 0
+            cursor.execute("SELECT id FROM exercises WHERE name = ?", (normalized_name,))
+            exercise_id = cursor.fetchone()[0]
+        if inserted:
+            self.catalog.invalidate()
+        return exercise_id
+
+    def add_exercises(self, names: List[str]) -> int:
+        """Додає кілька вправ однією транзакцією; повертає кількість нових"""
+        with self.connection() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO exercises (name) VALUES (?)",
+                [(name.strip().lower(),) for name in names]
+            )
+            inserted = conn.total_changes - before
+        if inserted:
+            self.catalog.invalidate()
+        return inserted
+
+    def _load_exercises(self) -> List[Tuple[int, str]]:
+        with self.connection() as conn:
+            return conn.execute("SELECT id, name FROM exercises ORDER BY name").fetchall()
 
     def get_all_exercises(self) -> List[str]:
         """Повертає список доступних вправ"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM exercises ORDER BY name")
-            rows = cursor.fetchall()
-            return [row[0] for row in rows]
+        return self.catalog.names
+
+    def resolve_exercise(self, name: str, text: Optional[str] = None) -> Optional[str]:
+        return self.catalog.resolve(name.strip().lower().rstrip(",. "), text)
 
     def add_user(self, telegram_id: int, username: str = None, first_name: str = None) -> int:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT id FROM users WHERE telegram_id = ?", (telegram_id,))
             user = cursor.fetchone()
@@ -96,8 +381,13 @@ class DatabaseManager:
             ''', (telegram_id, username, first_name))
             return cursor.lastrowid
 
+    def get_user_id(self, telegram_id: int) -> Optional[int]:
+        with self.connection() as conn:
+            row = conn.execute("SELECT id FROM users WHERE telegram_id = ?", (telegram_id,)).fetchone()
+            return row[0] if row else None
+
     def start_workout(self, user_id: int) -> int:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id FROM workouts 
@@ -113,7 +403,7 @@ class DatabaseManager:
             return cursor.lastrowid
 
     def get_active_workout(self, user_id: int) -> Optional[int]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT id FROM workouts 
@@ -124,29 +414,65 @@ class DatabaseManager:
 
     def add_set(self, workout_id: int, exercise_name: str, reps: int, weight: float = None, set_number: int = None) -> int:
         normalized_name = exercise_name.strip().lower().rstrip(",. ")
-        with sqlite3.connect(self.db_path) as conn:
+        exercise_id = self.catalog.get_id(normalized_name)
+        if exercise_id is None:
+            raise ValueError(f"❌ Вправа '{exercise_name}' не знайдена в довіднику.")
+        with self.connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT id FROM exercises WHERE name = ?", (normalized_name,))
-            exercise = cursor.fetchone()
-            if not exercise:
-                raise ValueError(f"❌ Вправа '{exercise_name}' не знайдена в довіднику.")
-            exercise_id = exercise[0]
             cursor.execute('''
                 INSERT INTO sets (workout_id, exercise_id, reps, weight, set_number)
                 VALUES (?, ?, ?, ?, ?)
             ''', (workout_id, exercise_id, reps, weight, set_number))
             return cursor.lastrowid
 
+    def get_set_counters(self, workout_id: int) -> Dict[int, int]:
+        """Останній номер підходу кожної вправи тренування — для засівання лічильників (індекс idx_sets_workout)"""
+        with self.connection() as conn:
+            return dict(conn.execute('''
+                SELECT exercise_id, MAX(COALESCE(MAX(set_number), 0), COUNT(*))
+                FROM sets WHERE workout_id = ?
+                GROUP BY exercise_id
+            ''', (workout_id,)).fetchall())
+
+    def add_sets(self, workout_id: int, sets: List[Dict[str, Any]]) -> int:
+        """Записує кілька підходів однією транзакцією; якщо якоїсь вправи немає — не записує жодного"""
+        return self.insert_set_rows(self.prepare_set_rows(workout_id, sets))
+
+    def prepare_set_rows(self, workout_id: int, sets: List[Dict[str, Any]]) -> List[Tuple]:
+        """Рядки для таблиці sets; ValueError, якщо якоїсь вправи немає в довіднику"""
+        rows = []
+        for set_data in sets:
+            exercise_name = set_data['exercise']
+            exercise_id = self.catalog.get_id(exercise_name.strip().lower().rstrip(",. "))
+            if exercise_id is None:
+                raise ValueError(f"❌ Вправа '{exercise_name}' не знайдена в довіднику.")
+            rows.append((workout_id, exercise_id, set_data['reps'], set_data.get('weight'), set_data.get('set_number')))
+        return rows
+
+    def insert_set_rows(self, rows: List[Tuple]) -> int:
+        """Вставляє підготовлені рядки (зокрема різних тренувань) однією транзакцією"""
+        with self.connection() as conn:
+            conn.executemany('''
+                INSERT INTO sets (workout_id, exercise_id, reps, weight, set_number)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+        return len(rows)
+
     def finish_workout(self, workout_id: int) -> Dict[str, Any]:
-        with sqlite3.connect(self.db_path) as conn:
+        """Завершує тренування; у результаті — і готовий звіт, збережений у workout_reports"""
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE workouts 
                 SET end_time = ?, status = 'completed'
-                WHERE id = ?
+                WHERE id = ? AND status = 'active'
             ''', (datetime.now(), workout_id))
+            finished = cursor.rowcount
+            if finished:
+                self._add_workout_to_statistics(cursor, workout_id)
+                self._add_workout_to_rollups(cursor, workout_id)
             cursor.execute('''
-                SELECT start_time, end_time FROM workouts WHERE id = ?
+                SELECT start_time, end_time, user_id FROM workouts WHERE id = ?
             ''', (workout_id,))
             workout_data = cursor.fetchone()
             cursor.execute('''
@@ -154,17 +480,214 @@ class DatabaseManager:
                 FROM sets s
                 JOIN exercises e ON s.exercise_id = e.id
                 WHERE s.workout_id = ?
-                ORDER BY s.timestamp
+                ORDER BY s.timestamp, s.id
             ''', (workout_id,))
             sets_data = cursor.fetchall()
-            return {
+            result = {
                 'start_time': workout_data[0],
                 'end_time': workout_data[1],
                 'sets': sets_data
             }
+            if finished:
+                result['report'] = self._store_workout_report(cursor, workout_id, workout_data[2], result)
+            return result
+
+    def get_workout_report(self, workout_id: int, user_id: int) -> Optional[str]:
+        """Збережений звіт тренування, лише якщо воно належить user_id"""
+        with self.connection() as conn:
+            row = conn.execute('''
+                SELECT report FROM workout_reports WHERE workout_id = ? AND user_id = ?
+            ''', (workout_id, user_id)).fetchone()
+            return row[0] if row else None
+
+    def get_workout_history(self, user_id: int, before: Optional[int] = None, limit: int = 5) -> List[Tuple[int, Dict[str, Any]]]:
+        """Завершені тренування від найновіших: [(workout_id, підсумок)].
+
+        Пагінація за ключем: наступна сторінка — before = найменший workout_id попередньої,
+        тож кожна сторінка — один прохід індексом без OFFSET.
+        """
+        with self.connection() as conn:
+            rows = conn.execute('''
+                SELECT workout_id, summary FROM workout_reports
+                WHERE user_id = ? AND workout_id < ?
+                ORDER BY workout_id DESC
+                LIMIT ?
+            ''', (user_id, before if before is not None else 2 ** 63 - 1, limit)).fetchall()
+            return [(workout_id, json.loads(summary)) for workout_id, summary in rows]
+
+    def iter_user_sets(self, user_id: int) -> Iterator[Tuple]:
+        """Усі підходи користувача рядками EXPORT_COLUMNS, по одному з курсора.
+
+        Підходи читаються по тренуваннях: один запит з JOIN і ORDER BY сортував би
+        всю історію в тимчасовому B-дереві ще до першого рядка.
+        """
+        with self.connection() as conn:
+            workouts = conn.execute('''
+                SELECT id, start_time, end_time FROM workouts WHERE user_id = ? ORDER BY id
+            ''', (user_id,))
+            for workout_id, start_time, end_time in workouts:
+                for name, reps, weight, set_number, timestamp in conn.execute('''
+                    SELECT e.name, s.reps, s.weight, s.set_number, s.timestamp
+                    FROM sets s
+                    JOIN exercises e ON s.exercise_id = e.id
+                    WHERE s.workout_id = ?
+                    ORDER BY s.timestamp, s.id
+                ''', (workout_id,)):
+                    yield workout_id, start_time, end_time, name, reps, weight, set_number, timestamp
+
+    def iter_progress_rows(self, user_id: int) -> Iterator[Tuple[int, int, float, int]]:
+        """(exercise_id, повторення, вага або 0, день тренування від 1970-01-01) — для progress.load_history"""
+        with self.connection() as conn:
+            yield from conn.execute('''
+                SELECT s.exercise_id, s.reps, COALESCE(s.weight, 0.0),
+                       CAST(julianday(w.start_time) - 2440587.5 AS INTEGER)
+                FROM workouts w
+                JOIN sets s ON s.workout_id = w.id
+                WHERE w.user_id = ?
+            ''', (user_id,))
+
+    def import_rows(self, rows: List[Tuple], created: Optional[Set[Tuple[int, datetime]]] = None) -> Tuple[int, int, int]:
+        """Перевірені рядки імпорту (див. history_io.validate_row) однією транзакцією.
+
+        Повертає (нових користувачів, нових тренувань, пропущених дублікатів). Тренування
+        з тим самим початком у того самого користувача доповнюється, а не створюється вдруге;
+        підходи, що вже є в ньому (вправа, час, повторення, вага, номер), не додаються — тож
+        повторний імпорт того самого експорту нічого не змінює. created — ключі
+        (telegram_id, початок) тренувань, створених цим імпортом у попередніх пачках:
+        їх не звіряють, бо однакові підходи всередині одного файлу — не дублікати.
+        Збережені звіти доповнених завершених тренувань видаляються, щоб
+        backfill_workout_reports зібрав їх наново.
+        """
+        created = set() if created is None else created
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            telegram_ids = sorted({row[0] for row in rows})
+            before = conn.total_changes
+            cursor.executemany(
+                "INSERT OR IGNORE INTO users (telegram_id) VALUES (?)",
+                [(telegram_id,) for telegram_id in telegram_ids]
+            )
+            new_users = conn.total_changes - before
+            user_ids = dict(cursor.execute(
+                "SELECT telegram_id, id FROM users WHERE telegram_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(telegram_ids),)
+            ).fetchall())
+
+            workout_ids: Dict[Tuple[int, datetime], int] = {}
+            # Підходи тренувань, що існували до імпорту: ключ підходу -> скільки таких уже є
+            existing_sets: Dict[int, Counter] = {}
+            new_workouts = 0
+            for telegram_id, start, end, *_ in rows:
+                key = (user_ids[telegram_id], start)
+                if key in workout_ids:
+                    continue
+                # status IN (...) дає пошук за idx_workouts_user_status (user_id, status, start_time)
+                existing = cursor.execute('''
+                    SELECT id FROM workouts
+                    WHERE user_id = ? AND status IN ('active', 'completed') AND start_time = ?
+                ''', key).fetchone()
+                if existing:
+                    workout_ids[key] = existing[0]
+                    if (telegram_id, start) not in created:
+                        existing_sets[existing[0]] = Counter(cursor.execute('''
+                            SELECT exercise_id, timestamp, reps, weight, set_number FROM sets WHERE workout_id = ?
+                        ''', (existing[0],)).fetchall())
+                    continue
+                cursor.execute('''
+                    INSERT INTO workouts (user_id, start_time, end_time, status)
+                    VALUES (?, ?, ?, 'completed')
+                ''', (key[0], start, end))
+                workout_ids[key] = cursor.lastrowid
+                created.add((telegram_id, start))
+                new_workouts += 1
+
+            new_sets = []
+            extended = set()
+            for telegram_id, start, end, exercise_id, reps, weight, set_number, timestamp in rows:
+                workout_id = workout_ids[(user_ids[telegram_id], start)]
+                seen = existing_sets.get(workout_id)
+                if seen is not None:
+                    # Так само, як sqlite3 зберігає datetime у колонці timestamp
+                    key = (exercise_id, str(timestamp), reps, weight, set_number)
+                    if seen[key] > 0:
+                        seen[key] -= 1
+                        continue
+                    extended.add(workout_id)
+                new_sets.append((workout_id, exercise_id, reps, weight, set_number, timestamp))
+            cursor.executemany('''
+                INSERT INTO sets (workout_id, exercise_id, reps, weight, set_number, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', new_sets)
+            if extended:
+                cursor.execute(
+                    "DELETE FROM workout_reports WHERE workout_id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(sorted(extended)),)
+                )
+            return new_users, new_workouts, len(rows) - len(new_sets)
+
+    def get_transcription(self, cache_key: str, max_age: float) -> Optional[str]:
+        with self.connection() as conn:
+            row = conn.execute('''
+                SELECT text FROM transcriptions
+                WHERE cache_key = ? AND created_at >= ?
+            ''', (cache_key, time.time() - max_age)).fetchone()
+            return row[0] if row else None
+
+    def save_transcriptions(self, cache_keys: List[str], text: str):
+        now = time.time()
+        with self.connection() as conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO transcriptions (cache_key, text, created_at)
+                VALUES (?, ?, ?)
+            ''', [(cache_key, text, now) for cache_key in cache_keys])
+
+    def prune_transcriptions(self, max_age: float, max_entries: int) -> int:
+        """Видаляє застарілі записи кешу розпізнавання та найстаріші понад max_entries"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM transcriptions WHERE created_at < ?", (time.time() - max_age,))
+            removed = cursor.rowcount
+            cursor.execute('''
+                DELETE FROM transcriptions WHERE cache_key IN (
+                    SELECT cache_key FROM transcriptions
+                    ORDER BY created_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+            ''', (max_entries,))
+            return removed + cursor.rowcount
 
     def get_user_statistics(self, user_id: int) -> Dict[str, Any]:
-        with sqlite3.connect(self.db_path) as conn:
+        """Статистика з підсумкових таблиць: два пошуки за ключем замість агрегатів по всій історії"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT total_workouts, total_sets, total_reps, total_minutes
+                FROM user_stats WHERE user_id = ?
+            ''', (user_id,))
+            row = cursor.fetchone()
+            if not row or row[0] == 0:
+                return {'total_workouts': 0}
+            total_workouts, total_sets, total_reps, total_minutes = row
+            cursor.execute('''
+                SELECT e.name, st.sets_count
+                FROM user_exercise_stats st
+                JOIN exercises e ON st.exercise_id = e.id
+                WHERE st.user_id = ?
+                ORDER BY st.sets_count DESC, e.name
+                LIMIT 3
+            ''', (user_id,))
+            top_exercises = cursor.fetchall()
+            return {
+                'total_workouts': total_workouts,
+                'total_sets': total_sets,
+                'total_reps': total_reps,
+                'total_time': int(total_minutes),
+                'top_exercises': top_exercises
+            }
+
+    def compute_user_statistics(self, user_id: int) -> Dict[str, Any]:
+        """Статистика напряму з sets/workouts — для перевірки підсумкових таблиць"""
+        with self.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT COUNT(*) FROM workouts 
@@ -194,7 +717,7 @@ class DatabaseManager:
                 JOIN workouts w ON s.workout_id = w.id
                 WHERE w.user_id = ? AND w.status = 'completed'
                 GROUP BY e.name
-                ORDER BY cnt DESC
+                ORDER BY cnt DESC, e.name
                 LIMIT 3
             ''', (user_id,))
             top_exercises = cursor.fetchall()
@@ -205,4 +728,213 @@ class DatabaseManager:
                 'total_time': total_time,
                 'top_exercises': top_exercises
             }
-    
\ No newline at end of file
+
+    def rebuild_statistics(self):
+        """Перераховує підсумкові таблиці з нуля (backfill після збою чи ручних правок)"""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._rebuild_statistics(conn.cursor())
+        logging.info("✅ Підсумкову статистику перераховано")
+
+    def check_statistics(self) -> List[int]:
+        """Звіряє підсумкові таблиці з прямими запитами; повертає user_id з розбіжностями"""
+        with self.connection() as conn:
+            user_ids = [row[0] for row in conn.execute("SELECT id FROM users ORDER BY id")]
+        mismatched = []
+        for user_id in user_ids:
+            if self.get_user_statistics(user_id) != self.compute_user_statistics(user_id):
+                mismatched.append(user_id)
+        return mismatched
+
+    ROLLUP_COLUMNS = "workouts, minutes, sets_count, total_reps, total_volume"
+    ROLLUP_UPSERT = '''
+        ON CONFLICT DO UPDATE SET
+            workouts = workouts + excluded.workouts,
+            minutes = minutes + excluded.minutes,
+            sets_count = sets_count + excluded.sets_count,
+            total_reps = total_reps + excluded.total_reps,
+            total_volume = total_volume + excluded.total_volume
+    '''
+
+    def _add_workout_to_rollups(self, cursor: sqlite3.Cursor, workout_id: int):
+        """Денні підсумки користувача і всіх користувачів — рядок на вправу і рядок exercise_id = 0"""
+        user_id, day, minutes = cursor.execute('''
+            SELECT user_id, date(start_time),
+                   COALESCE((julianday(end_time) - julianday(start_time)) * 24 * 60, 0)
+            FROM workouts WHERE id = ?
+        ''', (workout_id,)).fetchone()
+        per_exercise = cursor.execute('''
+            SELECT exercise_id, COUNT(*), SUM(reps), SUM(reps * COALESCE(weight, 0))
+            FROM sets WHERE workout_id = ?
+            GROUP BY exercise_id
+        ''', (workout_id,)).fetchall()
+        totals = (
+            0, 1, minutes,
+            sum(row[1] for row in per_exercise), sum(row[2] for row in per_exercise), sum(row[3] for row in per_exercise)
+        )
+        rows = [totals] + [(exercise_id, 0, 0, sets, reps, volume) for exercise_id, sets, reps, volume in per_exercise]
+        cursor.executemany(f'''
+            INSERT INTO rollup_daily (user_id, day, exercise_id, {self.ROLLUP_COLUMNS})
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            {self.ROLLUP_UPSERT}
+        ''', [(owner, day) + row for owner in (user_id, 0) for row in rows])
+
+    def _rebuild_rollups(self, cursor: sqlite3.Cursor):
+        """Підсумки з нуля: денні з sets, а вже ущільнені тижні — знову ущільнюються до тієї ж межі"""
+        compacted_until = None
+        if cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'rollup_compaction'").fetchone():
+            row = cursor.execute("SELECT compacted_until FROM rollup_compaction").fetchone()
+            compacted_until = row[0] if row else None
+        cursor.execute("DELETE FROM rollup_daily")
+        cursor.execute("DELETE FROM rollup_weekly")
+        cursor.execute(f'''
+            INSERT INTO rollup_daily (user_id, day, exercise_id, {self.ROLLUP_COLUMNS})
+            SELECT w.user_id, date(w.start_time), s.exercise_id, 0, 0,
+                   COUNT(*), SUM(s.reps), SUM(s.reps * COALESCE(s.weight, 0))
+            FROM sets s JOIN workouts w ON s.workout_id = w.id
+            WHERE w.status = 'completed'
+            GROUP BY w.user_id, date(w.start_time), s.exercise_id
+        ''')
+        cursor.execute(f'''
+            INSERT INTO rollup_daily (user_id, day, exercise_id, {self.ROLLUP_COLUMNS})
+            SELECT w.user_id, date(w.start_time), 0, COUNT(*),
+                   COALESCE(SUM((julianday(w.end_time) - julianday(w.start_time)) * 24 * 60), 0),
+                   COALESCE(SUM(ws.sets_count), 0), COALESCE(SUM(ws.total_reps), 0), COALESCE(SUM(ws.total_volume), 0)
+            FROM workouts w
+            LEFT JOIN (
+                SELECT workout_id, COUNT(*) AS sets_count, SUM(reps) AS total_reps,
+                       SUM(reps * COALESCE(weight, 0)) AS total_volume
+                FROM sets GROUP BY workout_id
+            ) ws ON ws.workout_id = w.id
+            WHERE w.status = 'completed'
+            GROUP BY w.user_id, date(w.start_time)
+        ''')
+        cursor.execute(f'''
+            INSERT INTO rollup_daily (user_id, day, exercise_id, {self.ROLLUP_COLUMNS})
+            SELECT 0, day, exercise_id, SUM(workouts), SUM(minutes), SUM(sets_count), SUM(total_reps), SUM(total_volume)
+            FROM rollup_daily WHERE user_id != 0
+            GROUP BY day, exercise_id
+        ''')
+        if compacted_until:
+            self._compact_rollups(cursor, compacted_until)
+
+    def _compact_rollups(self, cursor: sqlite3.Cursor, before: str) -> int:
+        cursor.execute(f'''
+            INSERT INTO rollup_weekly (user_id, week, exercise_id, {self.ROLLUP_COLUMNS})
+            SELECT user_id, date(day, '-6 days', 'weekday 1'), exercise_id,
+                   SUM(workouts), SUM(minutes), SUM(sets_count), SUM(total_reps), SUM(total_volume)
+            FROM rollup_daily WHERE day < ?
+            GROUP BY user_id, date(day, '-6 days', 'weekday 1'), exercise_id
+            {self.ROLLUP_UPSERT}
+        ''', (before,))
+        cursor.execute("DELETE FROM rollup_daily WHERE day < ?", (before,))
+        moved = cursor.rowcount
+        cursor.execute('''
+            INSERT INTO rollup_compaction (id, compacted_until) VALUES (1, ?)
+            ON CONFLICT (id) DO UPDATE SET compacted_until = MAX(compacted_until, excluded.compacted_until)
+        ''', (before,))
+        return moved
+
+    def compact_rollups(self, before: str) -> int:
+        """Переносить денні підсумки до дати before (понеділок, 'YYYY-MM-DD') у тижневі; повертає кількість днів-рядків"""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            return self._compact_rollups(conn.cursor(), before)
+
+    def get_range_statistics(self, user_id: int, start: str, end: str) -> Dict[str, Any]:
+        """Підсумки за [start, end) з денних і тижневих рядків — O(кількості кошиків), без sets.
+
+        user_id = 0 — усі користувачі. Ущільнені (старі) тижні враховуються цілком, якщо їхній
+        понеділок потрапляє в діапазон від понеділка тижня start.
+        """
+        return range_result(self.range_rollup_rows(user_id, start, end))
+
+    def range_rollup_rows(self, user_id: int, start: str, end: str) -> List[Tuple]:
+        """(exercise_id, назва, тренувань, хвилин, підходів, повторень, об'єм) за [start, end)"""
+        with self.connection() as conn:
+            return conn.execute(f'''
+                SELECT r.exercise_id, e.name, SUM(r.workouts), SUM(r.minutes),
+                       SUM(r.sets_count), SUM(r.total_reps), SUM(r.total_volume)
+                FROM (
+                    SELECT exercise_id, {self.ROLLUP_COLUMNS} FROM rollup_daily
+                    WHERE user_id = ? AND day >= ? AND day < ?
+                    UNION ALL
+                    SELECT exercise_id, {self.ROLLUP_COLUMNS} FROM rollup_weekly
+                    WHERE user_id = ? AND week >= date(?, '-6 days', 'weekday 1') AND week < ?
+                ) r
+                LEFT JOIN exercises e ON e.id = r.exercise_id
+                GROUP BY r.exercise_id
+            ''', (user_id, start, end, user_id, start, end)).fetchall()
+
+    def _rebuild_statistics(self, cursor: sqlite3.Cursor):
+        if cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'rollup_daily'").fetchone():
+            self._rebuild_rollups(cursor)
+        cursor.execute("DELETE FROM user_stats")
+        cursor.execute("DELETE FROM user_exercise_stats")
+        cursor.execute('''
+            INSERT INTO user_stats (user_id, total_workouts, total_sets, total_reps, total_minutes)
+            SELECT w.user_id,
+                   COUNT(*),
+                   COALESCE(SUM(ws.sets_count), 0),
+                   COALESCE(SUM(ws.total_reps), 0),
+                   COALESCE(SUM((julianday(w.end_time) - julianday(w.start_time)) * 24 * 60), 0)
+            FROM workouts w
+            LEFT JOIN (
+                SELECT workout_id, COUNT(*) AS sets_count, SUM(reps) AS total_reps
+                FROM sets GROUP BY workout_id
+            ) ws ON ws.workout_id = w.id
+            WHERE w.status = 'completed'
+            GROUP BY w.user_id
+        ''')
+        cursor.execute('''
+            INSERT INTO user_exercise_stats (user_id, exercise_id, sets_count, total_reps)
+            SELECT w.user_id, s.exercise_id, COUNT(*), SUM(s.reps)
+            FROM sets s
+            JOIN workouts w ON s.workout_id = w.id
+            WHERE w.status = 'completed'
+            GROUP BY w.user_id, s.exercise_id
+        ''')
+
+    def _add_workout_to_statistics(self, cursor: sqlite3.Cursor, workout_id: int):
+        """Додає щойно завершене тренування до підсумкових таблиць (в тій самій транзакції)"""
+        cursor.execute('''
+            INSERT INTO user_stats (user_id, total_workouts, total_sets, total_reps, total_minutes)
+            SELECT w.user_id, 1,
+                   (SELECT COUNT(*) FROM sets WHERE workout_id = w.id),
+                   (SELECT COALESCE(SUM(reps), 0) FROM sets WHERE workout_id = w.id),
+                   COALESCE((julianday(w.end_time) - julianday(w.start_time)) * 24 * 60, 0)
+            FROM workouts w WHERE w.id = ?
+            ON CONFLICT (user_id) DO UPDATE SET
+                total_workouts = total_workouts + 1,
+                total_sets = total_sets + excluded.total_sets,
+                total_reps = total_reps + excluded.total_reps,
+                total_minutes = total_minutes + excluded.total_minutes
+        ''', (workout_id,))
+        cursor.execute('''
+            INSERT INTO user_exercise_stats (user_id, exercise_id, sets_count, total_reps)
+            SELECT w.user_id, s.exercise_id, COUNT(*), SUM(s.reps)
+            FROM sets s JOIN workouts w ON s.workout_id = w.id
+            WHERE s.workout_id = ?
+            GROUP BY s.exercise_id
+            ON CONFLICT (user_id, exercise_id) DO UPDATE SET
+                sets_count = sets_count + excluded.sets_count,
+                total_reps = total_reps + excluded.total_reps
+        ''', (workout_id,))
+
+
+def range_result(rows: List[Tuple]) -> Dict[str, Any]:
+    """Рядки range_rollup_rows (можливо, з кількох шардів) -> підсумок діапазону"""
+    totals: Dict[int, List] = {}
+    for exercise_id, name, *values in rows:
+        entry = totals.setdefault(exercise_id, [name, 0, 0, 0, 0, 0])
+        for index, value in enumerate(values, 1):
+            entry[index] += value
+    result = {'workouts': 0, 'minutes': 0, 'sets': 0, 'reps': 0, 'volume': 0.0, 'top_exercises': []}
+    exercises = []
+    for exercise_id, (name, workouts, minutes, sets_count, reps, volume) in totals.items():
+        if exercise_id == 0:
+            result.update(workouts=workouts, minutes=int(minutes), sets=sets_count, reps=reps, volume=volume)
+        else:
+            exercises.append((name, sets_count))
+    result['top_exercises'] = sorted(exercises, key=lambda item: (-item[1], item[0]))[:3]
+    return result
@@ -0,0 +1,86 @@
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from exercise_matcher import ExerciseMatcher
+
+
+class _CatalogState(NamedTuple):
+    """Незмінний знімок довідника; замінюється цілком, тож читачі не бачать його напівоновленим"""
+    ids: Dict[str, int]
+    names: List[str]
+    names_by_id: Dict[int, str]
+    list_text: str
+    matcher: ExerciseMatcher
+
+
+class ExerciseCatalog:
+    """Довідник вправ у пам'яті: назва -> id та готовий текст списку.
+
+    Завантажується один раз і перечитується лише після invalidate(),
+    яку DatabaseManager викликає при зміні таблиці exercises.
+    """
+
+    def __init__(self, loader: Callable[[], List[Tuple[int, str]]]):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._state: Optional[_CatalogState] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._state is not None
+
+    def _ensure_loaded(self) -> _CatalogState:
+        """Поточний знімок; усе читання методу йде з нього, навіть якщо паралельно викличуть invalidate()"""
+        state = self._state
+        if state is not None:
+            return state
+        with self._lock:
+            state = self._state
+            if state is not None:
+                return state
+            rows = self._loader()
+            names = [name for _, name in rows]
+            state = _CatalogState(
+                ids={name: exercise_id for exercise_id, name in rows},
+                names=names,
+                names_by_id={exercise_id: name for exercise_id, name in rows},
+                list_text="📋 Список доступних вправ:" + '\n• ' + '\n• '.join(name.capitalize() for name in names),
+                matcher=ExerciseMatcher(names)
+            )
+            self._state = state
+            return state
+
+    def invalidate(self):
+        with self._lock:
+            self._state = None
+
+    @property
+    def names_by_id(self) -> Dict[int, str]:
+        return self._ensure_loaded().names_by_id
+
+    def get_id(self, name: str) -> Optional[int]:
+        return self._ensure_loaded().ids.get(name)
+
+    def resolve(self, name: str, text: Optional[str] = None) -> Optional[str]:
+        """Назва з довідника для розпізнаної назви: точно, потім пошуком у тексті, потім з виправленням описок"""
+        state = self._ensure_loaded()
+        if name in state.ids:
+            return name
+        for candidate in (name, text):
+            if candidate:
+                found = state.matcher.find(candidate)
+                if found:
+                    return found
+        for candidate in (name, text):
+            if candidate:
+                found = state.matcher.match(candidate)
+                if found:
+                    return found
+        return None
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._ensure_loaded().names)
+
+    @property
+    def list_text(self) -> str:
+        return self._ensure_loaded().list_text
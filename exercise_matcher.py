@@ -0,0 +1,154 @@
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_WORD_RE = re.compile(r"[^\W\d_]+(?:['\-][^\W\d_]+)*")
+
+
+def normalize_words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower().replace("’", "'"))
+
+
+class _WordNode:
+    __slots__ = ('children', 'fail', 'name', 'depth', 'output')
+
+    def __init__(self, depth: int = 0):
+        self.children: Dict[str, '_WordNode'] = {}
+        self.fail: Optional['_WordNode'] = None
+        self.name: Optional[str] = None
+        self.depth = depth
+        # Найдовша назва з довідника, що закінчується в цьому вузлі (сам вузол або його суфікс)
+        self.output: Optional['_WordNode'] = None
+
+
+class ExerciseMatcher:
+    """Пошук назв вправ у довільному реченні.
+
+    Назви з довідника складаються в автомат Ахо-Корасік над словами, тож
+    найдовша назва в реченні знаходиться за один прохід по словах. Якщо точного
+    збігу немає, кожне слово замінюється найближчим словом словника (відстань
+    Левенштейна до 1-2) і пошук повторюється — так виправляються описки
+    розпізнавання мовлення. Кандидатів шукає індекс симетричних видалень:
+    слова словника індексуються з усіма варіантами без однієї літери, а запит —
+    без однієї-двох, тож вартість пошуку не залежить від розміру довідника.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self._root = _WordNode()
+        self._vocabulary = set()
+        self._deletes: Dict[str, List[str]] = {}
+        for name in names:
+            self._add(name)
+        self._build_failure_links()
+
+    def _add(self, name: str):
+        words = normalize_words(name)
+        if not words:
+            return
+        node = self._root
+        for word in words:
+            node = node.children.setdefault(word, _WordNode(node.depth + 1))
+            self._add_vocabulary_word(word)
+        node.name = name
+
+    def _add_vocabulary_word(self, word: str):
+        if word in self._vocabulary:
+            return
+        self._vocabulary.add(word)
+        for variant in _deletions(word, 1):
+            self._deletes.setdefault(variant, []).append(word)
+
+    def _build_failure_links(self):
+        self._root.fail = self._root
+        queue = deque()
+        for child in self._root.children.values():
+            child.fail = self._root
+            child.output = child if child.name else None
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for word, child in node.children.items():
+                fail = node.fail
+                while fail is not self._root and word not in fail.children:
+                    fail = fail.fail
+                child.fail = fail.children.get(word, self._root)
+                if child.fail is child:
+                    child.fail = self._root
+                child.output = child if child.name else child.fail.output
+                queue.append(child)
+
+    def find(self, text: str) -> Optional[str]:
+        """Найдовша (за кількістю слів) назва з довідника, що точно входить у текст"""
+        return self._scan(normalize_words(text))
+
+    def match(self, text: str) -> Optional[str]:
+        """Точний збіг, а якщо його немає — збіг після виправлення описок у словах"""
+        words = normalize_words(text)
+        found = self._scan(words)
+        if found:
+            return found
+        corrected = [self._closest_word(word) or word for word in words]
+        if corrected == words:
+            return None
+        return self._scan(corrected)
+
+    def _scan(self, words: List[str]) -> Optional[str]:
+        best: Optional[_WordNode] = None
+        node = self._root
+        for word in words:
+            while node is not self._root and word not in node.children:
+                node = node.fail
+            node = node.children.get(word, self._root)
+            output = node.output
+            if output is not None and (best is None or output.depth > best.depth):
+                best = output
+        return best.name if best else None
+
+    @staticmethod
+    def _max_distance(word: str) -> int:
+        if len(word) <= 3:
+            return 0
+        return 1 if len(word) <= 5 else 2
+
+    def _closest_word(self, word: str) -> Optional[str]:
+        max_distance = self._max_distance(word)
+        if max_distance == 0 or word in self._vocabulary:
+            return None
+        candidates = set()
+        for variant in _deletions(word, max_distance):
+            candidates.update(self._deletes.get(variant, ()))
+        best: Optional[Tuple[int, str]] = None
+        for candidate in candidates:
+            distance = _edit_distance(word, candidate, max_distance)
+            if distance <= max_distance and (best is None or (distance, candidate) < best):
+                best = (distance, candidate)
+        return best[1] if best else None
+
+
+def _deletions(word: str, depth: int) -> set:
+    """Слово та всі його варіанти без 1..depth літер"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {item[:i] + item[i + 1:] for item in frontier for i in range(len(item))}
+        variants |= frontier
+    return variants
+
+
+def _edit_distance(first: str, second: str, limit: int) -> int:
+    """Відстань Левенштейна; рахування обривається, щойно вона перевищила limit"""
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    previous = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, 1):
+        current = [i]
+        for j, second_char in enumerate(second, 1):
+            current.append(min(
+                current[j - 1] + 1,
+                previous[j] + 1,
+                previous[j - 1] + (first_char != second_char)
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
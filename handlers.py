@@ -1,31 +1,108 @@
+import io
 import logging
-from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
+import tempfile
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from telegram import Update, ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from database import DatabaseManager
+from async_database import AsyncDatabaseManager
 from text_parser import TextParser
 from speech_recognition import SpeechRecognizer
-from report_generator import ReportGenerator
-
+from report_generator import ReportGenerator, format_history_page, format_progress
+from transcription_queue import TranscriptionQueue, TranscriptionQueueFull, TranscriptionTimeout, TranscriptionUnavailable
+from cache import LRUCache, ReportCache, SessionCache
+from history_io import WRITERS
+from transcription_cache import TranscriptionCache
+from user_locks import UserLocks
+from rollup_compactor import RollupCompactor
+from metrics import REGISTRY, format_perf_report, instrument_methods
+import config
+
+# Лише точки входу: кожне оновлення вимірюється один раз обробником, що його обслуговує.
+# handle_button_press тільки розподіляє кнопки, а get_session/save_sets — частина виміряного
+HANDLER_ENTRY_POINTS = (
+    'start_command', 'help_command', 'history_command', 'progress_command', 'week_command', 'month_command',
+    'export_command', 'perf_command', 'handle_history_callback', 'handle_voice_message',
+    'start_workout', 'stop_workout', 'show_statistics', 'handle_text_message',
+)
+
+
+@instrument_methods('handler', include=HANDLER_ENTRY_POINTS)
 class WorkoutHandlers:
-    def __init__(self):
-        self.db = DatabaseManager()
+    BUSY_TEXT = "⏳ Бот зараз розпізнає багато голосових повідомлень. Спробуйте ще раз за кілька секунд."
+    # Більші файли Bot API не приймає
+    MAX_DOCUMENT_SIZE = 50 * 1024 * 1024
+
+    def __init__(self, db: Optional[AsyncDatabaseManager] = None, speech_recognizer=None):
+        self.db = db or AsyncDatabaseManager()
         self.parser = TextParser()
-        self.speech_recognizer = SpeechRecognizer()
+        self.speech_recognizer = speech_recognizer or SpeechRecognizer()
         self.report_generator = ReportGenerator()
+        self.sessions = SessionCache(
+            maxsize=config.SESSION_CACHE_SIZE,
+            ttl=config.SESSION_CACHE_TTL
+        )
+        self.reports = ReportCache(maxsize=config.REPORT_CACHE_SIZE)
+        # user_id -> результат compute_progress; TTL — на випадок імпорту з manage.py в іншому процесі
+        self.progress = LRUCache(maxsize=config.PROGRESS_CACHE_SIZE, ttl=config.PROGRESS_CACHE_TTL)
+        self.transcription_cache = TranscriptionCache(
+            self.db,
+            memory_size=config.TRANSCRIPTION_CACHE_SIZE,
+            max_age=config.TRANSCRIPTION_CACHE_MAX_AGE,
+            max_entries=config.TRANSCRIPTION_CACHE_MAX_ENTRIES
+        )
+        self.transcription_queue = TranscriptionQueue(
+            self.speech_recognizer,
+            workers=config.TRANSCRIPTION_WORKERS,
+            max_size=config.TRANSCRIPTION_QUEUE_SIZE,
+            timeout=config.TRANSCRIPTION_TIMEOUT,
+            slo_per_audio_second=config.TRANSCRIPTION_SLO_PER_AUDIO_SECOND,
+            rate_limit=config.TRANSCRIPTION_RATE_LIMIT,
+            burst=config.TRANSCRIPTION_BURST,
+            max_retries=config.TRANSCRIPTION_MAX_RETRIES,
+            backoff_base=config.TRANSCRIPTION_BACKOFF_BASE,
+            backoff_max=config.TRANSCRIPTION_BACKOFF_MAX
+        )
+
+        self.user_locks = UserLocks()
+        self.rollup_compactor = RollupCompactor(
+            self.db,
+            interval=config.ROLLUP_COMPACT_INTERVAL,
+            retention_days=config.ROLLUP_DAY_RETENTION_DAYS
+        )
+
+        REGISTRY.register_gauges('session_cache', self.sessions.stats, "Кеш сесій: розмір, влучання, промахи")
+        REGISTRY.register_gauges('report_cache', self.reports.stats, "Кеш звітів тренувань")
+        REGISTRY.register_gauges('progress_cache', self.progress.stats, "Кеш розрахунків /progress")
+        REGISTRY.register_gauges('set_counters', self.db.set_counters.stats, "Лічильники номерів підходів")
+        REGISTRY.register_gauges('transcription_queue', self.transcription_queue.stats, "Черга розпізнавання")
+        if self.db.set_writer:
+            REGISTRY.register_gauges('group_commit', self.db.set_writer.stats, "Груповий запис підходів")
+        preprocessor = getattr(self.speech_recognizer, 'preprocessor', None)
+        if preprocessor:
+            REGISTRY.register_gauges('audio_preprocessing', preprocessor.stats, "Попередня обробка голосових: заощаджені байти й секунди")
 
         self.keyboard = ReplyKeyboardMarkup([
             [KeyboardButton("🏁 Старт тренування"), KeyboardButton("⏹️ Стоп тренування")],
             [KeyboardButton("📊 Статистика"), KeyboardButton("❓ Допомога")]
         ], resize_keyboard=True)
 
-    def get_formatted_exercises_list(self):
-        exercises = self.db.get_all_exercises()
-        formatted_list = '\n• ' + '\n• '.join(ex.capitalize() for ex in exercises)
-        return f"📋 Список доступних вправ:{formatted_list}"
+    async def get_session(self, telegram_id: int) -> Tuple[int, Optional[int]]:
+        """(user_id, активне тренування) — з кешу, без звернень до БД при влучанні"""
+        session = self.sessions.get_session(telegram_id)
+        if session is None:
+            user_id = await self.db.add_user(telegram_id=telegram_id)
+            workout_id = await self.db.get_active_workout(user_id)
+            self.sessions.set_session(telegram_id, user_id, workout_id)
+            session = (user_id, workout_id)
+        return session
+
+    async def get_formatted_exercises_list(self):
+        return await self.db.get_exercises_list_text()
 
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user = update.effective_user
-        self.db.add_user(
+        await self.db.add_user(
             telegram_id=user.id,
             username=user.username,
             first_name=user.first_name
@@ -43,20 +120,20 @@ class WorkoutHandlers:
 
     async def start_workout(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user = update.effective_user
-        user_id = self.db.add_user(telegram_id=user.id)
+        user_id, active_workout_id = await self.get_session(user.id)
 
-        if self.db.get_active_workout(user_id):
+        if active_workout_id:
             await update.message.reply_text(
                 "⚡ У вас вже є активне тренування!\n"
                 "Говоріть або пишіть вправи, або натисніть '⏹️ Стоп тренування' для завершення."
             )
             return
 
-        workout_id = self.db.start_workout(user_id)
-        context.user_data['workout_id'] = workout_id
+        workout_id = await self.db.start_workout(user_id)
+        self.sessions.set_session(user.id, user_id, workout_id)
 
         
-        exercises_list = self.get_formatted_exercises_list()
+        exercises_list = await self.get_formatted_exercises_list()
         
         await update.message.reply_text(
             "🏁 Тренування розпочато!\n\n"
@@ -70,30 +147,130 @@ class WorkoutHandlers:
 
     async def stop_workout(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user = update.effective_user
-        user_id = self.db.add_user(telegram_id=user.id)
-
-        workout_id = self.db.get_active_workout(user_id)
+        user_id, workout_id = await self.get_session(user.id)
         if not workout_id:
             await update.message.reply_text("❌ У вас немає активного тренування.\nСпочатку натисніть '🏁 Старт тренування'")
             return
 
-        workout_data = self.db.finish_workout(workout_id)
-        context.user_data.pop('workout_id', None)
+        workout_data = await self.db.finish_workout(workout_id)
+        self.sessions.set_session(user.id, user_id, None)
 
-        report = self.report_generator.generate_workout_report(workout_data)
+        report = workout_data.get('report')
+        if report:
+            self.reports.set_report(workout_id, user_id, report)
+        else:
+            report = self.report_generator.generate_workout_report(workout_data)
         await update.message.reply_text(report)
 
+    async def _history_page(self, user_id: int, before: Optional[int]) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+        page_size = config.HISTORY_PAGE_SIZE
+        # Зайвий рядок лише показує, чи є старіші тренування
+        entries = await self.db.get_workout_history(user_id, before, page_size + 1)
+        if not entries:
+            return "📜 У вас поки немає завершених тренувань.", None
+        entries, has_more = entries[:page_size], len(entries) > page_size
+        buttons = [[
+            InlineKeyboardButton(str(index), callback_data=f"report:{workout_id}")
+            for index, (workout_id, _) in enumerate(entries, 1)
+        ]]
+        if has_more:
+            buttons.append([InlineKeyboardButton("⬅️ Старіші", callback_data=f"history:{entries[-1][0]}")])
+        return format_history_page(entries), InlineKeyboardMarkup(buttons)
+
+    async def history_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        user_id, _ = await self.get_session(update.effective_user.id)
+        text, markup = await self._history_page(user_id, None)
+        await update.message.reply_text(text, reply_markup=markup)
+
+    async def progress_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """/progress — рекорди, тренд оцінки 1ПМ і тижневий об'єм; розрахунок кешується до нового підходу"""
+        user_id, _ = await self.get_session(update.effective_user.id)
+        progress = self.progress.get(user_id)
+        if progress is None:
+            progress = await self.db.get_user_progress(
+                user_id, weeks=config.PROGRESS_WEEKS, trend_weeks=config.PROGRESS_TREND_WEEKS
+            )
+            self.progress.set(user_id, progress)
+        await update.message.reply_text(format_progress(progress))
+
+    async def export_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """/export [csv|json] — усі підходи файлом; рядки йдуть з курсора у тимчасовий файл, не накопичуючись у пам'яті"""
+        args = getattr(context, 'args', None) or ['csv']
+        fmt = args[0].lower()
+        if fmt not in WRITERS:
+            await update.message.reply_text("❌ Формат експорту: /export csv або /export json")
+            return
+        user_id, _ = await self.get_session(update.effective_user.id)
+
+        with tempfile.TemporaryFile() as raw:
+            stream = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+            count = await self.db.export_user_sets(user_id, stream, fmt)
+            stream.flush()
+            stream.detach()
+            if not count:
+                await update.message.reply_text("📭 Ще немає підходів для експорту.")
+                return
+            if raw.tell() > self.MAX_DOCUMENT_SIZE:
+                await update.message.reply_text("❌ Історія завелика для надсилання файлом у Telegram.")
+                return
+            raw.seek(0)
+            await update.message.reply_document(
+                document=raw,
+                filename=f"workouts.{fmt}",
+                caption=f"📤 Експортовано підходів: {count}"
+            )
+
+    async def handle_history_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Кнопки під /history: history:<id> — старіша сторінка, report:<id> — звіт тренування"""
+        query = update.callback_query
+        await query.answer()
+        kind, _, value = (query.data or '').partition(':')
+        if not value.isdigit():
+            return
+        user_id, _ = await self.get_session(update.effective_user.id)
+
+        if kind == 'history':
+            text, markup = await self._history_page(user_id, int(value))
+            await query.edit_message_text(text, reply_markup=markup)
+        elif kind == 'report':
+            workout_id = int(value)
+            report = self.reports.get_report(workout_id, user_id)
+            if report is None:
+                report = await self.db.get_workout_report(workout_id, user_id)
+                if report is None:
+                    await query.message.reply_text("❌ Звіт не знайдено.")
+                    return
+                self.reports.set_report(workout_id, user_id, report)
+            await query.message.reply_text(report)
+
+    async def save_sets(self, update: Update, user_id: int, workout_id: int, sets: List[Dict[str, Any]], text: str):
+        """Уточнює назви за довідником, записує всі підходи разом і надсилає одне підтвердження"""
+        for exercise_data in sets:
+            # Пошук по всьому тексту має сенс лише тоді, коли в ньому один підхід
+            exercise_name = await self.db.resolve_exercise(exercise_data['exercise'], text if len(sets) == 1 else None)
+            if exercise_name:
+                exercise_data['exercise'] = exercise_name
+
+        try:
+            await self.db.add_sets(workout_id, sets)
+        except ValueError as e:
+            exercises_list = await self.get_formatted_exercises_list()
+            await update.message.reply_text(f"{str(e)}\n\n{exercises_list}")
+            return
+        self.progress.invalidate(user_id)
+
+        confirmation = self.report_generator.format_sets_confirmation(sets)
+        await update.message.reply_text(confirmation)
+
     async def handle_text_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user = update.effective_user
-        user_id = self.db.add_user(telegram_id=user.id)
-
-        workout_id = self.db.get_active_workout(user_id)
+        user_id, workout_id = await self.get_session(user.id)
         if not workout_id:
             await update.message.reply_text("⚠️ Спочатку розпочніть тренування, натиснувши '🏁 Старт тренування'")
             return
 
-        exercise_data = self.parser.parse_exercise_input(update.message.text)
-        if not exercise_data:
+        sets = self.parser.parse_exercise_list(update.message.text)
+        if not sets:
             await update.message.reply_text(
                 "❌ Не можу розпізнати вправу.\n\n"
                 "Спробуйте формат:\n"
@@ -102,38 +279,51 @@ class WorkoutHandlers:
             )
             return
 
-        try:
-            self.db.add_set(
-                workout_id=workout_id,
-                exercise_name=exercise_data['exercise'],
-                reps=exercise_data['reps'],
-                weight=exercise_data.get('weight'),
-                set_number=exercise_data.get('set_number')
-            )
-            confirmation = self.report_generator.format_exercise_confirmation(exercise_data)
-            await update.message.reply_text(confirmation)
-
-        except ValueError as e:
-            exercises_list = self.get_formatted_exercises_list()
-            await update.message.reply_text(f"{str(e)}\n\n{exercises_list}")
+        await self.save_sets(update, user_id, workout_id, sets, update.message.text)
 
     async def handle_voice_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user = update.effective_user
-        user_id = self.db.add_user(telegram_id=user.id)
-
-        workout_id = self.db.get_active_workout(user_id)
+        user_id, workout_id = await self.get_session(user.id)
         if not workout_id:
             await update.message.reply_text("⚠️ Спочатку розпочніть тренування, натиснувши '🏁 Старт тренування'")
             return
 
-        processing_msg = await update.message.reply_text("🎤 Обробляю голосове повідомлення...")
+        voice = update.message.voice
+        file_key = TranscriptionCache.file_key(voice.file_unique_id)
+        processing_msg = None
 
         try:
-            voice_file = await update.message.voice.get_file()
-            ogg_bytes = await voice_file.download_as_bytearray()
+            text = await self.transcription_cache.get(file_key)
+            if text is None:
+                if self.transcription_queue.is_full():
+                    await update.message.reply_text(self.BUSY_TEXT)
+                    return
+
+                processing_msg = await update.message.reply_text("🎤 Обробляю голосове повідомлення...")
+
+                voice_file = await voice.get_file()
+                ogg_bytes = await voice_file.download_as_bytearray()
+                content_key = TranscriptionCache.content_key(ogg_bytes)
+
+                text = await self.transcription_cache.get(content_key)
+                if text is None:
+                    try:
+                        text = await self.transcription_queue.submit(ogg_bytes, duration=voice.duration or 0)
+                    except (TranscriptionQueueFull, TranscriptionUnavailable):
+                        await processing_msg.delete()
+                        await update.message.reply_text(self.BUSY_TEXT)
+                        return
+                    except TranscriptionTimeout:
+                        await processing_msg.delete()
+                        await update.message.reply_text("⌛ Розпізнавання зайняло забагато часу. Спробуйте ще раз.")
+                        return
+                    if text:
+                        await self.transcription_cache.put([file_key, content_key], text)
+                else:
+                    await self.transcription_cache.put([file_key], text)
 
-            text = self.speech_recognizer.transcribe_audio_sync(ogg_bytes)
-            await processing_msg.delete()
+                await processing_msg.delete()
+                processing_msg = None
 
             if not text:
                 await update.message.reply_text("❌ Не вдалося розпізнати голосове повідомлення. Спробуйте говорити чіткіше.")
@@ -141,8 +331,8 @@ class WorkoutHandlers:
 
             await update.message.reply_text(f"👂 Я почув: \"{text}\"")
 
-            exercise_data = self.parser.parse_exercise_input(text)
-            if not exercise_data:
+            sets = self.parser.parse_exercise_list(text)
+            if not sets:
                 await update.message.reply_text(
                     "❌ Не можу розпізнати вправу з голосового повідомлення.\n\n"
                     "Спробуйте сказати так:\n"
@@ -151,26 +341,13 @@ class WorkoutHandlers:
                 )
                 return
 
-            try:
-                self.db.add_set(
-                    workout_id=workout_id,
-                    exercise_name=exercise_data['exercise'],
-                    reps=exercise_data['reps'],
-                    weight=exercise_data.get('weight'),
-                    set_number=exercise_data.get('set_number')
-                )
-
-                confirmation = self.report_generator.format_exercise_confirmation(exercise_data)
-                await update.message.reply_text(confirmation)
-
-            except ValueError as e:
-                exercises_list = self.get_formatted_exercises_list()
-                await update.message.reply_text(f"{str(e)}\n\n{exercises_list}")
+            await self.save_sets(update, user_id, workout_id, sets, text)
 
         except Exception as e:
             logging.error(f"Помилка обробки голосу: {e}", exc_info=True)
             try:
-                await processing_msg.delete()
+                if processing_msg:
+                    await processing_msg.delete()
             except:
                 pass
             await update.message.reply_text("❌ Виникла помилка при обробці голосового повідомлення. Спробуйте ще раз.")
@@ -178,7 +355,7 @@ class WorkoutHandlers:
 
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         
-        exercises_list = self.get_formatted_exercises_list()
+        exercises_list = await self.get_formatted_exercises_list()
         
         help_text = (
             "🏋️‍♂️ **Як користуватися ботом:**\n\n"
@@ -192,20 +369,31 @@ class WorkoutHandlers:
             "• 'Зробив(-ла) віджимання 15 разів, перший підхід'\n"
             "• 'Жим лежачи 12 разів, другий підхід, 80 кілограм'\n\n"
             "3️⃣ Натисніть '⏹️ Стоп тренування' для завершення\n"
-            "4️⃣ Отримайте детальний звіт!\n\n"
+            "4️⃣ Отримайте детальний звіт!\n"
+            "5️⃣ /history — попередні тренування та їхні звіти\n"
+            "6️⃣ /progress — рекорди, оцінка 1ПМ і об'єм по тижнях; /week і /month — підсумки періоду\n"
+            "7️⃣ /export csv або /export json — усі підходи файлом\n\n"
             f"{exercises_list}\n\n"
             "💡 **Поради:**\n"
             "• Говоріть чітко\n"
+            "• Кілька вправ можна записати одним повідомленням: 'віджимання 15 разів, прес 20 разів'\n"
             "• Вага не обов'язкова\n"
             "• Можна не вказувати підхід — бот порахує сам"
         )
         await update.message.reply_text(help_text, parse_mode='Markdown')
 
+    async def perf_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Зведення метрик продуктивності — лише для ADMIN_IDS"""
+        if update.effective_user.id not in config.ADMIN_IDS:
+            await update.message.reply_text("⛔ Команда доступна лише адміністраторам.")
+            return
+        await update.message.reply_text(format_perf_report())
+
     async def show_statistics(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         user = update.effective_user
-        user_id = self.db.add_user(telegram_id=user.id)
+        user_id, _ = await self.get_session(user.id)
 
-        stats = self.db.get_user_statistics(user_id)
+        stats = await self.db.get_user_statistics(user_id)
         if not stats or stats['total_workouts'] == 0:
             await update.message.reply_text("📊 У вас поки немає завершених тренувань.\nРозпочніть перше тренування! 💪")
             return
@@ -224,6 +412,36 @@ class WorkoutHandlers:
 
         await update.message.reply_text(stats_text)
 
+    async def send_range_statistics(self, update: Update, period: str, start: date):
+        """Статистика з початку періоду до сьогодні включно — з денних підсумків, без проходу по sets"""
+        user_id, _ = await self.get_session(update.effective_user.id)
+        end = date.today() + timedelta(days=1)
+        stats = await self.db.get_range_statistics(user_id, start.isoformat(), end.isoformat())
+        if not stats['workouts']:
+            await update.message.reply_text(f"📅 За {period} ще немає завершених тренувань.")
+            return
+
+        lines = [
+            f"📅 Статистика за {period} (з {start.strftime('%d.%m')}):",
+            "",
+            f"🏋️‍♂️ Тренувань: {stats['workouts']}",
+            f"💪 Підходів: {stats['sets']}",
+            f"🔥 Повторень: {stats['reps']}",
+            f"⚖️ Об'єм: {stats['volume']:,.0f} кг".replace(',', ' '),
+            f"⏱️ Час: {stats['minutes']} хв",
+        ]
+        if stats['top_exercises']:
+            lines += ["", "🏆 Топ-3 вправи по підходам:"]
+            lines += [f"{i}. {name.capitalize()}: {count}" for i, (name, count) in enumerate(stats['top_exercises'], 1)]
+        await update.message.reply_text('\n'.join(lines))
+
+    async def week_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        today = date.today()
+        await self.send_range_statistics(update, "цей тиждень", today - timedelta(days=today.weekday()))
+
+    async def month_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        await self.send_range_statistics(update, "цей місяць", date.today().replace(day=1))
+
     async def handle_button_press(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         text = update.message.text
 
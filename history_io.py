@@ -0,0 +1,160 @@
+import csv
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+# Колонки експорту; імпорт приймає ті самі плюс telegram_id
+EXPORT_COLUMNS = ('workout_id', 'workout_start', 'workout_end', 'exercise', 'reps', 'weight', 'set_number', 'timestamp')
+IMPORT_CHUNK_SIZE = 5000
+MAX_REPS = 10000
+MAX_WEIGHT = 1000.0
+
+
+def write_csv(rows: Iterable[Tuple], stream: TextIO) -> int:
+    """Пише рядки по одному в міру надходження; повертає кількість рядків"""
+    writer = csv.writer(stream)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_json(rows: Iterable[Tuple], stream: TextIO) -> int:
+    """JSON-масив з одним об'єктом на рядок — його ж читає read_json_rows без завантаження цілого файлу"""
+    stream.write('[')
+    count = 0
+    for row in rows:
+        stream.write(',\n' if count else '\n')
+        stream.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False, default=str))
+        count += 1
+    stream.write('\n]\n')
+    return count
+
+
+WRITERS = {'csv': write_csv, 'json': write_json}
+
+
+def read_csv_rows(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    return csv.DictReader(stream)
+
+
+def read_json_rows(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """Рядки експорту write_json або JSON Lines: по об'єкту на рядок"""
+    for line in stream:
+        line = line.strip().rstrip(',')
+        if line and line not in ('[', ']'):
+            yield json.loads(line)
+
+
+READERS = {'csv': read_csv_rows, 'json': read_json_rows}
+
+
+def _optional(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _timestamp(value: Any, field: str) -> datetime:
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f"{field}: некоректна дата '{value}'")
+
+
+def validate_row(row: Dict[str, Any], catalog, telegram_id: Optional[int] = None) -> Tuple:
+    """Рядок імпорту -> (telegram_id, початок, кінець, exercise_id, повторення, вага, підхід, час); ValueError з причиною"""
+    raw_telegram_id = _optional(row.get('telegram_id'))
+    if raw_telegram_id is None and telegram_id is None:
+        raise ValueError("telegram_id не вказано")
+    try:
+        row_telegram_id = int(raw_telegram_id) if raw_telegram_id is not None else telegram_id
+    except ValueError:
+        raise ValueError(f"telegram_id: некоректне значення '{raw_telegram_id}'")
+
+    start = _timestamp(row.get('workout_start'), 'workout_start')
+    raw_end = _optional(row.get('workout_end'))
+    end = _timestamp(raw_end, 'workout_end') if raw_end else start
+    if end < start:
+        raise ValueError("workout_end раніше за workout_start")
+
+    exercise = (_optional(row.get('exercise')) or '').lower().rstrip(",. ")
+    exercise_id = catalog.get_id(exercise)
+    if exercise_id is None:
+        raise ValueError(f"вправа '{exercise}' не знайдена в довіднику")
+
+    try:
+        reps = int(row.get('reps'))
+    except (TypeError, ValueError):
+        raise ValueError(f"reps: некоректне значення '{row.get('reps')}'")
+    if not 0 < reps <= MAX_REPS:
+        raise ValueError(f"reps поза межами: {reps}")
+
+    raw_weight = _optional(row.get('weight'))
+    try:
+        weight = float(raw_weight.replace(',', '.')) if raw_weight else None
+    except ValueError:
+        raise ValueError(f"weight: некоректне значення '{raw_weight}'")
+    if weight is not None and not 0 <= weight <= MAX_WEIGHT:
+        raise ValueError(f"weight поза межами: {weight}")
+
+    raw_set_number = _optional(row.get('set_number'))
+    try:
+        set_number = int(raw_set_number) if raw_set_number else None
+    except ValueError:
+        raise ValueError(f"set_number: некоректне значення '{raw_set_number}'")
+
+    raw_timestamp = _optional(row.get('timestamp'))
+    timestamp = _timestamp(raw_timestamp, 'timestamp') if raw_timestamp else start
+    return row_telegram_id, start, end, exercise_id, reps, weight, set_number, timestamp
+
+
+def import_history(db, rows: Iterable[Dict[str, Any]], telegram_id: Optional[int] = None,
+                   chunk_size: int = IMPORT_CHUNK_SIZE, max_errors: int = 20) -> Dict[str, Any]:
+    """Перевіряє кожен рядок і записує пачками по chunk_size (одна транзакція executemany на пачку).
+
+    Рядки з помилками пропускаються; перші max_errors причин повертаються в 'errors'.
+    Тренування визначається парою (користувач, workout_start); підходи, що вже є в
+    ньому, пропускаються ('duplicates'), тож повторний імпорт експорту нічого не додає.
+    Наприкінці перераховуються підсумкові таблиці й зберігаються звіти нових і доповнених тренувань.
+    """
+    result = {'rows': 0, 'imported': 0, 'duplicates': 0, 'rejected': 0, 'users': 0, 'workouts': 0, 'errors': []}
+    chunk: List[Tuple] = []
+    # Тренування, створені цим імпортом: їхні підходи з наступних пачок не звіряються з уже записаними
+    created: Set[Tuple[int, datetime]] = set()
+
+    def flush():
+        users, workouts, duplicates = db.import_rows(chunk, created)
+        result['imported'] += len(chunk) - duplicates
+        result['duplicates'] += duplicates
+        result['users'] += users
+        result['workouts'] += workouts
+        chunk.clear()
+
+    for line_number, row in enumerate(rows, 1):
+        result['rows'] += 1
+        try:
+            chunk.append(validate_row(row, db.catalog, telegram_id))
+        except ValueError as e:
+            result['rejected'] += 1
+            if len(result['errors']) < max_errors:
+                result['errors'].append(f"рядок {line_number}: {e}")
+            continue
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+
+    if result['imported']:
+        db.rebuild_statistics()
+        db.backfill_workout_reports()
+    logging.info(
+        f"📥 Імпортовано {result['imported']} з {result['rows']} підходів "
+        f"({result['workouts']} нових тренувань, {result['users']} нових користувачів, "
+        f"вже були {result['duplicates']}, відхилено {result['rejected']})"
+    )
+    return result
@@ -1,9 +1,11 @@
 import logging
 import os
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
+from telegram.ext import Application, CallbackQueryHandler, CommandHandler, MessageHandler, filters
+from async_database import AsyncDatabaseManager
 from handlers import WorkoutHandlers
-from database import DatabaseManager
-import openai
+from sharding import open_database
+from metrics import start_metrics_server
+import config
 
 
 logging.basicConfig(
@@ -16,33 +18,78 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def build_application(bot_token: str) -> Application:
+    """Одна спільна база (ініціалізується один раз) і зареєстровані обробники"""
+    db = AsyncDatabaseManager(open_database(config.DB_PATH, config.DB_SHARDS))
+    handlers = WorkoutHandlers(db)
+    serialized = handlers.user_locks.serialized
+
+    # Фонові завдання стартують разом із циклом подій бота
+    async def start_background_jobs(application: Application):
+        handlers.rollup_compactor.start()
+
+    async def stop_background_jobs(application: Application):
+        # Спершу дописуємо буфер групового запису, і лише потім закриваємо базу
+        await handlers.rollup_compactor.stop()
+        if db.set_writer:
+            await db.set_writer.stop()
+        await handlers.transcription_queue.stop()
+        db.close()
+
+    # Оновлення різних користувачів обробляються паралельно, одного — по черзі (UserLocks)
+    app = (
+        Application.builder()
+        .token(bot_token)
+        .concurrent_updates(config.CONCURRENT_UPDATES)
+        .post_init(start_background_jobs)
+        .post_shutdown(stop_background_jobs)
+        .build()
+    )
+    app.add_handler(CommandHandler("start", serialized(handlers.start_command)))
+    app.add_handler(CommandHandler("help", serialized(handlers.help_command)))
+    app.add_handler(CommandHandler("history", serialized(handlers.history_command)))
+    app.add_handler(CommandHandler("progress", serialized(handlers.progress_command)))
+    app.add_handler(CommandHandler("week", serialized(handlers.week_command)))
+    app.add_handler(CommandHandler("month", serialized(handlers.month_command)))
+    app.add_handler(CommandHandler("export", serialized(handlers.export_command)))
+    app.add_handler(CommandHandler("perf", handlers.perf_command))
+    app.add_handler(CallbackQueryHandler(serialized(handlers.handle_history_callback), pattern=r"^(history|report):"))
+    app.add_handler(MessageHandler(filters.VOICE, serialized(handlers.handle_voice_message)))
+    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, serialized(handlers.handle_button_press)))
+    return app
+
 def main():
     
     try:
         bot_token = os.environ["TELEGRAM_BOT_TOKEN"]
-        openai.api_key = os.environ["OPENAI_API_KEY"] 
     except KeyError as e:
         logger.error(f"❌ Змінна середовища {e} не задана")
         return
 
-   
-    db = DatabaseManager()
-    if not db.get_all_exercises():
-        logger.info("📋 Таблиця exercises порожня. Заповнюємо типовими вправами.")
-        db.populate_default_exercises()
+    if config.BOT_MODE == 'webhook' and not config.WEBHOOK_URL:
+        logger.error("❌ Для BOT_MODE=webhook задайте WEBHOOK_URL (публічна адреса бота)")
+        return
 
-    
-    app = Application.builder().token(bot_token).build()
-    handlers = WorkoutHandlers()
+    if config.SPEECH_BACKEND == 'openai' and not os.getenv("OPENAI_API_KEY"):
+        logger.error("❌ Змінна середовища 'OPENAI_API_KEY' не задана (потрібна для SPEECH_BACKEND=openai)")
+        return
 
-    
-    app.add_handler(CommandHandler("start", handlers.start_command))
-    app.add_handler(CommandHandler("help", handlers.help_command))
-    app.add_handler(MessageHandler(filters.VOICE, handlers.handle_voice_message))
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handlers.handle_button_press))
+    app = build_application(bot_token)
+    start_metrics_server(config.METRICS_PORT, config.METRICS_HOST)
 
-    logger.info("✅ Бот запущено й слухає повідомлення...")
-    app.run_polling(allowed_updates=["message"])
+    if config.BOT_MODE == 'webhook':
+        logger.info(f"✅ Бот запущено у режимі webhook на {config.WEBHOOK_LISTEN}:{config.WEBHOOK_PORT}/{config.WEBHOOK_PATH}")
+        app.run_webhook(
+            listen=config.WEBHOOK_LISTEN,
+            port=config.WEBHOOK_PORT,
+            url_path=config.WEBHOOK_PATH,
+            webhook_url=f"{config.WEBHOOK_URL.rstrip('/')}/{config.WEBHOOK_PATH}",
+            secret_token=config.WEBHOOK_SECRET_TOKEN,
+            allowed_updates=["message", "callback_query"]
+        )
+    else:
+        logger.info("✅ Бот запущено й слухає повідомлення...")
+        app.run_polling(allowed_updates=["message", "callback_query"])
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,145 @@
+import argparse
+import logging
+import sys
+from database import DatabaseManager
+from history_io import IMPORT_CHUNK_SIZE, READERS, WRITERS, import_history
+from sharding import ShardedDatabaseManager, open_database, reshard
+from rollup_compactor import RollupCompactor
+import config
+
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+
+
+def rebuild_stats(db: DatabaseManager, args) -> int:
+    db.rebuild_statistics()
+    return 0
+
+
+def check_stats(db: DatabaseManager, args) -> int:
+    mismatched = db.check_statistics()
+    if mismatched:
+        logging.error(f"❌ Розбіжності у статистиці користувачів: {mismatched}")
+        return 1
+    logging.info("✅ Підсумкова статистика збігається з прямими запитами")
+    return 0
+
+
+def reshard_command(db, args) -> int:
+    sources = db.shards if isinstance(db, ShardedDatabaseManager) else [db]
+    target = open_database(args.target_db, args.to)
+    try:
+        copied = reshard(sources, target)
+    except ValueError as e:
+        logging.error(f"❌ {e}")
+        return 1
+    finally:
+        target.close()
+    logging.info(f"✅ Перешардовано в {args.to} шард(ів) ({args.target_db}): {copied}")
+    return 0
+
+
+def shard_stats(db, args) -> int:
+    if not isinstance(db, ShardedDatabaseManager):
+        logging.error("❌ База не шардована: вкажіть --shards N (або DB_SHARDS)")
+        return 1
+    stats = db.global_statistics()
+    print(f"Шардів: {stats['shards']}, користувачів по шардах: {stats['users_per_shard']}")
+    print(f"Користувачів: {stats['total_users']}, тренувань: {stats['total_workouts']}, "
+          f"підходів: {stats['total_sets']}, повторень: {stats['total_reps']}, хвилин: {stats['total_time']}")
+    for name, sets_count in stats['top_exercises']:
+        print(f"  {name}: {sets_count}")
+    return 0
+
+
+def export_history(db, args) -> int:
+    user_id = db.get_user_id(args.telegram_id)
+    if user_id is None:
+        logging.error(f"❌ Користувача {args.telegram_id} не знайдено")
+        return 1
+    with open(args.output, 'w', encoding='utf-8', newline='') as stream:
+        count = WRITERS[args.format](db.iter_user_sets(user_id), stream)
+    logging.info(f"📤 Експортовано {count} підходів у {args.output}")
+    return 0
+
+
+def import_history_command(db, args) -> int:
+    with open(args.path, encoding='utf-8', newline='') as stream:
+        result = import_history(
+            db, READERS[args.format](stream),
+            telegram_id=args.telegram_id, chunk_size=args.chunk_size
+        )
+    for error in result['errors']:
+        logging.error(f"❌ {error}")
+    return 1 if result['rejected'] else 0
+
+
+def range_stats(db, args) -> int:
+    user_id = 0
+    if args.telegram_id is not None:
+        user_id = db.get_user_id(args.telegram_id)
+        if user_id is None:
+            logging.error(f"❌ Користувача {args.telegram_id} не знайдено")
+            return 1
+    stats = db.get_range_statistics(user_id, args.start, args.end)
+    who = f"користувач {args.telegram_id}" if user_id else "усі користувачі"
+    print(f"{args.start} — {args.end} ({who}): тренувань {stats['workouts']}, підходів {stats['sets']}, "
+          f"повторень {stats['reps']}, об'єм {stats['volume']:.0f} кг, хвилин {stats['minutes']}")
+    for name, sets_count in stats['top_exercises']:
+        print(f"  {name}: {sets_count}")
+    return 0
+
+
+def compact_rollups(db, args) -> int:
+    before = RollupCompactor(db, retention_days=args.retention_days).cutoff()
+    moved = db.compact_rollups(before)
+    logging.info(f"🗜️ Ущільнено {moved} денних рядків підсумків до {before}")
+    return 0
+
+
+COMMANDS = {
+    'rebuild-stats': (rebuild_stats, "перерахувати підсумкові таблиці статистики"),
+    'check-stats': (check_stats, "звірити підсумкові таблиці з прямими запитами"),
+    'reshard': (reshard_command, "перенести дані в іншу кількість шардів (--to N --target-db PATH)"),
+    'shard-stats': (shard_stats, "зведена статистика по всіх шардах"),
+    'export-history': (export_history, "усі підходи користувача у CSV/JSON (--telegram-id ID --output PATH)"),
+    'import-history': (import_history_command, "імпорт підходів з CSV/JSON з перевіркою кожного рядка"),
+    'range-stats': (range_stats, "підсумки за період з денних/тижневих таблиць (--from, --to)"),
+    'compact-rollups': (compact_rollups, "перенести старі денні підсумки в тижневі"),
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Службові команди бота тренувань")
+    parser.add_argument('--db', default=config.DB_PATH, help="шлях до файлу бази даних")
+    parser.add_argument('--shards', type=int, default=config.DB_SHARDS, help="кількість шардів бази")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subcommands = {}
+    for name, (_, help_text) in COMMANDS.items():
+        subcommands[name] = subparsers.add_parser(name, help=help_text)
+    subcommands['reshard'].add_argument('--to', type=int, required=True, help="нова кількість шардів")
+    subcommands['reshard'].add_argument('--target-db', required=True, help="шлях нової бази (для шардів — основа імен файлів)")
+    subcommands['export-history'].add_argument('--telegram-id', type=int, required=True)
+    subcommands['export-history'].add_argument('--format', choices=sorted(WRITERS), default='csv')
+    subcommands['export-history'].add_argument('--output', required=True, help="файл результату")
+    subcommands['import-history'].add_argument('path', help="файл CSV або JSON у форматі експорту")
+    subcommands['import-history'].add_argument('--format', choices=sorted(READERS), default='csv')
+    subcommands['import-history'].add_argument('--telegram-id', type=int, help="для файлів без колонки telegram_id")
+    subcommands['import-history'].add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help="рядків на транзакцію")
+    subcommands['range-stats'].add_argument('--from', dest='start', required=True, help="YYYY-MM-DD, включно")
+    subcommands['range-stats'].add_argument('--to', dest='end', required=True, help="YYYY-MM-DD, не включно")
+    subcommands['range-stats'].add_argument('--telegram-id', type=int, help="без нього — усі користувачі")
+    subcommands['compact-rollups'].add_argument('--retention-days', type=int, default=config.ROLLUP_DAY_RETENTION_DAYS)
+    args = parser.parse_args()
+
+    db = open_database(args.db, args.shards)
+    try:
+        return COMMANDS[args.command][0](db, args)
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,272 @@
+import asyncio
+import bisect
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+import config
+
+# Межі кошиків гістограм у секундах: від 50 мкс до ~100 с, кожна вдвічі більша
+BUCKETS = tuple(0.00005 * 2 ** index for index in range(22))
+
+
+class Histogram:
+    """Гістограма з фіксованими кошиками.
+
+    observe() лише дописує значення в deque (атомарно, без замка); у кошики
+    значення розкладаються пачками — кожні FLUSH_EVERY записів або при читанні.
+    """
+
+    FLUSH_EVERY = 256
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        pending = self._pending
+        pending.append(value)
+        if len(pending) >= self.FLUSH_EVERY:
+            self._flush(blocking=False)
+
+    def _flush(self, blocking: bool = True):
+        if not self._lock.acquire(blocking):
+            return
+        try:
+            pending, buckets, counts = self._pending, self.buckets, self.counts
+            for _ in range(len(pending)):
+                value = pending.popleft()
+                counts[bisect.bisect_left(buckets, value)] += 1
+                self.count += 1
+                self.sum += value
+        finally:
+            self._lock.release()
+
+    def snapshot(self) -> Tuple[List[int], int, float]:
+        """(кількості по кошиках, загальна кількість, сума)"""
+        self._flush()
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+    def quantile(self, fraction: float) -> float:
+        """Оцінка квантиля лінійною інтерполяцією всередині кошика"""
+        counts, count, _ = self.snapshot()
+        if not count:
+            return 0.0
+        rank = fraction * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+
+class Registry:
+    """Метрики з однією міткою (наприклад, method) і показники, що обчислюються при читанні"""
+
+    def __init__(self, namespace: str = "workout_bot"):
+        self.namespace = namespace
+        self.histograms: Dict[str, Dict[str, Histogram]] = {}
+        self.counters: Dict[str, Dict[str, Counter]] = {}
+        self.help: Dict[str, str] = {}
+        self.gauges: Dict[str, Callable[[], Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, label: str, help_text: str = "") -> Histogram:
+        with self._lock:
+            family = self.histograms.setdefault(name, {})
+            self.help.setdefault(name, help_text)
+            return family.setdefault(label, Histogram())
+
+    def counter(self, name: str, label: str, help_text: str = "") -> Counter:
+        with self._lock:
+            family = self.counters.setdefault(name, {})
+            self.help.setdefault(name, help_text)
+            return family.setdefault(label, Counter())
+
+    def register_gauges(self, name: str, collect: Callable[[], Dict[str, float]], help_text: str = ""):
+        """collect() повертає {мітка: значення}; викликається лише під час читання метрик"""
+        self.gauges[name] = collect
+        self.help[name] = help_text
+
+    def collect_gauges(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for name, collect in list(self.gauges.items()):
+            try:
+                result[name] = {label: value for label, value in collect().items() if isinstance(value, (int, float))}
+            except Exception as e:
+                logging.error(f"Помилка збору метрики {name}: {e}")
+        return result
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for name, family in sorted(self.histograms.items()):
+            full_name = f"{self.namespace}_{name}"
+            lines.append(f"# HELP {full_name} {self.help.get(name, '')}")
+            lines.append(f"# TYPE {full_name} histogram")
+            for label, histogram in sorted(family.items()):
+                counts, count, total = histogram.snapshot()
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{full_name}_bucket{{method="{label}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{full_name}_bucket{{method="{label}",le="+Inf"}} {count}')
+                lines.append(f'{full_name}_sum{{method="{label}"}} {total:.6f}')
+                lines.append(f'{full_name}_count{{method="{label}"}} {count}')
+        for name, family in sorted(self.counters.items()):
+            full_name = f"{self.namespace}_{name}"
+            lines.append(f"# HELP {full_name} {self.help.get(name, '')}")
+            lines.append(f"# TYPE {full_name} counter")
+            for label, counter in sorted(family.items()):
+                lines.append(f'{full_name}{{method="{label}"}} {counter.value}')
+        for name, values in sorted(self.collect_gauges().items()):
+            full_name = f"{self.namespace}_{name}"
+            lines.append(f"# HELP {full_name} {self.help.get(name, '')}")
+            lines.append(f"# TYPE {full_name} gauge")
+            for label, value in sorted(values.items()):
+                lines.append(f'{full_name}{{name="{label}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self, limit: int = 15) -> List[Tuple[str, int, float, float, float, float]]:
+        """(метрика, кількість, p50, p95, p99, сумарний час) — найдорожчі за сумарним часом"""
+        rows = []
+        for name, family in self.histograms.items():
+            for label, histogram in family.items():
+                _, count, total = histogram.snapshot()
+                if count:
+                    rows.append((
+                        f"{name}.{label}", count,
+                        histogram.quantile(0.5), histogram.quantile(0.95), histogram.quantile(0.99),
+                        total
+                    ))
+        rows.sort(key=lambda row: row[5], reverse=True)
+        return rows[:limit]
+
+
+REGISTRY = Registry()
+
+
+def timed(name: str, label: Optional[str] = None):
+    """Декоратор: тривалість виклику в гістограму name{method=label}, винятки — у лічильник помилок.
+
+    Працює для звичайних і async-функцій; при METRICS_ENABLED=0 повертає функцію без змін.
+    """
+    def decorator(func):
+        if not config.METRICS_ENABLED:
+            return func
+        method = label or func.__name__
+        histogram = REGISTRY.histogram(f"{name}_seconds", method, f"Тривалість {name} за методами, с")
+        errors = REGISTRY.counter(f"{name}_errors_total", method, f"Винятки {name} за методами")
+        # observe() вбудовано: на гарячому шляху лише два читання годинника і append
+        pending = histogram._pending
+        flush = histogram._flush
+        flush_every = histogram.FLUSH_EVERY
+        perf_counter = time.perf_counter
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    errors.inc()
+                    raise
+                finally:
+                    pending.append(perf_counter() - started)
+                    if len(pending) >= flush_every:
+                        flush(blocking=False)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                pending.append(perf_counter() - started)
+                if len(pending) >= flush_every:
+                    flush(blocking=False)
+        return wrapper
+    return decorator
+
+
+def instrument_methods(name: str, exclude: Tuple[str, ...] = (), include: Optional[Tuple[str, ...]] = None):
+    """Декоратор класу: timed(name) для кожного публічного методу, оголошеного в самому класі.
+
+    include обмежує обгортання переліченими методами — щоб вкладені виклики
+    не вимірювалися вдруге всередині вже виміряного.
+    """
+    def decorator(cls):
+        if not config.METRICS_ENABLED:
+            return cls
+        for attribute, value in list(vars(cls).items()):
+            if attribute.startswith('_') or attribute in exclude or not callable(value) or isinstance(value, type):
+                continue
+            if include is not None and attribute not in include:
+                continue
+            setattr(cls, attribute, timed(name, attribute)(value))
+        return cls
+    return decorator
+
+
+def format_perf_report(limit: int = 15) -> str:
+    """Текст для команди /perf"""
+    lines = ["📈 Найдорожчі операції (кількість, p50/p95/p99 мс, всього с):"]
+    for metric, count, p50, p95, p99, total in REGISTRY.summary(limit):
+        lines.append(f"• {metric}: {count}, {p50 * 1000:.2f}/{p95 * 1000:.2f}/{p99 * 1000:.2f}, {total:.3f}")
+    for name, values in sorted(REGISTRY.collect_gauges().items()):
+        shown = ', '.join(f"{label}={value:g}" for label, value in sorted(values.items()))
+        lines.append(f"📊 {name}: {shown}")
+    if len(lines) == 1:
+        lines.append("Ще немає даних.")
+    return '\n'.join(lines)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        payload = REGISTRY.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """Віддає /metrics у форматі Prometheus з фонового потоку; port=0 — вимкнено"""
+    if not port or not config.METRICS_ENABLED:
+        return None
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logging.info(f"📈 Метрики доступні на http://{host}:{port}/metrics")
+    return server
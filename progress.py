@@ -0,0 +1,121 @@
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+import numpy as np
+
+# Рядок історії: вправа, повторення, вага (0 — без ваги), день тренування від 1970-01-01
+HISTORY_DTYPE = np.dtype([('exercise', np.int32), ('reps', np.int32), ('weight', np.float64), ('day', np.int32)])
+EPOCH = date(1970, 1, 1)
+
+
+def load_history(rows: Iterable[Tuple]) -> np.ndarray:
+    """Рядки з курсора одразу в стовпчиковий масив, без проміжного списку кортежів"""
+    return np.fromiter(rows, dtype=HISTORY_DTYPE)
+
+
+def estimate_1rm(weight: np.ndarray, reps: np.ndarray) -> np.ndarray:
+    """Формула Еплі: вага × (1 + повторення / 30); для одного повторення — сама вага, без ваги — 0"""
+    estimate = np.where(reps == 1, weight, weight * (1 + reps / 30.0))
+    return np.where(weight > 0, estimate, 0.0)
+
+
+def week_of(day: np.ndarray) -> np.ndarray:
+    """Номер тижня з понеділка: 1970-01-01 — четвер, тож зсув на 3 дні"""
+    return (day + 3) // 7
+
+
+def week_start(week: int) -> date:
+    return EPOCH + timedelta(days=int(week) * 7 - 3)
+
+
+def _group_starts(sorted_keys: np.ndarray) -> np.ndarray:
+    """Індекси початку кожної групи однакових ключів у відсортованому масиві"""
+    return np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+
+
+def compute_progress(history: np.ndarray, names: Dict[int, str], weeks: int = 8, trend_weeks: int = 12,
+                     limit: int = 10, today: Optional[date] = None) -> Dict[str, Any]:
+    """Рекорди, тренд оцінки 1ПМ і тижневий об'єм — векторними проходами по всій історії.
+
+    records: по вправах (за кількістю підходів) — найбільша вага, повторення й оцінка 1ПМ;
+    trend: найкраща за тиждень оцінка 1ПМ за останні trend_weeks тижнів — остання й нахил
+    прямої (кг/тиждень, метод найменших квадратів); weekly_volume: повторення × вага за тижнями.
+    """
+    today = today or date.today()
+    current_week = int(week_of(np.int64((today - EPOCH).days)))
+    result = {'total_sets': int(len(history)), 'records': [], 'trend': [], 'weekly_volume': []}
+    if not len(history):
+        return result
+
+    reps = history['reps'].astype(np.float64)
+    weight = history['weight']
+    week = week_of(history['day'].astype(np.int64))
+    one_rm = estimate_1rm(weight, reps)
+
+    # Рекорди: сортування за вправою і згортка reduceat по групах
+    order = np.argsort(history['exercise'], kind='stable')
+    exercise_sorted = history['exercise'][order]
+    starts = _group_starts(exercise_sorted)
+    exercise_ids = exercise_sorted[starts]
+    sets_count = np.diff(np.r_[starts, len(order)])
+    best_weight = np.maximum.reduceat(weight[order], starts)
+    best_reps = np.maximum.reduceat(reps[order], starts)
+    best_1rm = np.maximum.reduceat(one_rm[order], starts)
+    top = np.argsort(-sets_count, kind='stable')[:limit]
+    result['records'] = [
+        {
+            'exercise': names.get(int(exercise_ids[index]), str(exercise_ids[index])),
+            'sets': int(sets_count[index]),
+            'best_weight': float(best_weight[index]),
+            'best_reps': int(best_reps[index]),
+            'best_1rm': round(float(best_1rm[index]), 1),
+        }
+        for index in top
+    ]
+
+    # Тренд 1ПМ: найкраща оцінка в кожній парі (вправа, тиждень), далі регресія через bincount
+    recent = (one_rm > 0) & (week > current_week - trend_weeks) & (week <= current_week)
+    if recent.any():
+        group_of = np.searchsorted(exercise_ids, history['exercise'][recent])
+        week_offset = week[recent] - (current_week - trend_weeks + 1)
+        keys = group_of.astype(np.int64) * trend_weeks + week_offset
+        key_order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[key_order]
+        key_starts = _group_starts(sorted_keys)
+        weekly_best = np.maximum.reduceat(one_rm[recent][key_order], key_starts)
+        group = sorted_keys[key_starts] // trend_weeks
+        x = (sorted_keys[key_starts] % trend_weeks).astype(np.float64)
+
+        groups = len(exercise_ids)
+        points = np.bincount(group, minlength=groups).astype(np.float64)
+        sum_x = np.bincount(group, weights=x, minlength=groups)
+        sum_y = np.bincount(group, weights=weekly_best, minlength=groups)
+        sum_xy = np.bincount(group, weights=x * weekly_best, minlength=groups)
+        sum_xx = np.bincount(group, weights=x * x, minlength=groups)
+        denominator = points * sum_xx - sum_x ** 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = np.where(denominator > 0, (points * sum_xy - sum_x * sum_y) / denominator, 0.0)
+        # Остання група кожної вправи — її найсвіжіший тиждень
+        last = np.r_[np.flatnonzero(group[1:] != group[:-1]), len(group) - 1]
+        latest = np.zeros(groups)
+        latest[group[last]] = weekly_best[last]
+        trending = np.flatnonzero(points >= 2)
+        trending = trending[np.argsort(-sets_count[trending], kind='stable')][:limit]
+        result['trend'] = [
+            {
+                'exercise': names.get(int(exercise_ids[index]), str(exercise_ids[index])),
+                'latest_1rm': round(float(latest[index]), 1),
+                'slope_per_week': round(float(slope[index]), 2),
+                'weeks': int(points[index]),
+            }
+            for index in trending
+        ]
+
+    # Тижневий об'єм за останні weeks тижнів, включно з тижнями без тренувань
+    offset = week - (current_week - weeks + 1)
+    in_range = (offset >= 0) & (offset < weeks)
+    volume = np.bincount(offset[in_range], weights=(reps * weight)[in_range], minlength=weeks)
+    result['weekly_volume'] = [
+        (week_start(current_week - weeks + 1 + index).isoformat(), round(float(value), 1))
+        for index, value in enumerate(volume)
+    ]
+    return result
@@ -1,7 +1,6 @@
-from datetime import datetime
+from datetime import date, datetime
 import logging
-from typing import Dict, Any
-from collections import defaultdict
+from typing import Dict, Any, List, Tuple
 
 class ReportGenerator:
     def __init__(self):
@@ -9,57 +8,11 @@ class ReportGenerator:
 
     def generate_workout_report(self, workout_data: Dict[str, Any]) -> str:
         try:
-            start_time = datetime.fromisoformat(workout_data['start_time'])
-            end_time = datetime.fromisoformat(workout_data['end_time'])
-
-            duration = end_time - start_time
-            duration_minutes = int(duration.total_seconds() / 60)
-
-            exercises_data = defaultdict(list)
-            for exercise_name, reps, weight, set_number in workout_data['sets']:
-                exercises_data[exercise_name].append({
-                    'reps': reps,
-                    'weight': weight if weight is not None else 0,
-                    'set_number': set_number
-                })
-
-            report = "🏁 Тренування завершено!\n\n"
-            report += f"⏱️ Час тренування: {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')} ({duration_minutes} хв)\n\n"
-
-            if not workout_data['sets']:
-                report += "😔 Жодних вправ не зроблено."
-                return report
-
-            report += "💪 Ви зробили такі вправи:\n"
-
-            total_sets = 0
-            total_reps = 0
-
-            for exercise_name, sets_list in exercises_data.items():
-                sets_count = len(sets_list)
-                total_sets += sets_count
-
-                exercise_total_reps = sum(s['reps'] for s in sets_list)
-                total_reps += exercise_total_reps
-
-                weights = [s['weight'] for s in sets_list]
-                avg_weight = sum(weights) / sets_count if sets_count > 0 else 0
-
-                exercise_line = f"- {exercise_name.capitalize()}: підходів - {sets_count}, повторень - {exercise_total_reps}"
-                if avg_weight > 0:
-                    exercise_line += f" (сер. вага {avg_weight:.1f} кг)"
-                exercise_line += "\n"
-
-                report += exercise_line
-
-            report += f"\n🔥 Загалом: підходів - {total_sets}, повторень - {total_reps}"
-            return report
-
+            return render_workout_report(summarize_workout(workout_data))
         except Exception as e:
             logging.error(f"Помилка генерації звіту: {e}")
             return "❌ Помилка при створенні звіту тренування"
 
-
     def format_exercise_confirmation(self, exercise_data: Dict[str, Any]) -> str:
         text = f"✅ Додано: {exercise_data['exercise'].capitalize()}"
         text += f", повторень - {exercise_data['reps']}"
@@ -71,3 +24,98 @@ class ReportGenerator:
             text += f", {exercise_data['weight']} кг"
 
         return text
+
+    def format_sets_confirmation(self, sets: List[Dict[str, Any]]) -> str:
+        """Одне підтвердження на всі підходи з повідомлення"""
+        return '\n'.join(self.format_exercise_confirmation(exercise_data) for exercise_data in sets)
+
+
+def summarize_workout(workout_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Стислий підсумок тренування (зберігається в JSON разом із готовим звітом)"""
+    start_time = datetime.fromisoformat(str(workout_data['start_time']))
+    end_time = datetime.fromisoformat(str(workout_data['end_time']))
+
+    # Вправи в порядку першої появи: [назва, підходів, повторень, сума ваги]
+    exercises: Dict[str, List] = {}
+    for exercise_name, reps, weight, set_number in workout_data['sets']:
+        totals = exercises.setdefault(exercise_name, [exercise_name, 0, 0, 0.0])
+        totals[1] += 1
+        totals[2] += reps
+        totals[3] += weight or 0
+
+    return {
+        'start': start_time.isoformat(sep=' '),
+        'end': end_time.isoformat(sep=' '),
+        'minutes': int((end_time - start_time).total_seconds() / 60),
+        'exercises': [
+            [name, sets_count, reps, round(weight_sum / sets_count, 1)]
+            for name, sets_count, reps, weight_sum in exercises.values()
+        ],
+        'sets': sum(totals[1] for totals in exercises.values()),
+        'reps': sum(totals[2] for totals in exercises.values()),
+    }
+
+
+def render_workout_report(summary: Dict[str, Any]) -> str:
+    start_time = datetime.fromisoformat(summary['start'])
+    end_time = datetime.fromisoformat(summary['end'])
+    lines = [
+        "🏁 Тренування завершено!",
+        "",
+        f"⏱️ Час тренування: {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')} ({summary['minutes']} хв)",
+        "",
+    ]
+    if not summary['exercises']:
+        lines.append("😔 Жодних вправ не зроблено.")
+        return '\n'.join(lines)
+
+    lines.append("💪 Ви зробили такі вправи:")
+    for name, sets_count, reps, avg_weight in summary['exercises']:
+        line = f"- {name.capitalize()}: підходів - {sets_count}, повторень - {reps}"
+        if avg_weight > 0:
+            line += f" (сер. вага {avg_weight:.1f} кг)"
+        lines.append(line)
+    lines.append("")
+    lines.append(f"🔥 Загалом: підходів - {summary['sets']}, повторень - {summary['reps']}")
+    return '\n'.join(lines)
+
+
+def format_history_page(entries: List[Tuple[int, Dict[str, Any]]]) -> str:
+    """Сторінка /history: по рядку на тренування, найновіші першими"""
+    lines = ["📜 Ваші тренування:", ""]
+    for index, (workout_id, summary) in enumerate(entries, 1):
+        started = datetime.fromisoformat(summary['start'])
+        lines.append(
+            f"{index}. {started.strftime('%d.%m.%Y %H:%M')} — {summary['minutes']} хв, "
+            f"підходів {summary['sets']}, повторень {summary['reps']}"
+        )
+    lines.append("")
+    lines.append("Натисніть номер, щоб побачити звіт.")
+    return '\n'.join(lines)
+
+
+def format_progress(progress: Dict[str, Any]) -> str:
+    """Текст для /progress з результату progress.compute_progress"""
+    if not progress['total_sets']:
+        return "📈 Ще немає підходів для аналізу прогресу.\nРозпочніть тренування! 💪"
+
+    lines = ["📈 Ваш прогрес", "", "🏆 Особисті рекорди:"]
+    for record in progress['records']:
+        line = f"• {record['exercise'].capitalize()}: підходів {record['sets']}, найбільше повторень {record['best_reps']}"
+        if record['best_weight'] > 0:
+            line += f", вага {record['best_weight']:g} кг, 1ПМ ≈ {record['best_1rm']:.1f} кг"
+        lines.append(line)
+
+    if progress['trend']:
+        lines += ["", "📐 Оцінка 1ПМ (формула Еплі), зміна за тиждень:"]
+        for trend in progress['trend']:
+            sign = "+" if trend['slope_per_week'] >= 0 else ""
+            lines.append(
+                f"• {trend['exercise'].capitalize()}: {trend['latest_1rm']:.1f} кг "
+                f"({sign}{trend['slope_per_week']:.1f} кг/тиждень, тижнів: {trend['weeks']})"
+            )
+
+    lines += ["", "📊 Об'єм по тижнях (повторення × вага):"]
+    for week, volume in progress['weekly_volume']:
+        lines.append(f"• з {date.fromisoformat(week).strftime('%d.%m')}: {volume:,.0f} кг".replace(',', ' '))
+    return '\n'.join(lines)
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Optional
+
+
+class RollupCompactor:
+    """Фонове ущільнення підсумків: дні, старші за retention_days, переносяться в тижневі рядки.
+
+    Переносяться лише цілі тижні (межа — понеділок), тож діапазони в межах
+    retention_days рахуються з точністю до дня, старіші — до тижня.
+    """
+
+    def __init__(self, db, interval: float = 3600.0, retention_days: int = 62):
+        self.db = db
+        self.interval = interval
+        self.retention_days = retention_days
+        self.compacted_rows = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def cutoff(self, today: Optional[date] = None) -> str:
+        oldest_kept = (today or date.today()) - timedelta(days=self.retention_days)
+        return (oldest_kept - timedelta(days=oldest_kept.weekday())).isoformat()
+
+    def start(self):
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run())
+        logging.info(f"🗜️ Ущільнення підсумків: раз на {self.interval:.0f} с, дні зберігаються {self.retention_days} днів")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def compact_once(self) -> int:
+        moved = await self.db.compact_rollups(self.cutoff())
+        self.compacted_rows += moved
+        if moved:
+            logging.info(f"🗜️ Ущільнено {moved} денних рядків підсумків до {self.cutoff()}")
+        return moved
+
+    async def _run(self):
+        while True:
+            try:
+                await self.compact_once()
+            except Exception as e:
+                logging.error(f"Помилка ущільнення підсумків: {e}")
+            await asyncio.sleep(self.interval)
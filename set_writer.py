@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+
+class GroupCommitWriter:
+    """Відкладений груповий запис підходів.
+
+    Рядки від усіх користувачів збираються в буфер і вставляються однією
+    транзакцією раз на flush_interval секунд або щойно набереться max_rows.
+    submit() завершується лише після коміту, тож підтвердження користувачу
+    ніколи не випереджає запис. Стійкість до вимкнення живлення — лише з
+    PRAGMA synchronous = FULL, яку AsyncDatabaseManager вмикає разом із груповим
+    записом (з NORMAL у WAL останні коміти можуть зникнути).
+
+    partition(row) ділить пачку на незалежні транзакції (наприклад, по шардах):
+    вони вставляються паралельно, і помилка однієї отримують лише ті, чиї
+    рядки в ній були.
+    """
+
+    LATENCY_WINDOW = 1000
+
+    def __init__(self, insert: Callable[[List[Tuple]], Awaitable[int]],
+                 flush_interval: float = 0.02, max_rows: int = 500,
+                 partition: Optional[Callable[[Tuple], Hashable]] = None):
+        self.insert = insert
+        self.partition = partition
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self._pending: List[Tuple[List[Tuple], asyncio.Future, float]] = []
+        self._pending_rows = 0
+        self._has_data: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.flushes = 0
+        self.rows_written = 0
+        self.max_flush_size = 0
+        self.failed_flushes = 0
+        self._commit_times: Deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+        self._wait_times: Deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+
+    def start(self):
+        if self._task:
+            return
+        self._has_data = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logging.info(f"💾 Груповий запис підходів: кожні {self.flush_interval * 1000:.0f} мс або {self.max_rows} рядків")
+
+    async def stop(self):
+        """Дописує буфер і зупиняє фонову задачу; поточне скидання не переривається"""
+        if self._task:
+            self._stopping = True
+            self._has_data.set()
+            self._full.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            self._stopping = False
+        # Рядки, надіслані, поки фонова задача завершувалась
+        await self.flush()
+
+    async def submit(self, rows: List[Tuple]) -> int:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((rows, future, time.monotonic()))
+        self._pending_rows += len(rows)
+        self._has_data.set()
+        if self._pending_rows >= self.max_rows:
+            self._full.set()
+        return await future
+
+    async def _run(self):
+        while True:
+            await self._has_data.wait()
+            if not self._stopping:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self.flush()
+            if self._stopping:
+                return
+
+    async def flush(self):
+        batch, self._pending = self._pending, []
+        self._pending_rows = 0
+        if self._has_data is not None:
+            self._has_data.clear()
+            self._full.clear()
+        if not batch:
+            return
+
+        # Рядки одного submit() належать одному тренуванню, тож і одній частині
+        groups: Dict[Hashable, List[Tuple[List[Tuple], asyncio.Future, float]]] = {}
+        for entry in batch:
+            entry_rows = entry[0]
+            key = self.partition(entry_rows[0]) if self.partition and entry_rows else None
+            groups.setdefault(key, []).append(entry)
+        group_rows = [[row for entry_rows, _, _ in entries for row in entry_rows] for entries in groups.values()]
+
+        started = time.monotonic()
+        results = await asyncio.gather(*(self.insert(rows) for rows in group_rows), return_exceptions=True)
+        committed = time.monotonic()
+
+        written = 0
+        for entries, rows, result in zip(groups.values(), group_rows, results):
+            if isinstance(result, BaseException):
+                self.failed_flushes += 1
+                logging.error(f"Помилка групового запису {len(rows)} підходів: {result}", exc_info=result)
+                for _, future, _ in entries:
+                    if not future.done():
+                        future.set_exception(result)
+                continue
+            written += len(rows)
+            for entry_rows, future, queued_at in entries:
+                self._wait_times.append(committed - queued_at)
+                if not future.done():
+                    future.set_result(len(entry_rows))
+        if not written:
+            return
+
+        self.flushes += 1
+        self.rows_written += written
+        self.max_flush_size = max(self.max_flush_size, written)
+        self._commit_times.append(committed - started)
+
+    def stats(self) -> Dict[str, Any]:
+        """Розмір скидань і затримки (мс) за останні LATENCY_WINDOW записів"""
+        return {
+            'flushes': self.flushes,
+            'rows': self.rows_written,
+            'failed_flushes': self.failed_flushes,
+            'avg_flush_size': self.rows_written / self.flushes if self.flushes else 0.0,
+            'max_flush_size': self.max_flush_size,
+            'pending_rows': self._pending_rows,
+            'commit_ms_p50': _percentile(self._commit_times, 0.5) * 1000,
+            'commit_ms_p95': _percentile(self._commit_times, 0.95) * 1000,
+            'wait_ms_p50': _percentile(self._wait_times, 0.5) * 1000,
+            'wait_ms_p95': _percentile(self._wait_times, 0.95) * 1000,
+        }
+
+
+def _percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
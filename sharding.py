@@ -0,0 +1,362 @@
+import hashlib
+import logging
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+from database import DatabaseManager, range_result
+
+
+def shard_paths(db_path: str, shards: int) -> List[str]:
+    """workout_bot.db -> workout_bot.0.db, workout_bot.1.db, ..."""
+    root, ext = os.path.splitext(db_path)
+    return [f"{root}.{index}{ext}" for index in range(shards)]
+
+
+def shard_for_telegram_id(telegram_id: int, shards: int) -> int:
+    """Стабільний між запусками і процесами номер шарда користувача"""
+    if shards == 1:
+        return 0
+    digest = hashlib.blake2b(str(telegram_id).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % shards
+
+
+def shard_of_id(global_id: int, shards: int) -> int:
+    return global_id % shards
+
+
+def open_database(db_path: str, shards: int = 1) -> Union[DatabaseManager, "ShardedDatabaseManager"]:
+    """Одна база або набір шардів залежно від налаштувань"""
+    if shards > 1:
+        return ShardedDatabaseManager(db_path, shards)
+    return DatabaseManager(db_path)
+
+
+class ShardedDatabaseManager:
+    """DatabaseManager поверх N файлів SQLite.
+
+    Користувач і всі його дані живуть в одному шарді (за хешем telegram_id),
+    тож кожен шард має власне блокування запису і пишеться паралельно.
+    Назовні id користувачів і тренувань глобальні: local_id * N + номер шарда.
+    Довідник вправ копіюється в усі шарди з однаковими id; кеш розпізнавання
+    лежить у шарді 0.
+    """
+
+    def __init__(self, db_path: str = "workout_bot.db", shards: int = 2):
+        self.db_path = db_path
+        self.shard_count = shards
+        self.shards = [DatabaseManager(path) for path in shard_paths(db_path, shards)]
+        self.catalog = self.shards[0].catalog
+        # Постійні потоки: з'єднання кожного потоку з кожним шардом відкриваються один раз
+        self._pool = ThreadPoolExecutor(max_workers=shards, thread_name_prefix="db-shard")
+        self.replicate_exercises()
+        logging.info(f"✅ Підключено {shards} шардів бази даних ({db_path})")
+
+    def _global(self, local_id: Optional[int], shard: int) -> Optional[int]:
+        return None if local_id is None else local_id * self.shard_count + shard
+
+    def _local(self, global_id: int) -> Tuple[DatabaseManager, int]:
+        return self.shards[global_id % self.shard_count], global_id // self.shard_count
+
+    def set_synchronous(self, mode: str):
+        for shard in self.shards:
+            shard.set_synchronous(mode)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        for shard in self.shards:
+            shard.close()
+
+    def replicate_exercises(self) -> int:
+        """Копіює довідник вправ із шарда 0 в інші шарди; повертає кількість доданих рядків"""
+        with self.shards[0].connection() as conn:
+            exercises = conn.execute("SELECT id, name FROM exercises").fetchall()
+        added = 0
+        for shard in self.shards[1:]:
+            with shard.connection() as conn:
+                before = conn.total_changes
+                conn.executemany("INSERT OR IGNORE INTO exercises (id, name) VALUES (?, ?)", exercises)
+                added += conn.total_changes - before
+            shard.catalog.invalidate()
+        mismatched = self.check_exercises()
+        if mismatched:
+            logging.error(f"❌ Довідник вправ розходиться між шардами: {mismatched}")
+        return added
+
+    def check_exercises(self) -> List[int]:
+        """Номери шардів, чий довідник вправ відрізняється від шарда 0"""
+        reference = set(self.shards[0]._load_exercises())
+        return [
+            index for index, shard in enumerate(self.shards[1:], 1)
+            if set(shard._load_exercises()) != reference
+        ]
+
+    def populate_default_exercises(self):
+        self.shards[0].populate_default_exercises()
+        self.replicate_exercises()
+
+    def add_exercise(self, name: str) -> int:
+        exercise_id = self.shards[0].add_exercise(name)
+        self.replicate_exercises()
+        return exercise_id
+
+    def add_exercises(self, names: List[str]) -> int:
+        """Усі назви — у шард 0, потім одне копіювання довідника в інші шарди"""
+        inserted = self.shards[0].add_exercises(names)
+        self.replicate_exercises()
+        return inserted
+
+    def get_all_exercises(self) -> List[str]:
+        return self.catalog.names
+
+    def resolve_exercise(self, name: str, text: Optional[str] = None) -> Optional[str]:
+        return self.shards[0].resolve_exercise(name, text)
+
+    def add_user(self, telegram_id: int, username: str = None, first_name: str = None) -> int:
+        shard = shard_for_telegram_id(telegram_id, self.shard_count)
+        return self._global(self.shards[shard].add_user(telegram_id, username, first_name), shard)
+
+    def get_user_id(self, telegram_id: int) -> Optional[int]:
+        shard = shard_for_telegram_id(telegram_id, self.shard_count)
+        return self._global(self.shards[shard].get_user_id(telegram_id), shard)
+
+    def start_workout(self, user_id: int) -> int:
+        db, local_id = self._local(user_id)
+        return self._global(db.start_workout(local_id), user_id % self.shard_count)
+
+    def get_active_workout(self, user_id: int) -> Optional[int]:
+        db, local_id = self._local(user_id)
+        return self._global(db.get_active_workout(local_id), user_id % self.shard_count)
+
+    def add_set(self, workout_id: int, exercise_name: str, reps: int, weight: float = None, set_number: int = None) -> int:
+        db, local_id = self._local(workout_id)
+        return self._global(db.add_set(local_id, exercise_name, reps, weight, set_number), workout_id % self.shard_count)
+
+    def get_set_counters(self, workout_id: int) -> Dict[int, int]:
+        db, local_id = self._local(workout_id)
+        return db.get_set_counters(local_id)
+
+    def add_sets(self, workout_id: int, sets: List[Dict[str, Any]]) -> int:
+        return self.insert_set_rows(self.prepare_set_rows(workout_id, sets))
+
+    def prepare_set_rows(self, workout_id: int, sets: List[Dict[str, Any]]) -> List[Tuple]:
+        return self.shards[0].prepare_set_rows(workout_id, sets)
+
+    def insert_set_rows(self, rows: List[Tuple]) -> int:
+        """Рядки з глобальними workout_id; по одній транзакції на кожен зачеплений шард"""
+        by_shard: Dict[int, List[Tuple]] = {}
+        for row in rows:
+            by_shard.setdefault(row[0] % self.shard_count, []).append(
+                (row[0] // self.shard_count,) + tuple(row[1:])
+            )
+        for shard, shard_rows in by_shard.items():
+            self.shards[shard].insert_set_rows(shard_rows)
+        return len(rows)
+
+    def finish_workout(self, workout_id: int) -> Dict[str, Any]:
+        db, local_id = self._local(workout_id)
+        return db.finish_workout(local_id)
+
+    def get_workout_report(self, workout_id: int, user_id: int) -> Optional[str]:
+        if workout_id % self.shard_count != user_id % self.shard_count:
+            return None
+        db, local_id = self._local(workout_id)
+        return db.get_workout_report(local_id, user_id // self.shard_count)
+
+    def get_workout_history(self, user_id: int, before: Optional[int] = None, limit: int = 5) -> List[Tuple[int, Dict[str, Any]]]:
+        # Тренування живуть у шарді користувача, тож порядок глобальних id збігається з локальним
+        db, local_id = self._local(user_id)
+        shard = user_id % self.shard_count
+        local_before = None if before is None else -(-(before - shard) // self.shard_count)
+        return [
+            (self._global(workout_id, shard), summary)
+            for workout_id, summary in db.get_workout_history(local_id, local_before, limit)
+        ]
+
+    def iter_user_sets(self, user_id: int) -> Iterator[Tuple]:
+        db, local_id = self._local(user_id)
+        shard = user_id % self.shard_count
+        for row in db.iter_user_sets(local_id):
+            yield (self._global(row[0], shard),) + row[1:]
+
+    def iter_progress_rows(self, user_id: int) -> Iterator[Tuple[int, int, float, int]]:
+        db, local_id = self._local(user_id)
+        return db.iter_progress_rows(local_id)
+
+    def import_rows(self, rows: List[Tuple], created: Optional[Set[Tuple[int, Any]]] = None) -> Tuple[int, int, int]:
+        created = set() if created is None else created
+        by_shard: Dict[int, List[Tuple]] = {}
+        for row in rows:
+            by_shard.setdefault(shard_for_telegram_id(row[0], self.shard_count), []).append(row)
+        totals = [self.shards[shard].import_rows(shard_rows, created) for shard, shard_rows in by_shard.items()]
+        return tuple(sum(column) for column in zip(*totals)) if totals else (0, 0, 0)
+
+    def backfill_workout_reports(self) -> int:
+        return sum(self.map_shards(lambda shard: shard.backfill_workout_reports()))
+
+    def get_transcription(self, cache_key: str, max_age: float) -> Optional[str]:
+        return self.shards[0].get_transcription(cache_key, max_age)
+
+    def save_transcriptions(self, cache_keys: List[str], text: str):
+        self.shards[0].save_transcriptions(cache_keys, text)
+
+    def prune_transcriptions(self, max_age: float, max_entries: int) -> int:
+        return self.shards[0].prune_transcriptions(max_age, max_entries)
+
+    def get_user_statistics(self, user_id: int) -> Dict[str, Any]:
+        db, local_id = self._local(user_id)
+        return db.get_user_statistics(local_id)
+
+    def compute_user_statistics(self, user_id: int) -> Dict[str, Any]:
+        db, local_id = self._local(user_id)
+        return db.compute_user_statistics(local_id)
+
+    def compact_rollups(self, before: str) -> int:
+        return sum(self.map_shards(lambda shard: shard.compact_rollups(before)))
+
+    def get_range_statistics(self, user_id: int, start: str, end: str) -> Dict[str, Any]:
+        return range_result(self.range_rollup_rows(user_id, start, end))
+
+    def range_rollup_rows(self, user_id: int, start: str, end: str) -> List[Tuple]:
+        """user_id = 0 — підсумки всіх користувачів: рядки всіх шардів разом"""
+        if user_id == 0:
+            results = self.map_shards(lambda shard: shard.range_rollup_rows(0, start, end))
+            return [row for rows in results for row in rows]
+        db, local_id = self._local(user_id)
+        return db.range_rollup_rows(local_id, start, end)
+
+    def rebuild_statistics(self):
+        self.map_shards(lambda shard: shard.rebuild_statistics())
+
+    def check_statistics(self) -> List[int]:
+        results = self.map_shards(lambda shard: shard.check_statistics())
+        return sorted(
+            self._global(local_id, index)
+            for index, mismatched in enumerate(results)
+            for local_id in mismatched
+        )
+
+    def map_shards(self, func) -> List[Any]:
+        """Виконує func(shard) для всіх шардів паралельно, результати — в порядку шардів"""
+        return list(self._pool.map(func, self.shards))
+
+    def query_all(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        """Той самий запит на всіх шардах; рядки всіх шардів одним списком"""
+        def run(shard: DatabaseManager) -> List[Tuple]:
+            with shard.connection() as conn:
+                return conn.execute(sql, params).fetchall()
+        return [row for rows in self.map_shards(run) for row in rows]
+
+    def global_statistics(self) -> Dict[str, Any]:
+        """Зведена статистика всіх користувачів усіх шардів (з підсумкових таблиць)"""
+        totals = self.query_all('''
+            SELECT (SELECT COUNT(*) FROM users),
+                   COALESCE(SUM(total_workouts), 0), COALESCE(SUM(total_sets), 0),
+                   COALESCE(SUM(total_reps), 0), COALESCE(SUM(total_minutes), 0)
+            FROM user_stats
+        ''')
+        exercises = Counter()
+        for name, sets_count in self.query_all('''
+            SELECT e.name, SUM(st.sets_count)
+            FROM user_exercise_stats st JOIN exercises e ON st.exercise_id = e.id
+            GROUP BY e.name
+        '''):
+            exercises[name] += sets_count
+        return {
+            'shards': self.shard_count,
+            'users_per_shard': [row[0] for row in totals],
+            'total_users': sum(row[0] for row in totals),
+            'total_workouts': sum(row[1] for row in totals),
+            'total_sets': sum(row[2] for row in totals),
+            'total_reps': sum(row[3] for row in totals),
+            'total_time': int(sum(row[4] for row in totals)),
+            'top_exercises': sorted(exercises.items(), key=lambda item: (-item[1], item[0]))[:10]
+        }
+
+
+def reshard(sources: List[DatabaseManager], target: Union[DatabaseManager, ShardedDatabaseManager]) -> Dict[str, int]:
+    """Переносить користувачів з їхніми тренуваннями й підходами в іншу розкладку шардів.
+
+    Цільова розкладка має бути порожньою. Локальні id призначаються заново; вправи зіставляються за назвою,
+    збережені звіти переносяться разом з тренуваннями, кеш розпізнавання — у шард 0. Підсумкові таблиці цілі перераховуються.
+    """
+    targets = target.shards if isinstance(target, ShardedDatabaseManager) else [target]
+    for shard in targets:
+        with shard.connection() as conn:
+            if conn.execute("SELECT 1 FROM users LIMIT 1").fetchone():
+                raise ValueError(f"Цільова база {shard.db_path} вже містить користувачів")
+    copied = Counter()
+    for source in sources:
+        with source.connection() as conn:
+            source_exercises = dict(conn.execute("SELECT id, name FROM exercises"))
+        target.add_exercises(list(source_exercises.values()))
+        exercise_ids = {name: exercise_id for exercise_id, name in targets[0]._load_exercises()}
+
+        with source.connection() as conn:
+            users = conn.execute(
+                "SELECT id, telegram_id, username, first_name, registration_date FROM users ORDER BY id"
+            ).fetchall()
+        for source_user_id, telegram_id, username, first_name, registration_date in users:
+            with source.connection() as conn:
+                workouts = conn.execute(
+                    "SELECT id, start_time, end_time, status FROM workouts WHERE user_id = ? ORDER BY id",
+                    (source_user_id,)
+                ).fetchall()
+                sets = conn.execute('''
+                    SELECT s.workout_id, s.exercise_id, s.reps, s.weight, s.set_number, s.timestamp
+                    FROM sets s JOIN workouts w ON s.workout_id = w.id
+                    WHERE w.user_id = ? ORDER BY s.id
+                ''', (source_user_id,)).fetchall()
+                reports = conn.execute(
+                    "SELECT workout_id, summary, report FROM workout_reports WHERE user_id = ?",
+                    (source_user_id,)
+                ).fetchall()
+
+            shard = targets[shard_for_telegram_id(telegram_id, len(targets))]
+            with shard.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO users (telegram_id, username, first_name, registration_date)
+                    VALUES (?, ?, ?, ?)
+                ''', (telegram_id, username, first_name, registration_date))
+                user_id = cursor.lastrowid
+                workout_ids = {}
+                for source_workout_id, start_time, end_time, status in workouts:
+                    cursor.execute('''
+                        INSERT INTO workouts (user_id, start_time, end_time, status)
+                        VALUES (?, ?, ?, ?)
+                    ''', (user_id, start_time, end_time, status))
+                    workout_ids[source_workout_id] = cursor.lastrowid
+                cursor.executemany('''
+                    INSERT INTO sets (workout_id, exercise_id, reps, weight, set_number, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', [
+                    (workout_ids[workout_id], exercise_ids[source_exercises[exercise_id]], reps, weight, set_number, timestamp)
+                    for workout_id, exercise_id, reps, weight, set_number, timestamp in sets
+                ])
+                cursor.executemany('''
+                    INSERT INTO workout_reports (workout_id, user_id, summary, report)
+                    VALUES (?, ?, ?, ?)
+                ''', [
+                    (workout_ids[workout_id], user_id, summary, report)
+                    for workout_id, summary, report in reports
+                ])
+            copied['users'] += 1
+            copied['workouts'] += len(workouts)
+            copied['sets'] += len(sets)
+
+        with source.connection() as conn:
+            transcriptions = conn.execute("SELECT cache_key, text, created_at FROM transcriptions").fetchall()
+        with targets[0].connection() as conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO transcriptions (cache_key, text, created_at)
+                VALUES (?, ?, ?)
+            ''', transcriptions)
+        copied['transcriptions'] += len(transcriptions)
+
+    target.rebuild_statistics()
+    logging.info(
+        f"✅ Перенесено {copied['users']} користувачів, {copied['workouts']} тренувань, "
+        f"{copied['sets']} підходів у {len(targets)} шард(ів)"
+    )
+    return dict(copied)
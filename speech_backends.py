@@ -0,0 +1,131 @@
+import hashlib
+import io
+import logging
+import os
+import time
+from typing import Callable, Dict, Optional, Type
+
+
+class RetryableTranscriptionError(Exception):
+    """Тимчасова помилка рушія (ліміт запитів, збій мережі, 5xx): запит варто повторити.
+
+    retry_after — скільки секунд радить почекати сервер (Retry-After), якщо відомо.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None, rate_limited: bool = False):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.rate_limited = rate_limited
+
+
+class SpeechBackend:
+    """Рушій розпізнавання мовлення: отримує байти аудіо, повертає текст або None"""
+
+    name = ''
+
+    def transcribe(self, audio_data: bytes) -> Optional[str]:
+        raise NotImplementedError
+
+
+BACKENDS: Dict[str, Type[SpeechBackend]] = {}
+
+
+def register_backend(name: str) -> Callable[[Type[SpeechBackend]], Type[SpeechBackend]]:
+    def decorator(cls: Type[SpeechBackend]) -> Type[SpeechBackend]:
+        cls.name = name
+        BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def create_backend(name: str, **options) -> SpeechBackend:
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Невідомий рушій розпізнавання '{name}'. Доступні: {', '.join(sorted(BACKENDS))}")
+    return backend_cls(**options)
+
+
+@register_backend('openai')
+class OpenAIBackend(SpeechBackend):
+    """Whisper через OpenAI API"""
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "whisper-1", language: str = "uk",
+                 base_url: Optional[str] = None, timeout: float = 30.0):
+        import openai
+
+        self._openai = openai
+        api_key = api_key or os.getenv('OPENAI_API_KEY')
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY не знайдено в змінних середовища")
+        # Повтори робить TranscriptionQueue (з урахуванням спільного ліміту), а не SDK
+        self.client = openai.OpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=0)
+        self.model = model
+        self.language = language
+
+    def transcribe(self, audio_data: bytes) -> Optional[str]:
+        openai = self._openai
+        try:
+            audio_file = io.BytesIO(audio_data)
+            audio_file.name = "audio.ogg"
+
+            transcript = self.client.audio.transcriptions.create(
+                model=self.model,
+                file=audio_file,
+                language=self.language
+            )
+            return transcript.text.strip()
+
+        except openai.AuthenticationError:
+            logging.error("Помилка автентифікації OpenAI - перевірте API ключ та баланс")
+            return None
+        except openai.RateLimitError as e:
+            raise RetryableTranscriptionError("Перевищено ліміт запитів OpenAI", _retry_after(e.response), rate_limited=True)
+        except (openai.APIConnectionError, openai.InternalServerError) as e:
+            raise RetryableTranscriptionError(f"Тимчасова помилка OpenAI API: {e}")
+        except openai.APIError as e:
+            logging.error(f"Помилка OpenAI API: {e}")
+            return None
+
+
+def _retry_after(response) -> Optional[float]:
+    try:
+        return float(response.headers.get('retry-after'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+@register_backend('local')
+class LocalWhisperBackend(SpeechBackend):
+    """Whisper на CPU без мережі (faster-whisper); модель читається з локального шляху"""
+
+    def __init__(self, model_path: Optional[str] = None, language: str = "uk",
+                 compute_type: str = "int8", threads: int = 0):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise ValueError("Для локального розпізнавання встановіть пакет faster-whisper")
+        if not model_path or not os.path.isdir(model_path):
+            raise ValueError(f"Каталог моделі для локального розпізнавання не знайдено: {model_path}")
+        self.model = WhisperModel(model_path, device="cpu", compute_type=compute_type, cpu_threads=threads)
+        self.language = language
+
+    def transcribe(self, audio_data: bytes) -> Optional[str]:
+        segments, _ = self.model.transcribe(io.BytesIO(audio_data), language=self.language, beam_size=1)
+        return ' '.join(segment.text.strip() for segment in segments).strip()
+
+
+@register_backend('stub')
+class StubBackend(SpeechBackend):
+    """Детермінований рушій для тестів і бенчмарків: текст залежить лише від вмісту аудіо"""
+
+    def __init__(self, text: Optional[str] = None, texts: Optional[Dict[str, str]] = None, latency: float = 0.0):
+        self.text = text or "віджимання 15 разів"
+        self.texts = texts or {}
+        self.latency = latency
+
+    def transcribe(self, audio_data: bytes) -> Optional[str]:
+        if self.latency:
+            time.sleep(self.latency)
+        digest = hashlib.sha256(audio_data).hexdigest()
+        return self.texts.get(digest, self.text)
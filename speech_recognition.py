@@ -1,76 +1,69 @@
-import openai
+import asyncio
 import logging
-import io
+import threading
 from typing import Optional
-import os
-from dotenv import load_dotenv
+import config
+from speech_backends import RetryableTranscriptionError, SpeechBackend, create_backend
+from audio_preprocessing import AudioPreprocessor
+from metrics import timed
 
-load_dotenv()
 
 class SpeechRecognizer:
-    def __init__(self):
-        self.client = openai.OpenAI(
-            api_key=os.getenv('OPENAI_API_KEY')
-        )
-        if not os.getenv('OPENAI_API_KEY'):
-            raise ValueError("OPENAI_API_KEY не знайдено в змінних середовища")
-    
+    """Рушій розпізнавання створюється при першому голосовому, а не під час запуску бота"""
+
+    def __init__(self, backend: Optional[SpeechBackend] = None, preprocessor: Optional[AudioPreprocessor] = None):
+        self._backend = backend
+        self._backend_lock = threading.Lock()
+        if preprocessor is None and config.AUDIO_PREPROCESSING:
+            preprocessor = AudioPreprocessor(
+                max_duration=config.AUDIO_MAX_DURATION,
+                silence_threshold=config.AUDIO_SILENCE_THRESHOLD
+            )
+        self.preprocessor = preprocessor
+
+    @property
+    def backend(self) -> SpeechBackend:
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    self._backend = create_backend(config.SPEECH_BACKEND, **config.speech_backend_options())
+                    logging.info(f"🎤 Рушій розпізнавання мовлення: {self._backend.name}")
+        return self._backend
+
     async def transcribe_audio(self, audio_data: bytes) -> Optional[str]:
-        """Розпізнає українське мовлення з аудіо"""
+        """Розпізнає українське мовлення з аудіо, не блокуючи цикл подій"""
+        return await asyncio.to_thread(self.transcribe_audio_sync, audio_data)
+
+    def transcribe_audio_sync(self, audio_data: bytes) -> Optional[str]:
+        """Синхронна версія для простішого використання"""
         try:
-            
-            audio_file = io.BytesIO(audio_data)
-            audio_file.name = "audio.ogg"  
-            
-            
-            transcript = self.client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language="uk"  
-            )
-            
-            text = transcript.text.strip()
-            logging.info(f"Розпізнано текст: {text}")
-            return text
-            
-        except openai.AuthenticationError:
-            logging.error("Помилка автентифікації OpenAI - перевірте API ключ")
-            return None
-        except openai.RateLimitError:
-            logging.error("Перевищено ліміт запитів OpenAI")
-            return None
-        except openai.APIError as e:
-            logging.error(f"Помилка OpenAI API: {e}")
-            return None
+            audio_data = self.prepare(audio_data)
+            return self.recognize(audio_data) if audio_data else None
         except Exception as e:
             logging.error(f"Помилка розпізнавання мовлення: {e}")
             return None
 
-    def transcribe_audio_sync(self, audio_data: bytes) -> Optional[str]:
-        """Синхронна версія для простішого використання"""
+    @timed('speech')
+    def prepare(self, audio_data: bytes) -> bytes:
+        """Попередня обробка; порожній результат — у записі лише тиша"""
+        if self.preprocessor:
+            processed = self.preprocessor.process(audio_data)
+            if processed is not None:
+                if not processed.audio:
+                    logging.info("У голосовому лише тиша — розпізнавання пропущено")
+                return processed.audio
+        return audio_data
+
+    @timed('speech')
+    def recognize(self, audio_data: bytes) -> Optional[str]:
+        """Один виклик рушія; RetryableTranscriptionError передається далі, щоб запит можна було повторити"""
         try:
-            audio_file = io.BytesIO(audio_data)
-            audio_file.name = "audio.ogg"
-            
-            transcript = self.client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language="uk"
-            )
-            
-            text = transcript.text.strip()
-            logging.info(f"Розпізнано текст: {text}")
-            return text
-            
-        except openai.AuthenticationError:
-            logging.error("Помилка автентифікації OpenAI - перевірте API ключ та баланс")
-            return None
-        except openai.RateLimitError:
-            logging.error("Перевищено ліміт запитів OpenAI")
-            return None
-        except openai.APIError as e:
-            logging.error(f"Помилка OpenAI API: {e}")
-            return None
+            text = self.backend.transcribe(audio_data)
+        except RetryableTranscriptionError:
+            raise
         except Exception as e:
             logging.error(f"Помилка розпізнавання мовлення: {e}")
-            return None
\ No newline at end of file
+            return None
+        if text:
+            logging.info(f"Розпізнано текст: {text}")
+        return text
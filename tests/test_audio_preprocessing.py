@@ -0,0 +1,64 @@
+from array import array
+
+from async_database import AsyncDatabaseManager
+from audio_preprocessing import SAMPLE_RATE, AudioPreprocessor
+from database import DatabaseManager
+from handlers import WorkoutHandlers
+from metrics import REGISTRY
+from speech_backends import StubBackend
+from speech_recognition import SpeechRecognizer
+
+# 30 мс кадри і 200 мс запасу по краях, як за замовчуванням
+FRAME = SAMPLE_RATE * 30 // 1000
+PADDING = SAMPLE_RATE * 200 // 1000
+
+
+def pcm(*segments):
+    """(тривалість у секундах, амплітуда) -> PCM; ненульова амплітуда — меандр, тобто «голос»"""
+    samples = array('h')
+    for seconds, amplitude in segments:
+        samples.extend(amplitude if index % 2 else -amplitude for index in range(int(seconds * SAMPLE_RATE)))
+    return memoryview(samples)
+
+
+def test_trim_silence_keeps_voice_with_padding():
+    preprocessor = AudioPreprocessor(silence_threshold=600)
+    # Секунда тиші з шумом під порогом, півсекунди голосу, секунда тиші
+    samples = pcm((1.0, 300), (0.5, 5000), (1.0, 0))
+    trimmed = preprocessor.trim_silence(samples)
+
+    first_voiced = SAMPLE_RATE // FRAME * FRAME
+    last_voiced = (int(1.5 * SAMPLE_RATE) - 1) // FRAME * FRAME
+    assert len(trimmed) == (last_voiced + FRAME + PADDING) - (first_voiced - PADDING)
+    # Зріз того самого буфера, без копіювання
+    assert trimmed.obj is samples.obj
+    assert max(trimmed[:PADDING - FRAME]) < 600 < max(trimmed[PADDING + FRAME:-PADDING - FRAME])
+
+
+def test_trim_silence_edges():
+    preprocessor = AudioPreprocessor(silence_threshold=600)
+    assert len(preprocessor.trim_silence(pcm((2.0, 300)))) == 0
+    voice = pcm((1.0, 5000))
+    assert len(preprocessor.trim_silence(voice)) == len(voice)
+
+
+def test_savings_are_exported_as_gauges(tmp_path):
+    preprocessor = AudioPreprocessor(silence_threshold=600)
+    voice, silence = b"v" * 20000, b"s" * 8000
+    decoded = {voice: pcm((1.0, 0), (0.5, 5000), (1.0, 0)), silence: pcm((1.0, 0))}
+    # Без ffmpeg: декодування повертає готовий PCM, кодування — по байту на 100 семплів
+    preprocessor.ffmpeg = "ffmpeg"
+    preprocessor._run_ffmpeg = lambda args, data: decoded[data].tobytes() if data in decoded else bytes(len(data) // 200)
+    recognizer = SpeechRecognizer(backend=StubBackend(), preprocessor=preprocessor)
+    assert recognizer.prepare(voice)
+    assert recognizer.prepare(silence) == b''
+
+    handlers = WorkoutHandlers(AsyncDatabaseManager(DatabaseManager(str(tmp_path / "audio.db")), group_commit=False), recognizer)
+    try:
+        gauges = REGISTRY.collect_gauges()['audio_preprocessing']
+        assert (gauges['processed'], gauges['silent']) == (2, 1)
+        assert gauges['seconds_saved'] > 2.0
+        assert gauges['bytes_saved'] == preprocessor.total_bytes_saved > len(voice)
+        assert 'workout_bot_audio_preprocessing{name="seconds_saved"}' in REGISTRY.render_prometheus()
+    finally:
+        handlers.db.close()
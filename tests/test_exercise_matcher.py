@@ -0,0 +1,74 @@
+import pytest
+
+from database import DatabaseManager
+from exercise_matcher import ExerciseMatcher
+
+
+@pytest.fixture(scope='module')
+def matcher():
+    return ExerciseMatcher(DatabaseManager.DEFAULT_EXERCISES)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("віджимання 15 разів", "віджимання"),
+    ("сьогодні жим лежачи 80 кг", "жим лежачи"),
+    ("ЖИМ ЛЕЖАЧИ", "жим лежачи"),
+    # Найдовша назва перемагає свій префікс
+    ("зробив віджимання на брусах 10 разів", "віджимання на брусах"),
+    # Дві назви однакової довжини — перша в тексті
+    ("підйом ніг і підйом гантелей", "підйом ніг"),
+    # Частина назви — ще не назва
+    ("жим 10 разів", None),
+    ("віджимяння 15 разів", None),
+])
+def test_find_exact_words(matcher, text, expected):
+    assert matcher.find(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("віджимяння 15 разів", "віджимання"),
+    ("присидання", "присідання"),
+    ("жим лижачи", "жим лежачи"),
+    ("підтягуванння", "підтягування"),
+    ("мах ногам", "мах ногами"),
+    ("тяга блоку", "тяга блока"),
+    ("бурпу", "бурпі"),
+    ("прис", "прес"),
+    # Точний збіг частини тексту важливіший за довшу назву з описками
+    ("віджимання на бруах", "віджимання"),
+    ("жим 10 разів", None),
+    ("біг 5 км", None),
+])
+def test_match_corrects_typos(matcher, text, expected):
+    assert matcher.match(text) == expected
+
+
+@pytest.mark.parametrize('names, text, expected', [
+    # Однаково близькі слова — перемагає менше за абеткою, незалежно від порядку в довіднику
+    (["кола", "кила"], "кпла", "кила"),
+    (["кила", "кола"], "кпла", "кила"),
+    # Слова до трьох літер не виправляються: забагато хибних збігів
+    (["бік"], "біг", None),
+    # Довгі слова допускають дві описки, короткі — одну
+    (["підтягування"], "пдтягуванння", "підтягування"),
+    (["прес"], "пррес", "прес"),
+    (["прес"], "пиррс", None),
+])
+def test_fuzzy_distance_limits(names, text, expected):
+    assert ExerciseMatcher(names).match(text) == expected
+
+
+@pytest.mark.parametrize('name, text, expected', [
+    ("віджимання", None, "віджимання"),
+    ("віджимяння", None, "віджимання"),
+    # Парсер виділив лише частину назви — решта знаходиться у повному тексті
+    ("жим", "сьогодні жим лежачи 80 кг", "жим лежачи"),
+    ("жим", "жим лижачи 80 кг", "жим лежачи"),
+    ("біг", "біг 5 км", None),
+])
+def test_resolve_exercise(tmp_path, name, text, expected):
+    db = DatabaseManager(str(tmp_path / "matcher.db"))
+    try:
+        assert db.resolve_exercise(name, text) == expected
+    finally:
+        db.close()
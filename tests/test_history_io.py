@@ -0,0 +1,77 @@
+import io
+
+import pytest
+
+from history_io import READERS, WRITERS, import_history
+from sharding import open_database
+
+TELEGRAM_ID = 42
+
+
+@pytest.fixture(params=[1, 2], ids=['single', 'sharded'])
+def db(request, tmp_path):
+    db = open_database(str(tmp_path / "history.db"), request.param)
+    yield db
+    db.close()
+
+
+def populate(db):
+    user_id = db.add_user(TELEGRAM_ID)
+    for _ in range(2):
+        workout_id = db.start_workout(user_id)
+        # Два однакові підходи без номера в одному повідомленні — не дублікати
+        db.add_sets(workout_id, [
+            {'exercise': 'віджимання', 'reps': 15},
+            {'exercise': 'віджимання', 'reps': 15},
+            {'exercise': 'прес', 'reps': 20, 'weight': 5.0},
+        ])
+        db.finish_workout(workout_id)
+    return user_id
+
+
+def export_csv(db, user_id) -> str:
+    stream = io.StringIO()
+    WRITERS['csv'](db.iter_user_sets(user_id), stream)
+    return stream.getvalue()
+
+
+def reports(db, user_id):
+    return {workout_id: db.get_workout_report(workout_id, user_id) for workout_id, _ in db.get_workout_history(user_id, None, 100)}
+
+
+def test_reimporting_an_export_changes_nothing(db):
+    user_id = populate(db)
+    exported = export_csv(db, user_id)
+    stats, before = db.get_user_statistics(user_id), reports(db, user_id)
+
+    result = import_history(db, READERS['csv'](io.StringIO(exported)), telegram_id=TELEGRAM_ID, chunk_size=2)
+
+    assert (result['imported'], result['duplicates'], result['workouts']) == (0, 6, 0)
+    assert db.get_user_statistics(user_id) == stats
+    assert reports(db, user_id) == before
+    assert export_csv(db, user_id) == exported
+
+
+def test_extra_sets_update_the_stored_report(db):
+    user_id = populate(db)
+    rows = list(READERS['csv'](io.StringIO(export_csv(db, user_id))))
+    extra = dict(rows[0], reps='7', set_number='')
+    result = import_history(db, rows + [extra], telegram_id=TELEGRAM_ID)
+
+    assert (result['imported'], result['duplicates']) == (1, 6)
+    assert db.check_statistics() == []
+    workout_id = int(extra['workout_id'])
+    assert "віджимання: підходів - 3, повторень - 37" in db.get_workout_report(workout_id, user_id).lower()
+
+
+def test_identical_sets_survive_chunked_import_into_empty_base(db, tmp_path):
+    source = open_database(str(tmp_path / "source.db"), 1)
+    try:
+        exported = export_csv(source, populate(source))
+    finally:
+        source.close()
+
+    result = import_history(db, READERS['csv'](io.StringIO(exported)), telegram_id=TELEGRAM_ID, chunk_size=1)
+
+    assert (result['imported'], result['duplicates'], result['workouts']) == (6, 0, 2)
+    assert db.get_user_statistics(db.get_user_id(TELEGRAM_ID))['total_sets'] == 6
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+import config
+from async_database import AsyncDatabaseManager
+from benchmarks.fakes import FakeSpeechRecognizer, FakeTelegramClient
+from database import DatabaseManager
+from handlers import WorkoutHandlers
+from metrics import REGISTRY, instrument_methods
+
+pytestmark = pytest.mark.skipif(not config.METRICS_ENABLED, reason="METRICS_ENABLED=0")
+
+
+def handler_counts():
+    return {label: histogram.snapshot()[1] for label, histogram in REGISTRY.histograms.get('handler_seconds', {}).items()}
+
+
+def test_include_limits_wrapped_methods():
+    class Service:
+        def entry(self):
+            return self.helper()
+
+        def helper(self):
+            return 1
+
+    original = Service.helper
+    instrument_methods('test_include', include=('entry',))(Service)
+    assert Service.helper is original
+    assert Service().entry() == 1
+    assert REGISTRY.histograms['test_include_seconds']['entry'].snapshot()[1] == 1
+    assert 'helper' not in REGISTRY.histograms['test_include_seconds']
+
+
+def test_each_message_is_timed_once(tmp_path):
+    async def scenario():
+        db = AsyncDatabaseManager(DatabaseManager(str(tmp_path / "metrics.db")), group_commit=False)
+        handlers = WorkoutHandlers(db, FakeSpeechRecognizer(latency=0))
+        client = FakeTelegramClient()
+        try:
+            for text in ["🏁 Старт тренування", "віджимання 15 разів", "прес 20 разів, присідання 10 разів", "⏹️ Стоп тренування"]:
+                await handlers.handle_button_press(client.update(1, text), None)
+        finally:
+            db.close()
+
+    before = handler_counts()
+    asyncio.run(scenario())
+    added = {label: count - before.get(label, 0) for label, count in handler_counts().items()}
+    assert {label: count for label, count in added.items() if count} == {
+        'start_workout': 1, 'handle_text_message': 2, 'stop_workout': 1
+    }
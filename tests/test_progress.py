@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from benchmarks.bench_indexes import generate
+from benchmarks.bench_progress import TODAY, reference_progress, same
+from database import DatabaseManager
+from progress import compute_progress, load_history
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_matches_reference_implementation(tmp_path):
+    db = DatabaseManager(str(tmp_path / "progress.db"))
+    try:
+        generate(db, 5000, users=1, sets_per_workout=20)
+        with db.connection() as conn:
+            conn.execute("UPDATE workouts SET start_time = datetime('2024-01-01', '+' || (id * 150 / 250) || ' days')")
+        user_id = db.get_user_id(0)
+        names = db.catalog.names_by_id
+        rows = list(db.iter_progress_rows(user_id))
+        assert same(reference_progress(rows, names), compute_progress(load_history(rows), names, today=TODAY))
+    finally:
+        db.close()
+
+
+def test_numpy_loads_only_with_first_progress_call(tmp_path):
+    script = textwrap.dedent(f'''
+        import asyncio, sys
+        import main
+        from async_database import AsyncDatabaseManager
+        from database import DatabaseManager
+        assert 'numpy' not in sys.modules, 'numpy завантажено під час запуску'
+        db = AsyncDatabaseManager(DatabaseManager({str(tmp_path / "lazy.db")!r}))
+        result = asyncio.run(db.get_user_progress(1))
+        db.close()
+        assert result['total_sets'] == 0 and 'numpy' in sys.modules
+    ''')
+    subprocess.run([sys.executable, "-c", script], cwd=tmp_path, check=True,
+                   env=dict(os.environ, PYTHONPATH=ROOT))
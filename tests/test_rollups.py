@@ -0,0 +1,89 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from history_io import import_history
+from sharding import ShardedDatabaseManager, open_database
+
+TELEGRAM_IDS = (5, 6, 7)
+# Понеділок — понеділок, щоб ущільнені тижні не захоплювали зайвих днів
+RANGES = [('2024-01-01', '2024-08-05'), ('2024-03-04', '2024-04-01'), ('2024-05-06', '2024-06-03')]
+
+
+@pytest.fixture(params=[1, 2], ids=['single', 'sharded'])
+def db(request, tmp_path):
+    db = open_database(str(tmp_path / "rollups.db"), request.param)
+    yield db
+    db.close()
+
+
+def history(seed: int, days: int = 200):
+    rng = random.Random(seed)
+    rows = []
+    for telegram_id in TELEGRAM_IDS:
+        for _ in range(40):
+            start = datetime(2024, 1, 1, 8) + timedelta(days=rng.randint(0, days), hours=rng.randint(0, 10))
+            for _ in range(rng.randint(1, 5)):
+                rows.append({
+                    'telegram_id': telegram_id,
+                    'workout_start': start.isoformat(' '),
+                    'workout_end': (start + timedelta(minutes=45)).isoformat(' '),
+                    'exercise': rng.choice(['прес', 'віджимання', 'присідання']),
+                    'reps': rng.randint(1, 20),
+                    'weight': rng.choice(['', '20', '32.5']),
+                })
+    return rows
+
+
+def direct(db, telegram_id, start: str, end: str):
+    """(тренувань, підходів, повторень, об'єм) прямо з workouts і sets"""
+    sql = '''
+        SELECT COUNT(DISTINCT w.id), COUNT(s.id), COALESCE(SUM(s.reps), 0), COALESCE(SUM(s.reps * COALESCE(s.weight, 0)), 0)
+        FROM workouts w JOIN users u ON u.id = w.user_id LEFT JOIN sets s ON s.workout_id = w.id
+        WHERE w.status = 'completed' AND date(w.start_time) >= ? AND date(w.start_time) < ?
+    ''' + (" AND u.telegram_id = ?" if telegram_id is not None else "")
+    params = (start, end) + ((telegram_id,) if telegram_id is not None else ())
+    totals = [0, 0, 0, 0.0]
+    for shard in (db.shards if isinstance(db, ShardedDatabaseManager) else [db]):
+        with shard.connection() as conn:
+            for index, value in enumerate(conn.execute(sql, params).fetchone()):
+                totals[index] += value
+    return tuple(totals)
+
+
+def oldest_daily_row(db) -> str:
+    days = []
+    for shard in (db.shards if isinstance(db, ShardedDatabaseManager) else [db]):
+        with shard.connection() as conn:
+            days.append(conn.execute("SELECT MIN(day) FROM rollup_daily").fetchone()[0])
+    return min(day for day in days if day)
+
+
+def assert_ranges_match(db):
+    for telegram_id in (None, TELEGRAM_IDS[0]):
+        user_id = 0 if telegram_id is None else db.get_user_id(telegram_id)
+        for start, end in RANGES:
+            stats = db.get_range_statistics(user_id, start, end)
+            expected = direct(db, telegram_id, start, end)
+            assert (stats['workouts'], stats['sets'], stats['reps']) == expected[:3], (telegram_id, start, end)
+            assert stats['volume'] == pytest.approx(expected[3])
+
+
+def test_range_statistics_before_and_after_compaction(db):
+    import_history(db, history(seed=1))
+    assert_ranges_match(db)
+    assert db.compact_rollups('2024-05-06') > 0
+    assert_ranges_match(db)
+
+
+def test_rebuild_keeps_compacted_weeks(db):
+    import_history(db, history(seed=1))
+    db.compact_rollups('2024-05-06')
+    db.rebuild_statistics()
+    assert_ranges_match(db)
+    assert oldest_daily_row(db) >= '2024-05-06'
+    # Імпорт теж перераховує підсумки
+    import_history(db, history(seed=2))
+    assert_ranges_match(db)
+    assert oldest_daily_row(db) >= '2024-05-06'
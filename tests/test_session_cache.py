@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+from async_database import AsyncDatabaseManager
+from benchmarks.fakes import FakeSpeechRecognizer, FakeTelegramClient
+from cache import SessionCache
+from database import DatabaseManager
+from handlers import WorkoutHandlers
+
+NOT_STARTED = "⚠️ Спочатку розпочніть тренування, натиснувши '🏁 Старт тренування'"
+
+
+def counting_db(path):
+    """AsyncDatabaseManager, що записує назви всіх методів бази, викликаних через нього"""
+    db = AsyncDatabaseManager(DatabaseManager(path), group_commit=False)
+    calls = []
+    read, write = db._read, db._write
+
+    async def counted_read(func, *args, **kwargs):
+        calls.append(getattr(func, '__name__', 'lambda'))
+        return await read(func, *args, **kwargs)
+
+    async def counted_write(func, *args, **kwargs):
+        calls.append(func.__name__)
+        return await write(func, *args, **kwargs)
+
+    db._read, db._write = counted_read, counted_write
+    return db, calls
+
+
+def test_lru_eviction_and_ttl():
+    cache = SessionCache(maxsize=2, ttl=0.05)
+    cache.set_session(1, 10, 100)
+    cache.set_session(2, 20, None)
+    assert cache.get_session(1) == (10, 100)
+    cache.set_session(3, 30, None)
+    # 2 давно не читали — витіснено він, а не 1
+    assert cache.get_session(2) is None
+    assert cache.get_session(1) == (10, 100)
+    time.sleep(0.06)
+    assert cache.get_session(1) is None
+    assert cache.stats() == {'size': 1, 'hits': 2, 'misses': 2}
+
+
+def test_hot_path_reads_session_from_memory(tmp_path):
+    async def scenario():
+        db, calls = counting_db(str(tmp_path / "sessions.db"))
+        handlers = WorkoutHandlers(db, FakeSpeechRecognizer(latency=0))
+        client = FakeTelegramClient()
+        send = lambda text: handlers.handle_button_press(client.update(1, text), None)
+        try:
+            await send("🏁 Старт тренування")
+            # Перший підхід засіює лічильники номерів — один раз на тренування
+            await send("віджимання 10 разів")
+            calls.clear()
+            hits = handlers.sessions.hits
+            for reps in range(11, 21):
+                await send(f"віджимання {reps} разів, прес 20 разів")
+            hot_calls, hot_hits = list(calls), handlers.sessions.hits - hits
+
+            await send("⏹️ Стоп тренування")
+            calls.clear()
+            await send("віджимання 10 разів")
+            after_stop = list(calls), client.replies[1][-1]
+
+            await send("🏁 Старт тренування")
+            await send("віджимання 10 разів")
+            _, workout_id = handlers.sessions.get_session(1)
+            return hot_calls, hot_hits, after_stop, workout_id, calls
+        finally:
+            db.close()
+
+    hot_calls, hot_hits, (after_stop, reply), workout_id, restarted_calls = asyncio.run(scenario())
+    # Лише запис підходів: ні add_user, ні get_active_workout, ні інших читань
+    assert hot_calls == ['insert_set_rows'] * 10
+    assert hot_hits == 10
+    # Стоп оновлює сесію: наступне повідомлення відхиляється без звернень до бази
+    assert (after_stop, reply) == ([], NOT_STARTED)
+    # Старт оновлює сесію: підходи йдуть у нове тренування
+    assert restarted_calls == ['start_workout', 'get_set_counters', 'insert_set_rows']
+    assert workout_id == 2
+
+
+def test_miss_resumes_active_workout_after_restart(tmp_path):
+    path = str(tmp_path / "restart.db")
+
+    async def first_run():
+        db = AsyncDatabaseManager(DatabaseManager(path), group_commit=False)
+        handlers = WorkoutHandlers(db, FakeSpeechRecognizer(latency=0))
+        try:
+            await handlers.handle_button_press(FakeTelegramClient().update(1, "🏁 Старт тренування"), None)
+            return handlers.sessions.get_session(1)
+        finally:
+            db.close()
+
+    async def second_run():
+        db, calls = counting_db(path)
+        handlers = WorkoutHandlers(db, FakeSpeechRecognizer(latency=0))
+        client = FakeTelegramClient()
+        try:
+            for _ in range(2):
+                await handlers.handle_button_press(client.update(1, "віджимання 10 разів"), None)
+            stats = handlers.sessions.stats()
+            return handlers.sessions.get_session(1), calls, stats
+        finally:
+            db.close()
+
+    session = asyncio.run(first_run())
+    resumed, calls, stats = asyncio.run(second_run())
+    assert resumed == session
+    # Промах лише на першому повідомленні після перезапуску
+    assert calls.count('add_user') == calls.count('get_active_workout') == 1
+    assert (stats['hits'], stats['misses']) == (1, 1)
@@ -0,0 +1,72 @@
+import asyncio
+from collections import Counter, defaultdict
+
+import pytest
+
+from async_database import AsyncDatabaseManager
+from sharding import open_database
+
+EXERCISES = ['віджимання', 'присідання', 'підтягування']
+MESSAGES = 20
+
+
+def message(index):
+    # Повідомлення з кількома підходами різних вправ, як після розбору тексту
+    return [
+        {'exercise': EXERCISES[(index + offset) % len(EXERCISES)], 'reps': 10 + index}
+        for offset in range(index % 3 + 1)
+    ]
+
+
+def expected_counts(count):
+    return Counter(set_data['exercise'] for index in range(count) for set_data in message(index))
+
+
+async def send_concurrently(db, group_commit, workout_id, first, seeds):
+    """Один «запуск бота»: MESSAGES одночасних add_sets до одного тренування"""
+    async_db = AsyncDatabaseManager(db, group_commit=group_commit)
+    get_set_counters = db.get_set_counters
+
+    def counting(workout):
+        seeds.append(workout)
+        return get_set_counters(workout)
+
+    db.get_set_counters = counting
+    try:
+        await asyncio.gather(*(
+            async_db.add_sets(workout_id, message(index))
+            for index in range(first, first + MESSAGES)
+        ))
+    finally:
+        if async_db.set_writer is not None:
+            await async_db.set_writer.stop()
+        async_db.close()
+
+
+@pytest.mark.parametrize('shards', [1, 2])
+@pytest.mark.parametrize('group_commit', [False, True])
+def test_concurrent_sets_are_numbered_across_restart(tmp_path, shards, group_commit):
+    path = str(tmp_path / "numbering.db")
+    db = open_database(path, shards)
+    db.populate_default_exercises()
+    workout_id = db.start_workout(db.add_user(1))
+
+    seeds = []
+    asyncio.run(send_concurrently(db, group_commit, workout_id, 0, seeds))
+    # Перезапуск: лічильники в пам'яті втрачено, тренування продовжується з бази
+    db = open_database(path, shards)
+    asyncio.run(send_concurrently(db, group_commit, workout_id, MESSAGES, seeds))
+    assert seeds == [workout_id, workout_id]
+
+    db = open_database(path, shards)
+    try:
+        numbers = defaultdict(list)
+        for _, _, _, name, _, _, set_number, _ in db.iter_user_sets(db.get_user_id(1)):
+            numbers[name].append(set_number)
+    finally:
+        db.close()
+
+    counts = expected_counts(2 * MESSAGES)
+    assert set(numbers) == set(counts)
+    for name, count in counts.items():
+        assert sorted(numbers[name]) == list(range(1, count + 1)), name
@@ -0,0 +1,121 @@
+import asyncio
+import sqlite3
+
+from async_database import AsyncDatabaseManager
+from database import DatabaseManager
+from set_writer import GroupCommitWriter
+from sharding import open_database
+
+
+def test_stop_flushes_buffered_rows():
+    written = []
+
+    async def insert(rows):
+        written.extend(rows)
+        return len(rows)
+
+    async def scenario():
+        # Інтервал довший за тест: рядки могли б записатися лише під час stop()
+        writer = GroupCommitWriter(insert, flush_interval=60, max_rows=1000)
+        pending = [asyncio.create_task(writer.submit([(index,)])) for index in range(5)]
+        await asyncio.sleep(0)
+        await writer.stop()
+        return await asyncio.gather(*pending)
+
+    assert asyncio.run(scenario()) == [1] * 5
+    assert sorted(written) == [(index,) for index in range(5)]
+
+
+def test_stop_waits_for_flush_in_progress():
+    started, written = asyncio.Event(), []
+
+    async def slow_insert(rows):
+        started.set()
+        await asyncio.sleep(0.05)
+        written.extend(rows)
+        return len(rows)
+
+    async def scenario():
+        writer = GroupCommitWriter(slow_insert, flush_interval=0.001, max_rows=1)
+        first = asyncio.create_task(writer.submit([(1,)]))
+        await started.wait()
+        # Надіслано, поки триває перше скидання
+        second = asyncio.create_task(writer.submit([(2,)]))
+        await asyncio.sleep(0)
+        await writer.stop()
+        return await asyncio.wait_for(asyncio.gather(first, second), timeout=1)
+
+    assert asyncio.run(scenario()) == [1, 1]
+    assert written == [(1,), (2,)]
+
+
+def test_group_commit_uses_full_synchronous(tmp_path):
+    db = DatabaseManager(str(tmp_path / "writer.db"))
+    with db.connection() as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    async_db = AsyncDatabaseManager(db, group_commit=True)
+    try:
+        with db.connection() as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+    finally:
+        async_db.close()
+
+
+def test_failed_partition_fails_only_its_callers():
+    written = []
+
+    async def insert(rows):
+        if rows[0][0] % 2:
+            raise RuntimeError("шард недоступний")
+        written.extend(rows)
+        return len(rows)
+
+    async def scenario():
+        writer = GroupCommitWriter(insert, flush_interval=60, max_rows=1000, partition=lambda row: row[0] % 2)
+        pending = [asyncio.create_task(writer.submit([(workout, 1), (workout, 2)])) for workout in range(4)]
+        await asyncio.sleep(0)
+        await writer.stop()
+        return await asyncio.gather(*pending, return_exceptions=True), writer.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results[0] == results[2] == 2
+    assert all(isinstance(results[index], RuntimeError) for index in (1, 3))
+    assert sorted(written) == [(0, 1), (0, 2), (2, 1), (2, 2)]
+    assert (stats['rows'], stats['failed_flushes']) == (4, 1)
+
+
+def test_sharded_group_commit_isolates_failing_shard(tmp_path):
+    db = open_database(str(tmp_path / "sharded.db"), 2)
+    workouts = {}
+    telegram_id = 0
+    while len(workouts) < 2:
+        workout_id = db.start_workout(db.add_user(telegram_id))
+        workouts.setdefault(workout_id % 2, workout_id)
+        telegram_id += 1
+
+    def unavailable(rows):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    db.shards[1].insert_set_rows = unavailable
+
+    async def scenario():
+        async_db = AsyncDatabaseManager(db, group_commit=True)
+        try:
+            return await asyncio.gather(*(
+                async_db.add_sets(workouts[shard], [{'exercise': 'віджимання', 'reps': 10}])
+                for shard in (0, 1)
+            ), return_exceptions=True), async_db.set_counters.get_counters(workouts[0])
+        finally:
+            await async_db.set_writer.stop()
+            async_db.close()
+
+    (stored, failed), counters = asyncio.run(scenario())
+    assert stored == 1
+    assert isinstance(failed, sqlite3.OperationalError)
+    # Лічильники успішного тренування не скидаються — повторного надсилання не буде
+    assert counters is not None
+    db = open_database(str(tmp_path / "sharded.db"), 2)
+    try:
+        assert db.get_set_counters(workouts[0]) and not db.get_set_counters(workouts[1])
+    finally:
+        db.close()
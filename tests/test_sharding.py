@@ -0,0 +1,59 @@
+import pytest
+
+from sharding import ShardedDatabaseManager, open_database, reshard
+
+CUSTOM_EXERCISES = [f"вправа {index}" for index in range(200)]
+
+
+def populate(db, users: int = 6):
+    db.add_exercises(CUSTOM_EXERCISES[:10])
+    for telegram_id in range(users):
+        user_id = db.add_user(telegram_id)
+        workout_id = db.start_workout(user_id)
+        db.add_sets(workout_id, [
+            {'exercise': 'віджимання', 'reps': 10 + telegram_id},
+            {'exercise': CUSTOM_EXERCISES[telegram_id], 'reps': 5, 'weight': 20.0},
+        ])
+        db.finish_workout(workout_id)
+
+
+def snapshot(db, users: int = 6):
+    return {
+        telegram_id: db.get_user_statistics(db.get_user_id(telegram_id))
+        for telegram_id in range(users)
+    }
+
+
+@pytest.mark.parametrize('source_shards, target_shards', [(1, 3), (3, 2)])
+def test_reshard_preserves_users_and_catalog(tmp_path, source_shards, target_shards):
+    source = open_database(str(tmp_path / "source.db"), source_shards)
+    target = open_database(str(tmp_path / "target.db"), target_shards)
+    try:
+        populate(source)
+        sources = source.shards if isinstance(source, ShardedDatabaseManager) else [source]
+        copied = reshard(sources, target)
+        assert copied['users'] == 6
+        assert snapshot(target) == snapshot(source)
+        assert target.check_statistics() == []
+        if isinstance(target, ShardedDatabaseManager):
+            assert target.check_exercises() == []
+    finally:
+        source.close()
+        target.close()
+
+
+def test_reshard_copies_catalog_once_per_source(tmp_path, monkeypatch):
+    source = open_database(str(tmp_path / "source.db"), 1)
+    target = open_database(str(tmp_path / "target.db"), 3)
+    try:
+        source.add_exercises(CUSTOM_EXERCISES)
+        replications = []
+        original = target.replicate_exercises
+        monkeypatch.setattr(target, 'replicate_exercises', lambda: replications.append(1) or original())
+        reshard([source], target)
+        assert len(replications) == 1
+        assert set(CUSTOM_EXERCISES) <= set(target.get_all_exercises())
+        assert target.check_exercises() == []
+    finally:
+        source.close()
+        target.close()
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from async_database import AsyncDatabaseManager
+from benchmarks.fakes import FakeSpeechRecognizer, FakeTelegramClient
+from handlers import WorkoutHandlers
+from sharding import open_database
+
+SETS = [
+    {'exercise': 'віджимання', 'reps': 15},
+    {'exercise': 'прес', 'reps': 20, 'weight': 10.0},
+    {'exercise': 'віджимання', 'reps': 12},
+]
+
+
+@pytest.fixture(params=[1, 3], ids=['single', 'sharded'])
+def db(request, tmp_path):
+    db = open_database(str(tmp_path / "stats.db"), request.param)
+    yield db
+    db.close()
+
+
+def populate(db, users: int = 5, workouts: int = 3):
+    for telegram_id in range(users):
+        user_id = db.add_user(telegram_id)
+        for _ in range(workouts):
+            workout_id = db.start_workout(user_id)
+            db.add_sets(workout_id, SETS)
+            db.finish_workout(workout_id)
+        # Незавершене тренування не потрапляє в статистику
+        db.add_sets(db.start_workout(user_id), SETS)
+
+
+def test_rollups_match_direct_queries(db):
+    populate(db)
+    assert db.check_statistics() == []
+    stats = db.get_user_statistics(db.get_user_id(0))
+    assert (stats['total_workouts'], stats['total_sets'], stats['total_reps']) == (3, 9, 141)
+
+
+def test_rebuild_matches_incremental(db):
+    populate(db)
+    before = {telegram_id: db.get_user_statistics(db.get_user_id(telegram_id)) for telegram_id in range(5)}
+    db.rebuild_statistics()
+    assert db.check_statistics() == []
+    assert before == {telegram_id: db.get_user_statistics(db.get_user_id(telegram_id)) for telegram_id in range(5)}
+
+
+@pytest.mark.parametrize('group_commit', [False, True], ids=['direct', 'group_commit'])
+def test_message_path_stores_every_set(tmp_path, group_commit):
+    """Те саме, що перевіряє сценарій message_path у run_all, у мініатюрі"""
+    async def scenario():
+        db = AsyncDatabaseManager(open_database(str(tmp_path / "path.db"), 2), group_commit=group_commit)
+        handlers = WorkoutHandlers(db, FakeSpeechRecognizer(latency=0))
+        client = FakeTelegramClient()
+        on_text = handlers.user_locks.serialized(handlers.handle_button_press)
+
+        async def run_user(telegram_id: int):
+            for text in ["🏁 Старт тренування", "віджимання 15 разів", "прес 20 разів, присідання 10 разів", "⏹️ Стоп тренування"]:
+                await on_text(client.update(telegram_id, text), None)
+
+        await asyncio.gather(*(run_user(1000 + index) for index in range(20)))
+        if db.set_writer:
+            await db.set_writer.stop()
+        try:
+            assert db.db.check_statistics() == []
+            for index in range(20):
+                stats = db.db.get_user_statistics(db.db.get_user_id(1000 + index))
+                assert (stats['total_workouts'], stats['total_sets']) == (1, 3)
+        finally:
+            db.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,28 @@
+import json
+import os
+
+import pytest
+
+from text_parser import TextParser
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'parser_golden.json')
+
+with open(GOLDEN_PATH, encoding='utf-8') as f:
+    GOLDEN = json.load(f)
+
+
+@pytest.fixture(scope='module')
+def parser():
+    return TextParser()
+
+
+@pytest.mark.parametrize('case', GOLDEN, ids=lambda case: case['input'])
+def test_golden_corpus(parser, case):
+    assert parser.parse_exercise_input(case['input']) == case['expected']
+
+
+def test_multi_set_message(parser):
+    sets = parser.parse_exercise_list("віджимання 15 разів, прес 20 разів, присідання 12 разів 40 кг")
+    assert [(s['exercise'], s['reps'], s['weight']) for s in sets] == [
+        ('віджимання', 15, None), ('прес', 20, None), ('присідання', 12, 40.0)
+    ]
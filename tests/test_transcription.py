@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import time
+
+import pytest
+
+import transcription_queue
+from benchmarks.fake_whisper_server import FakeWhisperServer
+from benchmarks.fakes import FakeSpeechRecognizer
+from speech_backends import OpenAIBackend, RetryableTranscriptionError, StubBackend, create_backend
+from speech_recognition import SpeechRecognizer
+from transcription_queue import (
+    TokenBucket, TranscriptionQueue, TranscriptionQueueFull, TranscriptionTimeout, TranscriptionUnavailable
+)
+
+
+def transcribe_all(recognizer, audios, **queue_options):
+    async def scenario():
+        queue = TranscriptionQueue(recognizer, max_size=len(audios), **queue_options)
+        try:
+            return await asyncio.gather(*(queue.submit(audio, duration=1) for audio in audios)), queue.stats()
+        finally:
+            await queue.stop()
+    return asyncio.run(scenario())
+
+
+def test_stub_backend_is_deterministic():
+    audio = b"voice-1"
+    backend = create_backend('stub', texts={hashlib.sha256(audio).hexdigest(): "прес 20 разів"})
+    assert isinstance(backend, StubBackend)
+    recognizer = SpeechRecognizer(backend=backend, preprocessor=None)
+    texts, _ = transcribe_all(recognizer, [audio, b"voice-2", audio], workers=2)
+    assert texts == ["прес 20 разів", "віджимання 15 разів", "прес 20 разів"]
+
+
+def test_retries_through_fake_whisper_server():
+    """Випадкові 429 і 500 від сервера повторюються, і кожне повідомлення все одно розпізнається"""
+    server = FakeWhisperServer(rpm=0, error_rate=0.2, throttle_rate=0.2, base_delay=0.0, delay_per_kb=0.0,
+                               text="присідання 12 разів").start()
+    try:
+        recognizer = SpeechRecognizer(backend=OpenAIBackend(api_key="test", base_url=server.base_url, timeout=5),
+                                      preprocessor=None)
+        texts, stats = transcribe_all(recognizer, [bytes([index]) * 100 for index in range(12)], workers=4,
+                                      timeout=30, max_retries=20, backoff_base=0.01, backoff_max=0.05)
+    finally:
+        server.stop()
+    assert texts == ["присідання 12 разів"] * 12
+    assert server.counts.get(200) == 12
+    assert stats['retries'] == sum(count for status, count in server.counts.items() if status != 200)
+
+
+def test_submit_past_max_size_raises_queue_full():
+    async def scenario():
+        queue = TranscriptionQueue(FakeSpeechRecognizer(latency=0.2), workers=1, max_size=2)
+        try:
+            running = asyncio.ensure_future(queue.submit(b"0"))
+            await asyncio.sleep(0.05)
+            waiting = [asyncio.ensure_future(queue.submit(bytes([index]))) for index in (1, 2)]
+            await asyncio.sleep(0)
+            assert queue.is_full()
+            with pytest.raises(TranscriptionQueueFull):
+                await queue.submit(b"3")
+            return await asyncio.gather(running, *waiting)
+        finally:
+            await queue.stop()
+
+    assert asyncio.run(scenario()) == ["віджимання 15 разів"] * 3
+
+
+def test_job_slower_than_timeout_is_reported():
+    async def scenario():
+        recognizer = FakeSpeechRecognizer(latency=0.5)
+        queue = TranscriptionQueue(recognizer, workers=1, max_size=2, timeout=0.05)
+        try:
+            with pytest.raises(TranscriptionTimeout):
+                await queue.submit(b"slow")
+            return queue.stats()
+        finally:
+            await queue.stop()
+
+    stats = asyncio.run(scenario())
+    assert (stats['deadline_missed'], stats['completed']) == (1, 0)
+
+
+class ScriptedRecognizer(FakeSpeechRecognizer):
+    """Записує порядок розпізнавання; перші failures викликів — тимчасові помилки рушія"""
+
+    def __init__(self, latency: float = 0.0, failures: int = 0, retry_after: float = None):
+        super().__init__(latency=latency)
+        self.failures = failures
+        self.retry_after = retry_after
+        self.order = []
+
+    def recognize(self, audio_data: bytes):
+        if self.failures:
+            self.failures -= 1
+            raise RetryableTranscriptionError("503", retry_after=self.retry_after, rate_limited=self.retry_after is not None)
+        self.order.append(audio_data)
+        return super().recognize(audio_data)
+
+
+def test_token_bucket_spaces_requests_after_burst():
+    async def scenario():
+        bucket = TokenBucket(rate=20, capacity=2)
+        started = time.monotonic()
+        moments = []
+        for _ in range(5):
+            await bucket.acquire()
+            moments.append(time.monotonic() - started)
+        bucket.pause(0.1)
+        paused = time.monotonic()
+        await bucket.acquire()
+        return moments, time.monotonic() - paused
+
+    moments, after_pause = asyncio.run(scenario())
+    # Сплеск з двох маркерів одразу, далі — не частіше ніж раз на 1/rate
+    assert moments[1] < 0.02
+    assert all(later - earlier >= 0.045 for earlier, later in zip(moments[1:], moments[2:]))
+    assert after_pause >= 0.095
+
+
+def test_earlier_deadline_is_served_first():
+    async def scenario():
+        recognizer = ScriptedRecognizer(latency=0.05)
+        queue = TranscriptionQueue(recognizer, workers=1, max_size=5, slo_per_audio_second=1.0)
+        try:
+            busy = asyncio.ensure_future(queue.submit(b"busy"))
+            await asyncio.sleep(0.01)
+            # Поки обробник зайнятий, надходять записи різної тривалості
+            waiting = [asyncio.ensure_future(queue.submit(audio, duration=duration))
+                       for audio, duration in ((b"long", 60), (b"short", 2), (b"medium", 10))]
+            await asyncio.gather(busy, *waiting)
+            return recognizer.order
+        finally:
+            await queue.stop()
+
+    assert asyncio.run(scenario()) == [b"busy", b"short", b"medium", b"long"]
+
+
+def test_retryable_errors_back_off_exponentially(monkeypatch):
+    bounds = []
+
+    def uniform(low, high):
+        bounds.append(high)
+        return high
+
+    monkeypatch.setattr(transcription_queue.random, 'uniform', uniform)
+
+    async def scenario():
+        recognizer = ScriptedRecognizer(failures=3)
+        queue = TranscriptionQueue(recognizer, workers=1, max_size=1, max_retries=5, backoff_base=0.01, backoff_max=0.03)
+        try:
+            return await queue.submit(b"voice"), queue.stats()
+        finally:
+            await queue.stop()
+
+    text, stats = asyncio.run(scenario())
+    assert text == "віджимання 15 разів"
+    assert bounds == [0.01, 0.02, 0.03]
+    assert (stats['retries'], stats['completed']) == (3, 1)
+
+
+def test_retry_after_pauses_and_retries_are_bounded():
+    async def scenario():
+        throttled = TranscriptionQueue(ScriptedRecognizer(failures=1, retry_after=0.1), workers=1, max_size=1)
+        failing = TranscriptionQueue(ScriptedRecognizer(failures=10), workers=1, max_size=1,
+                                     max_retries=2, backoff_base=0.001, backoff_max=0.001)
+        try:
+            started = time.monotonic()
+            text = await throttled.submit(b"voice")
+            waited = time.monotonic() - started
+            with pytest.raises(TranscriptionUnavailable):
+                await failing.submit(b"voice")
+            return text, waited, throttled.stats(), failing.stats()
+        finally:
+            await throttled.stop()
+            await failing.stop()
+
+    text, waited, throttled, failing = asyncio.run(scenario())
+    assert text == "віджимання 15 разів" and waited >= 0.095
+    assert (throttled['rate_limited'], throttled['retries']) == (1, 1)
+    assert (failing['retries'], failing['failed']) == (2, 1)
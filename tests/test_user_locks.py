@@ -0,0 +1,54 @@
+import asyncio
+
+from benchmarks.fakes import FakeTelegramClient
+from user_locks import UserLocks
+
+
+def test_same_user_in_order_different_users_concurrently():
+    events = []
+    locks = UserLocks()
+    client = FakeTelegramClient()
+
+    @locks.serialized
+    async def handler(update, context):
+        user, index = update.effective_user.id, int(update.message.text)
+        events.append(('start', user, index))
+        # Перші повідомлення найповільніші: без замка наступні обігнали б їх
+        await asyncio.sleep(0.03 * (3 - index))
+        events.append(('end', user, index))
+
+    async def scenario():
+        updates = [client.update(user, str(index)) for index in range(3) for user in (1, 2)]
+        started = asyncio.get_running_loop().time()
+        await asyncio.gather(*(handler(update, None) for update in updates))
+        return asyncio.get_running_loop().time() - started
+
+    elapsed = asyncio.run(scenario())
+    for user in (1, 2):
+        own = [(kind, index) for kind, owner, index in events if owner == user]
+        assert own == [(kind, index) for index in range(3) for kind in ('start', 'end')]
+    # Обидва користувачі почали до того, як перший закінчив, і разом — не довше за одного
+    assert [event[:2] for event in events[:2]] == [('start', 1), ('start', 2)]
+    assert elapsed < 0.03 * (3 + 2 + 1) * 1.5
+    assert len(locks) == 0
+
+
+def test_update_without_user_is_not_serialized():
+    locks = UserLocks()
+    running = []
+
+    @locks.serialized
+    async def handler(update, context):
+        running.append(1)
+        await asyncio.sleep(0.01)
+        return len(running)
+
+    class ChannelUpdate:
+        effective_user = None
+
+    async def scenario():
+        return await asyncio.gather(handler(ChannelUpdate(), None), handler(ChannelUpdate(), None))
+
+    # Обидва виклики вже працювали одночасно
+    assert asyncio.run(scenario()) == [2, 2]
+    assert len(locks) == 0
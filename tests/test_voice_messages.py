@@ -0,0 +1,140 @@
+import asyncio
+
+from async_database import AsyncDatabaseManager
+from benchmarks.fakes import FakeSpeechRecognizer, FakeTelegramClient
+from database import DatabaseManager
+from handlers import WorkoutHandlers
+from transcription_queue import TranscriptionQueue
+
+HEARD = "👂 Я почув: \"віджимання 15 разів\""
+TIMEOUT_TEXT = "⌛ Розпізнавання зайняло забагато часу. Спробуйте ще раз."
+
+
+def run_voice(tmp_path, scenario, latency: float = 0.0, **queue_options):
+    """scenario(handlers, client, recognizer) у циклі подій з уже розпочатим тренуванням користувача 1"""
+    async def main():
+        db = AsyncDatabaseManager(DatabaseManager(str(tmp_path / "voice.db")), group_commit=False)
+        recognizer = FakeSpeechRecognizer(latency=latency)
+        handlers = WorkoutHandlers(db, recognizer)
+        handlers.transcription_queue = TranscriptionQueue(recognizer, **queue_options)
+        client = FakeTelegramClient()
+        try:
+            await handlers.handle_button_press(client.update(1, "🏁 Старт тренування"), None)
+            return await scenario(handlers, client, recognizer)
+        finally:
+            await handlers.transcription_queue.stop()
+            db.close()
+    return asyncio.run(main())
+
+
+def counting_downloads(update, downloads: list):
+    """Кожне завантаження файлу голосового дописує його file_unique_id у downloads"""
+    voice = update.message.voice
+    get_file = voice.get_file
+
+    async def counting_get_file():
+        downloads.append(voice.file_unique_id)
+        return await get_file()
+
+    voice.get_file = counting_get_file
+    return update
+
+
+def test_full_queue_replies_busy_without_downloading(tmp_path):
+    async def scenario(handlers, client, recognizer):
+        queue = handlers.transcription_queue
+        # Один запис розпізнається, другий чекає — черга на один запис заповнена
+        running = asyncio.ensure_future(queue.submit(b"running"))
+        await asyncio.sleep(0.05)
+        waiting = asyncio.ensure_future(queue.submit(b"waiting"))
+        await asyncio.sleep(0)
+        assert queue.is_full()
+
+        downloads = []
+        await handlers.handle_voice_message(counting_downloads(client.voice_update(1, b"new voice"), downloads), None)
+        await asyncio.gather(running, waiting)
+        return client.replies[1][-1], downloads, recognizer.calls
+
+    reply, downloads, calls = run_voice(tmp_path, scenario, latency=0.2, workers=1, max_size=1)
+    assert reply == WorkoutHandlers.BUSY_TEXT
+    assert downloads == []
+    assert calls == 2
+
+
+def test_queue_full_on_submit_replies_busy(tmp_path):
+    """Черга заповнилась між перевіркою is_full() і submit() — TranscriptionQueueFull теж дає BUSY_TEXT"""
+    async def scenario(handlers, client, recognizer):
+        queue = handlers.transcription_queue
+        running = asyncio.ensure_future(queue.submit(b"running"))
+        await asyncio.sleep(0.05)
+        waiting = asyncio.ensure_future(queue.submit(b"waiting"))
+        await asyncio.sleep(0)
+        queue.is_full = lambda: False
+        await handlers.handle_voice_message(client.voice_update(1, b"new voice"), None)
+        await asyncio.gather(running, waiting)
+        return client.replies[1], queue.stats()
+
+    replies, stats = run_voice(tmp_path, scenario, latency=0.2, workers=1, max_size=1)
+    assert replies[-2:] == ["🎤 Обробляю голосове повідомлення...", WorkoutHandlers.BUSY_TEXT]
+    assert stats['completed'] == 2
+
+
+def test_slow_transcription_times_out_and_frees_worker(tmp_path):
+    async def scenario(handlers, client, recognizer):
+        await handlers.handle_voice_message(client.voice_update(1, b"slow voice"), None)
+        timed_out = client.replies[1][-1]
+        # Обробник не чекає на завислий запит: наступний запис розпізнається одразу
+        recognizer.latency = 0
+        await asyncio.wait_for(handlers.handle_voice_message(client.voice_update(1, b"fast voice"), None), timeout=1)
+        return timed_out, client.replies[1][-2:], handlers.transcription_queue.stats()
+
+    timed_out, replies, stats = run_voice(tmp_path, scenario, latency=0.5, workers=1, max_size=2, timeout=0.05)
+    assert timed_out == TIMEOUT_TEXT
+    assert replies[0] == HEARD
+    assert (stats['deadline_missed'], stats['completed']) == (1, 1)
+
+
+def test_repeated_voice_skips_download_and_recognition(tmp_path):
+    async def scenario(handlers, client, recognizer):
+        downloads = []
+        for _ in range(3):
+            await handlers.handle_voice_message(counting_downloads(client.voice_update(1, b"voice"), downloads), None)
+        return downloads, recognizer.calls, client.replies[1]
+
+    downloads, calls, replies = run_voice(tmp_path, scenario, workers=1, max_size=2)
+    assert len(downloads) == 1
+    assert calls == 1
+    assert replies.count(HEARD) == 3
+
+
+def test_same_content_under_new_file_id_skips_recognition(tmp_path):
+    """Telegram видав тому самому запису інший file_unique_id: файл завантажується, але Whisper не викликається"""
+    async def scenario(handlers, client, recognizer):
+        downloads = []
+        for file_unique_id in ("first", "second", "second"):
+            update = client.voice_update(1, b"voice")
+            update.message.voice.file_unique_id = file_unique_id
+            await handlers.handle_voice_message(counting_downloads(update, downloads), None)
+        return downloads, recognizer.calls, client.replies[1]
+
+    downloads, calls, replies = run_voice(tmp_path, scenario, workers=1, max_size=2)
+    # Друге повідомлення знайдено за хешем вмісту, третє — вже за новим file_unique_id
+    assert downloads == ["first", "second"]
+    assert calls == 1
+    assert replies.count(HEARD) == 3
+
+
+def test_transcriptions_survive_restart(tmp_path):
+    async def record(handlers, client, recognizer):
+        await handlers.handle_voice_message(client.voice_update(1, b"voice"), None)
+        return recognizer.calls
+
+    async def replay(handlers, client, recognizer):
+        downloads = []
+        await handlers.handle_voice_message(counting_downloads(client.voice_update(1, b"voice"), downloads), None)
+        return downloads, recognizer.calls, handlers.transcription_cache.stats()['persistent_hits']
+
+    assert run_voice(tmp_path, record, workers=1, max_size=2) == 1
+    # Новий процес: кеш у пам'яті порожній, текст береться з таблиці transcriptions
+    downloads, calls, persistent_hits = run_voice(tmp_path, replay, workers=1, max_size=2)
+    assert (downloads, calls, persistent_hits) == ([], 0, 1)
@@ -1,5 +1,22 @@
+import bisect
+import logging
 import re
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+
+# Жоден з виразів нижче не відкочується більше ніж на символ: текст ділиться на
+# ланцюжки слів і чисел за один прохід, тож розбір лінійний навіть для довгих транскриптів.
+MAX_INPUT_LENGTH = 1000
+
+_WORD_RUN_RE = re.compile(r'\w+(?:\s\w+)*')
+_NUMBER_RUN_RE = re.compile(r'[\d\.,]+')
+_SPACES_RE = re.compile(r'\s*')
+_NAME_PREFIX_RE = re.compile(r'[а-яіїєґ\s\-]*')
+_NAME_WORD_RE = re.compile(r'[а-яіїєґ\-]+')
+_NAME_SPACE_RUN_RE = re.compile(r'\s+')
+_NAME_STOP_KEYWORDS = ('раз', 'повторень', 'підхід', 'сет', 'кг')
+_TOKEN_RE = re.compile(r'[^\s,]+')
+_KEYWORD_PATTERNS: Dict[Tuple[str, ...], re.Pattern] = {}
+
 
 class TextParser:
     def __init__(self):
@@ -40,6 +57,9 @@ class TextParser:
         self.set_synonyms = ['підхід', 'сета', 'сет', 'set']
         
         self.prefix_words = ['зробив', 'зробила', 'виконав', 'виконала']
+        self.conjunctions = ['і', 'й', 'та', 'потім', 'ще']
+        self.filler_words = ['по']
+        self.quantity_keywords = tuple(self.reps_synonyms + self.set_synonyms + self.weight_synonyms)
 
     def convert_ua_number_to_int(self, text: str) -> Optional[int]:
         text = text.lower().strip().replace("’", "'")
@@ -57,7 +77,72 @@ class TextParser:
 
         return total if total > 0 else None
 
+    def parse_exercise_list(self, text: str) -> List[Dict[str, any]]:
+        """Розбирає повідомлення з кількома підходами («віджимання 15 разів, прес 20 разів»).
+
+        Текст ділиться на частини там, де після кількості (раз/підхід/кг)
+        починається назва нової вправи. Якщо хоч одна частина не розбирається,
+        повідомлення розбирається цілком як один підхід.
+        """
+        if len(text) > MAX_INPUT_LENGTH:
+            return self._single(text)
+
+        segments = self._split_sets(text)
+        if len(segments) > 1:
+            parsed = [self.parse_exercise_input(segment) for segment in segments]
+            if all(parsed):
+                return parsed
+        return self._single(text)
+
+    def _single(self, text: str) -> List[Dict[str, any]]:
+        result = self.parse_exercise_input(text)
+        return [result] if result else []
+
+    def _split_sets(self, text: str) -> List[str]:
+        tokens = [
+            (match.start(), match.group().lower().replace("’", "'").strip('.'))
+            for match in _TOKEN_RE.finditer(text)
+        ]
+        segments = []
+        segment_start = 0
+        has_reps = False
+        after_quantity = False
+        index = 0
+        while index < len(tokens):
+            position, token = tokens[index]
+            if after_quantity and has_reps:
+                next_index = index
+                while next_index < len(tokens) and tokens[next_index][1] in self.conjunctions:
+                    next_index += 1
+                if next_index < len(tokens) and self._is_name_word(tokens[next_index][1]):
+                    segments.append(text[segment_start:position].strip(' ,.'))
+                    index = next_index
+                    position, token = tokens[index]
+                    segment_start = position
+                    has_reps = False
+
+            after_quantity = token.startswith(self.quantity_keywords)
+            if token.startswith(tuple(self.reps_synonyms)):
+                has_reps = True
+            index += 1
+
+        segments.append(text[segment_start:].strip(' ,.'))
+        return [segment for segment in segments if segment]
+
+    def _is_name_word(self, token: str) -> bool:
+        return (
+            token.isalpha()
+            and token not in self.numbers_ua
+            and token not in self.filler_words
+            and token not in self.conjunctions
+            and not token.startswith(self.quantity_keywords)
+        )
+
     def parse_exercise_input(self, text: str) -> Optional[Dict[str, any]]:
+        if len(text) > MAX_INPUT_LENGTH:
+            logging.warning(f"Повідомлення задовге для розбору: {len(text)} символів")
+            return None
+
         text = text.lower().strip().replace("’", "'")
 
         words = text.split()
@@ -71,41 +156,33 @@ class TextParser:
             'set_number': None
         }
 
-        exercise_match = re.match(r'^([а-яіїєґ\s\-]+?)(?:,|\s+\d|\s+[а-яіїєґ\-]+\s(?:раз|повторень|підхід|сет|кг))', text)
-        if exercise_match:
-            result['exercise'] = exercise_match.group(1).strip()
+        exercise = _match_exercise_name(text)
+        if exercise is not None:
+            result['exercise'] = exercise.strip()
         else:
-            words = text.split(',')  
-            if words:
-                result['exercise'] = words[0].strip()
+            result['exercise'] = text.split(',')[0].strip()
 
-        search_from = 0  
+        search_from = 0
 
-       
-        reps_pattern = r'([\d\.,]+|\w+(?:\s\w+)*)\s*(?:' + '|'.join(self.reps_synonyms) + r')'
-        reps_match = re.search(reps_pattern, text)
+        reps_match = _search_quantity(text, self.reps_synonyms)
         if reps_match:
-            reps_raw = reps_match.group(1).strip()
-            reps = self.convert_ua_number_to_int(reps_raw)
+            reps_raw, reps_end = reps_match
+            reps = self.convert_ua_number_to_int(reps_raw.strip())
             if reps is not None:
                 result['reps'] = reps
-                search_from = max(search_from, reps_match.end())
+                search_from = reps_end
 
-       
-        set_pattern = r'([\d\.,]+|\w+(?:\s\w+)*)\s*(?:' + '|'.join(self.set_synonyms) + r')'
-        set_match = re.search(set_pattern, text[search_from:])
+        set_match = _search_quantity(text[search_from:], self.set_synonyms)
         if set_match:
-            set_raw = set_match.group(1).strip()
-            set_num = self.convert_ua_number_to_int(set_raw)
+            set_raw, set_end = set_match
+            set_num = self.convert_ua_number_to_int(set_raw.strip())
             if set_num is not None:
                 result['set_number'] = set_num
-                search_from += set_match.end()
+                search_from += set_end
 
-       
-        weight_pattern = r'([\d\.,]+|\w+(?:\s\w+)*)\s*(?:' + '|'.join(self.weight_synonyms) + r')'
-        weight_match = re.search(weight_pattern, text[search_from:])
+        weight_match = _search_quantity(text[search_from:], self.weight_synonyms)
         if weight_match:
-            weight_raw = weight_match.group(1).strip().replace(',', '.')
+            weight_raw = weight_match[0].strip().replace(',', '.')
             try:
                 result['weight'] = float(weight_raw)
             except ValueError:
@@ -113,20 +190,98 @@ class TextParser:
                 if weight is not None:
                     result['weight'] = float(weight)
 
-        
         if result['exercise']:
             result['exercise'] = result['exercise'].strip().lower().rstrip(",. ")
 
         if result['exercise'] and result['reps'] is not None:
             return result
 
+        return None
 
-        
-        if result['exercise']:
-            result['exercise'] = result['exercise'].strip().lower().rstrip(",. ")
 
-        
-        if result['exercise'] and result['reps'] is not None:
-            return result
+def _match_exercise_name(text: str) -> Optional[str]:
+    """Назва вправи — найкоротший початок тексту з літер, пробілів і дефісів,
+    після якого йде кома, число або «слово + раз/повторень/підхід/сет/кг»."""
+    name_end = _NAME_PREFIX_RE.match(text).end()
+    for space in _NAME_SPACE_RUN_RE.finditer(text, 0, name_end):
+        end = max(space.start(), 1)
+        if end >= space.end():
+            continue
+        after = space.end()
+        if after < len(text) and text[after].isdecimal():
+            return text[:end]
+        word = _NAME_WORD_RE.match(text, after)
+        if word and word.end() < len(text) and text[word.end()].isspace() \
+                and text.startswith(_NAME_STOP_KEYWORDS, word.end() + 1):
+            return text[:end]
+    if 0 < name_end < len(text) and text[name_end] == ',':
+        return text[:name_end]
+    return None
+
+
+def _keyword_positions(text: str, keywords: Tuple[str, ...]) -> List[int]:
+    """Усі позиції, з яких починається будь-яке з ключових слів"""
+    pattern = _KEYWORD_PATTERNS.get(keywords)
+    if pattern is None:
+        pattern = re.compile('(?=' + '|'.join(map(re.escape, keywords)) + ')')
+        _KEYWORD_PATTERNS[keywords] = pattern
+    return [match.start() for match in pattern.finditer(text)]
+
+
+def _keyword_end(text: str, position: int, keywords: Tuple[str, ...]) -> Optional[int]:
+    """Кінець першого з keywords, що стоїть у position (після пробілів)"""
+    position = _SPACES_RE.match(text, position).end()
+    if text.startswith(keywords, position):
+        for keyword in keywords:
+            if text.startswith(keyword, position):
+                return position + len(keyword)
+    return None
 
+
+def _search_quantity(text: str, keywords: List[str]) -> Optional[Tuple[str, int]]:
+    """Шукає «<кількість> <ключове слово>»: повертає сиру кількість і кінець збігу.
+
+    Кількість — або послідовність цифр/крапок/ком, або ланцюжок слів через
+    одиночні пробіли, який закінчується якомога пізніше перед ключовим словом.
+    Перемагає збіг, що починається найлівіше; число має перевагу при рівності.
+    """
+    keywords = tuple(keywords)
+    hits = _keyword_positions(text, keywords)
+    if not hits:
         return None
+
+    number = None
+    hit_set = set(hits)
+    for run in _NUMBER_RUN_RE.finditer(text):
+        if _SPACES_RE.match(text, run.end()).end() in hit_set:
+            number = (run.start(), run.group(), _keyword_end(text, run.end(), keywords))
+            break
+
+    words = None
+    for run in _WORD_RUN_RE.finditer(text):
+        if number and run.start() > number[0]:
+            break
+        quantity_end = _last_quantity_end(text, run.start(), run.end(), hits)
+        if quantity_end is not None:
+            end = _keyword_end(text, quantity_end, keywords)
+            words = (run.start(), text[run.start():quantity_end], end)
+            break
+
+    if number and (not words or number[0] <= words[0]):
+        return number[1], number[2]
+    if words:
+        return words[1], words[2]
+    return None
+
+
+def _last_quantity_end(text: str, start: int, end: int, hits: List[int]) -> Optional[int]:
+    """Найпізніша позиція в ланцюжку слів [start, end), після якої (через пробіли) стоїть ключове слово"""
+    index = bisect.bisect_right(hits, _SPACES_RE.match(text, end).end()) - 1
+    while index >= 0 and hits[index] > start:
+        position = hits[index]
+        while position > start and text[position - 1].isspace():
+            position -= 1
+        if start < position <= end and (text[position - 1].isalnum() or text[position - 1] == '_'):
+            return position
+        index -= 1
+    return None
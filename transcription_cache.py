@@ -0,0 +1,57 @@
+import hashlib
+import logging
+from typing import List, Optional
+from cache import LRUCache
+
+
+class TranscriptionCache:
+    """Дворівневий кеш розпізнаних голосових: LRU у пам'яті + таблиця transcriptions у SQLite.
+
+    Основний ключ — file_unique_id голосового (збіг дозволяє не завантажувати файл
+    і не викликати Whisper); запасний — SHA-256 вмісту OGG для повторно
+    надісланих записів, у яких Telegram змінив ідентифікатор.
+    """
+
+    PRUNE_EVERY = 100
+
+    def __init__(self, db, memory_size: int = 1000, max_age: float = 30 * 24 * 3600, max_entries: int = 50000):
+        self.db = db
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.memory = LRUCache(maxsize=memory_size, ttl=max_age)
+        self.persistent_hits = 0
+        self._writes = 0
+
+    @staticmethod
+    def file_key(file_unique_id: str) -> str:
+        return f"file:{file_unique_id}"
+
+    @staticmethod
+    def content_key(audio_data: bytes) -> str:
+        return f"sha256:{hashlib.sha256(audio_data).hexdigest()}"
+
+    async def get(self, cache_key: str) -> Optional[str]:
+        text = self.memory.get(cache_key)
+        if text is not None:
+            return text
+        text = await self.db.get_transcription(cache_key, self.max_age)
+        if text is not None:
+            self.persistent_hits += 1
+            self.memory.set(cache_key, text)
+        return text
+
+    async def put(self, cache_keys: List[str], text: str):
+        for cache_key in cache_keys:
+            self.memory.set(cache_key, text)
+        await self.db.save_transcriptions(cache_keys, text)
+
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            removed = await self.db.prune_transcriptions(self.max_age, self.max_entries)
+            if removed:
+                logging.info(f"🧹 Видалено {removed} застарілих записів кешу розпізнавання")
+
+    def stats(self):
+        stats = self.memory.stats()
+        stats['persistent_hits'] = self.persistent_hits
+        return stats
@@ -0,0 +1,219 @@
+import asyncio
+import itertools
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from speech_backends import RetryableTranscriptionError
+
+
+class TranscriptionQueueFull(Exception):
+    """Черга розпізнавання переповнена — потрібно спробувати пізніше"""
+
+
+class TranscriptionTimeout(Exception):
+    """Розпізнавання не вклалося у відведений час"""
+
+
+class TranscriptionUnavailable(Exception):
+    """Рушій розпізнавання відхиляв запит (ліміт, збої) на всіх спробах"""
+
+
+class TokenBucket:
+    """Маркерне відро: не більше rate запитів на секунду зі сплеском до capacity.
+
+    pause() зупиняє видачу маркерів для всіх (коли сервер відповів 429 з Retry-After).
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass(order=True)
+class _Request:
+    deadline: float
+    sequence: int
+    audio_data: bytes = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    submitted: float = field(compare=False)
+
+
+class TranscriptionQueue:
+    """Обмежена черга голосових повідомлень з пулом асинхронних обробників.
+
+    Запити обслуговуються за найближчим дедлайном: дедлайн = timeout +
+    slo_per_audio_second * тривалість, тож короткі записи йдуть раніше довгих,
+    а довгі не чекають вічно. Виклики рушія проходять через спільне маркерне
+    відро (ліміт API); на 429 і тимчасових збоях — повтор з експоненційною
+    затримкою і випадковим розкидом, поки вкладаємося в дедлайн.
+    """
+
+    def __init__(self, recognizer, workers: int = 2, max_size: int = 20, timeout: float = 30.0,
+                 slo_per_audio_second: float = 0.0, rate_limit: float = 0.0, burst: int = 1,
+                 max_retries: int = 5, backoff_base: float = 0.5, backoff_max: float = 8.0):
+        self.recognizer = recognizer
+        self.workers = workers
+        self.max_size = max_size
+        self.timeout = timeout
+        self.slo_per_audio_second = slo_per_audio_second
+        self.bucket = TokenBucket(rate_limit / 60, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+
+        self.completed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.deadline_missed = 0
+        self.failed = 0
+
+    def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue(maxsize=self.max_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(index))
+            for index in range(self.workers)
+        ]
+        logging.info(f"🎤 Запущено {self.workers} обробників розпізнавання (черга до {self.max_size})")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def is_full(self) -> bool:
+        return self._queue is not None and self._queue.full()
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'pending': self.pending(),
+            'completed': self.completed,
+            'retries': self.retries,
+            'rate_limited': self.rate_limited,
+            'deadline_missed': self.deadline_missed,
+            'failed': self.failed,
+        }
+
+    async def submit(self, audio_data: bytes, duration: float = 0.0) -> Optional[str]:
+        self.start()
+        now = time.monotonic()
+        request = _Request(
+            deadline=now + self.timeout + self.slo_per_audio_second * duration,
+            sequence=next(self._sequence),
+            audio_data=audio_data,
+            future=asyncio.get_running_loop().create_future(),
+            submitted=now
+        )
+        try:
+            self._queue.put_nowait(request)
+        except asyncio.QueueFull:
+            raise TranscriptionQueueFull()
+        return await request.future
+
+    async def _worker(self, index: int):
+        while True:
+            request = await self._queue.get()
+            future = request.future
+            try:
+                if future.cancelled():
+                    continue
+                text = await self._transcribe(request)
+                self.completed += 1
+                if not future.done():
+                    future.set_result(text)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except TranscriptionTimeout as e:
+                self.deadline_missed += 1
+                logging.error(f"Розпізнавання не вклалося в дедлайн (обробник {index})")
+                if not future.done():
+                    future.set_exception(e)
+            except TranscriptionUnavailable as e:
+                self.failed += 1
+                logging.error(f"Рушій розпізнавання недоступний після {self.max_retries} повторів: {e}")
+                if not future.done():
+                    future.set_exception(e)
+            except Exception as e:
+                self.failed += 1
+                logging.error(f"Помилка обробника розпізнавання {index}: {e}", exc_info=True)
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    async def _transcribe(self, request: _Request) -> Optional[str]:
+        audio_data = await self._within_deadline(
+            request, asyncio.to_thread(self.recognizer.prepare, request.audio_data)
+        )
+        if not audio_data:
+            return None
+
+        for attempt in range(self.max_retries + 1):
+            await self._within_deadline(request, self.bucket.acquire())
+            try:
+                return await self._within_deadline(
+                    request, asyncio.to_thread(self.recognizer.recognize, audio_data)
+                )
+            except RetryableTranscriptionError as e:
+                if e.rate_limited:
+                    self.rate_limited += 1
+                    if e.retry_after:
+                        self.bucket.pause(e.retry_after)
+                if attempt == self.max_retries:
+                    raise TranscriptionUnavailable(str(e))
+                delay = e.retry_after or random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if time.monotonic() + delay >= request.deadline:
+                    raise TranscriptionTimeout()
+                self.retries += 1
+                logging.info(f"{e}; повтор {attempt + 1} через {delay:.1f} с")
+                await asyncio.sleep(delay)
+
+    async def _within_deadline(self, request: _Request, awaitable):
+        remaining = request.deadline - time.monotonic()
+        if remaining <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise TranscriptionTimeout()
+        try:
+            return await asyncio.wait_for(awaitable, timeout=remaining)
+        except asyncio.TimeoutError:
+            raise TranscriptionTimeout()
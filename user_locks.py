@@ -0,0 +1,44 @@
+import asyncio
+import functools
+from contextlib import asynccontextmanager
+from typing import Dict, Hashable, List
+
+
+class UserLocks:
+    """По одному asyncio.Lock на користувача.
+
+    Оновлення одного користувача виконуються строго по черзі (Lock у asyncio
+    видає доступ у порядку очікування), а різних користувачів — паралельно.
+    Замок видаляється, щойно на нього ніхто не чекає, тож словник не росте.
+    """
+
+    def __init__(self):
+        self._locks: Dict[Hashable, List] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def serialized(self, callback):
+        """Обгортає обробник telegram так, щоб він виконувався під замком користувача"""
+        @functools.wraps(callback)
+        async def wrapper(update, context):
+            user = update.effective_user
+            if user is None:
+                return await callback(update, context)
+            async with self.hold(user.id):
+                return await callback(update, context)
+        return wrapper